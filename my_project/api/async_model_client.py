@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Asyncio model client built on the async OpenAI and httpx clients.
+Mirrors ModelClient so that one process can hold many sessions waiting on
+providers without pinning an OS thread per call. Calls go through the same
+single-flight groups and hedgers as ModelClient, in their asyncio form.
+"""
+
+import os
+import time
+import asyncio
+import httpx
+from typing import Dict, Any, Optional, Union, AsyncIterator
+from openai import AsyncOpenAI
+
+from config import settings
+from utils.llm_logger import LLMLogger
+from api.model_client import ModelClient, ThinkStripper
+from api.response_cache import is_cache_enabled, get_response_cache
+from api.resilience import get_policy, ProviderError
+from api.rate_limiter import get_limiter, estimate_tokens
+from api.call_metrics import CallMetrics
+from api.replay import get_recorder
+from api.single_flight import get_flight
+from api.hedging import async_hedged_call
+
+
+class AsyncModelClient:
+    """Asyncio client for the text, TTS and DashScope image providers."""
+
+    # Response post-processing and TTS request building are shared with ModelClient
+    cut_think = ModelClient.cut_think
+    cut_json = ModelClient.cut_json
+    speech_settings = ModelClient.speech_settings
+    _build_speech_request = ModelClient._build_speech_request
+    _decode_speech = ModelClient._decode_speech
+    _decode_speech_event = ModelClient._decode_speech_event
+    _log_failure = ModelClient._log_failure
+
+    def __init__(self,
+                 model_type: str = 'text',
+                 api_key: Optional[str] = None,
+                 api_base: Optional[str] = None,
+                 logger: Optional[LLMLogger] = None):
+        """
+        Initialize the client with API credentials.
+        The client must be used from a single event loop.
+
+        Args:
+            model_type: Type of model ('text', 'image', or 'tts')
+            api_key: API key. If None, tries to get from environment.
+            api_base: API endpoint. If None, tries to get from environment.
+            logger: Shared LLM logger. If None, a new log file is created.
+        """
+        self.model_type = model_type
+        config = settings.get_api_config(model_type)
+
+        # Replays never reach a provider, so credentials are optional
+        replaying = settings.PROVIDER_MODE == "replay"
+        self.api_key = api_key or config.get('api_key') or ("replay" if replaying else None)
+        if not self.api_key:
+            raise ValueError(f"OpenAI API key is required for {model_type} model. Set it as an argument or {model_type.upper()}_API_KEY environment variable.")
+
+        self.api_base = api_base or config.get('api_base')
+        if not self.api_base:
+            raise ValueError(f"OpenAI endpoint is required for {model_type} model. Set it as an argument or {model_type.upper()}_BASE_URL environment variable.")
+
+        # Remove trailing slash if present
+        if self.api_base.endswith('/'):
+            self.api_base = self.api_base[:-1]
+
+        # For TTS model, we also need group_id for minimaxi API
+        if model_type == 'tts':
+            self.group_id = config.get('group_id') or ("replay" if replaying else None)
+            if not self.group_id:
+                raise ValueError("Group ID is required for TTS model. Set it as TTS_GROUP_ID environment variable.")
+
+        # Keep-alive connection pool shared by all calls of this client
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.CLIENT_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CLIENT_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.CLIENT_POOL_KEEPALIVE_EXPIRY
+            )
+        )
+
+        if model_type in ['text', 'image']:
+            self.client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.api_base,
+                http_client=self.http_client,
+                max_retries=0  # Retries are handled by the resilience policy
+            )
+
+        self.logger = logger or LLMLogger()
+
+    async def generate_text(self,
+                            prompt: str,
+                            model: str = None,
+                            temperature: float = 0.6,
+                            max_tokens: int = 8192,
+                            component: str = "unknown") -> str:
+        """
+        Generate text using the LLM.
+
+        Args:
+            prompt: The input prompt
+            model: Model name to use (if None, uses default from config)
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum number of tokens to generate
+            component: Name of the component making the request
+
+        Returns:
+            Generated text response
+        """
+        if model is None:
+            model = settings.get_api_config('text').get('model_name', 'deepseek-reasoner')
+
+        metadata = {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        metrics = CallMetrics()
+        recorder = get_recorder()
+        if recorder is not None and recorder.replaying:
+            return await self._replay(recorder, component, prompt, {"model": model}, metrics)
+
+        # Serve repeated calls from the on-disk cache for opted-in components
+        cache = get_response_cache() if is_cache_enabled(component) else None
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.make_key(model, prompt, temperature, max_tokens)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                metadata["cache"] = "hit"
+                metadata["cache_stats"] = cache.get_stats()
+                metadata.update(metrics.as_metadata())
+                self.logger.log_interaction(component=component, prompt=prompt, response=cached, metadata=metadata)
+                if recorder is not None:
+                    recorder.record(component, prompt, metadata, response=cached)
+                return cached
+
+        policy = get_policy('text')
+        limiter = get_limiter('text')
+
+        async def attempt():
+            async with limiter.async_slot(tokens=estimate_tokens(prompt)) as wait:
+                metrics.record_attempt(wait)
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=policy.timeout
+                )
+            if response.usage is not None:
+                limiter.record_usage(response.usage.completion_tokens)
+            metrics.record_usage(response.usage)
+            metrics.record_status(200)
+            return response.choices[0].message.content
+
+        async def request_text() -> str:
+            # A losing hedge is stopped by cancelling its task, so no streaming is needed
+            result = await async_hedged_call(component, lambda: policy.async_call(attempt))
+            result = self.cut_think(result)
+            return self.cut_json(result)
+
+        try:
+            # Identical concurrent requests share one upstream call
+            flight = get_flight('text')
+            result, coalesced = await flight.async_do(
+                flight.make_key(self.api_base, model, prompt, temperature, max_tokens),
+                request_text
+            )
+            metadata["coalesced"] = coalesced
+
+            if cache is not None:
+                cache.set(cache_key, result)
+                metadata["cache"] = "miss"
+                metadata["cache_stats"] = cache.get_stats()
+            metadata.update(metrics.as_metadata())
+
+            self.logger.log_interaction(component=component, prompt=prompt, response=result, metadata=metadata)
+            if recorder is not None:
+                recorder.record(component, prompt, metadata, response=result)
+            return result
+        except Exception as e:
+            print(f"Error in async generate_text: {e}")
+            self._log_failure(component, prompt, {"model": model}, metrics, e)
+            raise
+
+    async def generate_text_iter(self,
+                                 prompt: str,
+                                 model: str = None,
+                                 temperature: float = 0.6,
+                                 max_tokens: int = 8192,
+                                 component: str = "unknown") -> AsyncIterator[str]:
+        """
+        Generate text using the LLM, yielding deltas as they arrive.
+
+        Args:
+            prompt: The input prompt
+            model: Model name to use (if None, uses default from config)
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum number of tokens to generate
+            component: Name of the component making the request
+
+        Yields:
+            Generated text deltas with the think block removed
+        """
+        if model is None:
+            model = settings.get_api_config('text').get('model_name', 'deepseek-reasoner')
+
+        metrics = CallMetrics()
+        stripper = ThinkStripper()
+        parts = []
+        policy = get_policy('text')
+        limiter = get_limiter('text')
+        recorder = get_recorder()
+        if recorder is not None and recorder.replaying:
+            async for text in recorder.async_replay_iter(component, prompt):
+                metrics.record_first_token()
+                parts.append(text)
+                yield text
+            self.logger.log_interaction(
+                component=component,
+                prompt=prompt,
+                response=''.join(parts),
+                metadata={"model": model, "stream": True, "replay": True, **metrics.as_metadata()}
+            )
+            return
+
+        async def open_stream():
+            async with limiter.async_slot(tokens=estimate_tokens(prompt)) as wait:
+                metrics.record_attempt(wait)
+                return await self.client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    timeout=policy.timeout
+                )
+
+        try:
+            stream = await policy.async_call(open_stream)
+            metrics.record_status(200)
+            try:
+                async for chunk in stream:
+                    # The last chunk carries the usage of the whole stream
+                    if chunk.usage is not None:
+                        metrics.record_usage(chunk.usage)
+                        limiter.record_usage(chunk.usage.completion_tokens)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    metrics.record_first_token()
+                    text = stripper.feed(delta)
+                    if text:
+                        parts.append(text)
+                        yield text
+
+                text = stripper.flush()
+                if text:
+                    parts.append(text)
+                    yield text
+            finally:
+                await stream.close()
+
+            metadata = {
+                "model": model,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": True,
+                **metrics.as_metadata()
+            }
+            self.logger.log_interaction(component=component, prompt=prompt, response=''.join(parts), metadata=metadata)
+            if recorder is not None:
+                recorder.record(component, prompt, metadata, response=''.join(parts))
+        except Exception as e:
+            print(f"Error in async generate_text_iter: {e}")
+            self._log_failure(component, prompt, {"model": model, "stream": True}, metrics, e)
+            raise
+
+    async def text_to_speech(self, text: str, component: str = "unknown") -> bytes:
+        """
+        Convert text to speech using minimaxi's text-to-speech API.
+
+        Args:
+            text: The text to convert to speech
+            component: Name of the component making the request
+
+        Returns:
+            Audio data as bytes
+        """
+        model = settings.get_api_config('tts').get('model_name', 'speech-02-turbo')
+        url, headers, payload = self._build_speech_request(text)
+        policy = get_policy('tts')
+        metrics = CallMetrics()
+        recorder = get_recorder()
+        if recorder is not None and recorder.replaying:
+            return await self._replay(recorder, component, text, {"model": model}, metrics)
+
+        async def attempt():
+            async with get_limiter('tts').async_slot(tokens=estimate_tokens(text)) as wait:
+                metrics.record_attempt(wait)
+                response = await self.http_client.post(url, headers=headers, content=payload, timeout=policy.timeout)
+            metrics.record_status(response.status_code)
+            response.raise_for_status()
+            return self._decode_speech(response.json())
+
+        try:
+            # Identical concurrent requests share one upstream call
+            flight = get_flight('tts')
+            audio_data, coalesced = await flight.async_do(
+                flight.make_key(url, payload),
+                lambda: async_hedged_call(component, lambda: policy.async_call(attempt))
+            )
+            metadata = {
+                "model": model,
+                "voice_id": "male-qn-qingse",
+                "format": "mp3",
+                "coalesced": coalesced,
+                "prompt_chars": len(text),
+                **metrics.as_metadata()
+            }
+            self.logger.log_interaction(component=component, prompt=text, response="[Binary audio data]", metadata=metadata)
+            if recorder is not None:
+                recorder.record(component, text, metadata, data=audio_data)
+            return audio_data
+        except Exception as e:
+            print(f"Error in async text_to_speech: {e}")
+            self._log_failure(component, text, {"model": model}, metrics, e)
+            raise
+
+    async def text_to_speech_stream(self, text: str, output_path: str, component: str = "unknown") -> str:
+        """
+        Asyncio counterpart of ModelClient.text_to_speech_stream: audio is written to disk as it arrives.
+
+        Args:
+            text: The text to convert to speech
+            output_path: Path of the audio file to write
+            component: Name of the component making the request
+
+        Returns:
+            Path to the written audio file
+        """
+        model = settings.get_api_config('tts').get('model_name', 'speech-02-turbo')
+        url, headers, payload = self._build_speech_request(text, stream=True)
+        partial_path = output_path + ".part"
+        policy = get_policy('tts')
+        metrics = CallMetrics()
+        recorder = get_recorder()
+        if recorder is not None and recorder.replaying:
+            audio_data = await self._replay(recorder, component, text, {"model": model, "stream": True}, metrics)
+            with open(output_path, 'wb') as f:
+                f.write(audio_data)
+            return output_path
+
+        async def attempt():
+            start_time = time.perf_counter()
+            first_audio_time = None
+            audio_bytes = 0
+
+            async with get_limiter('tts').async_slot(tokens=estimate_tokens(text)) as wait:
+                metrics.record_attempt(wait)
+                async with self.http_client.stream('POST', url, headers=headers, content=payload,
+                                                   timeout=policy.timeout) as response:
+                    metrics.record_status(response.status_code)
+                    response.raise_for_status()
+
+                    # Each attempt starts the file from scratch
+                    with open(partial_path, 'wb') as f:
+                        async for line in response.aiter_lines():
+                            chunk = self._decode_speech_event(line.encode('utf-8'))
+                            if not chunk:
+                                continue
+                            f.write(chunk)
+                            audio_bytes += len(chunk)
+                            if first_audio_time is None:
+                                first_audio_time = time.perf_counter()
+                                metrics.record_first_token()
+
+            if not audio_bytes:
+                raise ProviderError("TTS stream returned no audio")
+
+            return {
+                "time_to_first_audio": round(first_audio_time - start_time, 3),
+                "total_time": round(time.perf_counter() - start_time, 3),
+                "audio_bytes": audio_bytes
+            }
+
+        try:
+            timings = await policy.async_call(attempt)
+            os.replace(partial_path, output_path)
+            metadata = {
+                "model": model,
+                "voice_id": "male-qn-qingse",
+                "format": "mp3",
+                "stream": True,
+                "prompt_chars": len(text),
+                **timings,
+                **metrics.as_metadata()
+            }
+            self.logger.log_interaction(component=component, prompt=text, response="[Binary audio data]", metadata=metadata)
+            if recorder is not None:
+                with open(output_path, 'rb') as f:
+                    recorder.record(component, text, metadata, data=f.read())
+            return output_path
+        except Exception as e:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            print(f"Error in async text_to_speech_stream: {e}")
+            self._log_failure(component, text, {"model": model, "stream": True}, metrics, e)
+            raise
+
+    async def synthesize_image_dashscope(self,
+                                         prompt: str,
+                                         api_key: str,
+                                         style: str = '<watercolor>',
+                                         size: str = '1024*1024',
+                                         component: str = "unknown") -> bytes:
+        """
+        Generate an image with the DashScope text-to-image task API and download it.
+
+        Args:
+            prompt: The image description
+            api_key: DashScope API key
+            style: DashScope image style
+            size: Image size
+            component: Name of the component making the request
+
+        Returns:
+            The downloaded image data
+        """
+        base_url = settings.DASHSCOPE_BASE_URL.rstrip('/')
+        headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'X-DashScope-Async': 'enable'
+        }
+        body = {
+            "model": "wanx-v1",
+            "input": {"prompt": prompt},
+            "parameters": {"style": style, "size": size, "n": 1}
+        }
+        policy = get_policy('image')
+        metrics = CallMetrics()
+        recorder = get_recorder()
+        if recorder is not None and recorder.replaying:
+            return await self._replay(recorder, component, prompt, {"model": "wanx-v1"}, metrics)
+
+        async def attempt():
+            async with get_limiter('image').async_slot() as wait:
+                metrics.record_attempt(wait)
+                response = await self.http_client.post(
+                    f"{base_url}/services/aigc/text2image/image-synthesis",
+                    headers=headers, json=body, timeout=policy.timeout
+                )
+                response.raise_for_status()
+                task_id = response.json()['output']['task_id']
+
+                # Poll the task until DashScope reports a result
+                deadline = time.monotonic() + policy.timeout
+                while True:
+                    task = await self.http_client.get(
+                        f"{base_url}/tasks/{task_id}", headers=headers, timeout=policy.timeout
+                    )
+                    task.raise_for_status()
+                    output = task.json()['output']
+                    status = output.get('task_status')
+                    if status == 'SUCCEEDED':
+                        break
+                    if status in ('FAILED', 'CANCELED', 'UNKNOWN'):
+                        raise ProviderError(f"DashScope API error: {output.get('code')} - {output.get('message')}")
+                    if time.monotonic() > deadline:
+                        # Not retryable: resubmitting would wait a full timeout again per retry
+                        raise ProviderError(f"DashScope task {task_id} did not finish within {policy.timeout}s")
+                    await asyncio.sleep(settings.DASHSCOPE_POLL_INTERVAL)
+
+            image = await self.http_client.get(output['results'][0]['url'], timeout=policy.timeout)
+            image.raise_for_status()
+            metrics.record_status(image.status_code)
+            return image.content
+
+        try:
+            # Identical concurrent requests share one DashScope task
+            flight = get_flight('image')
+            image_data, coalesced = await flight.async_do(
+                flight.make_key(prompt, style, size),
+                lambda: policy.async_call(attempt)
+            )
+            metadata = {
+                "model": "wanx-v1",
+                "style": style,
+                "size": size,
+                "coalesced": coalesced,
+                **metrics.as_metadata()
+            }
+            self.logger.log_interaction(component=component, prompt=prompt, response="[Binary image data]", metadata=metadata)
+            if recorder is not None:
+                recorder.record(component, prompt, metadata, data=image_data)
+            return image_data
+        except Exception as e:
+            print(f"Error in async synthesize_image_dashscope: {e}")
+            self._log_failure(component, prompt, {"model": "wanx-v1"}, metrics, e)
+            raise
+
+    async def _replay(self, recorder, component: str, prompt: str, metadata: Dict[str, Any],
+                      metrics: CallMetrics) -> Union[str, bytes]:
+        """Asyncio counterpart of ModelClient._replay."""
+        result = await recorder.async_replay(component, prompt)
+        self.logger.log_interaction(
+            component=component,
+            prompt=prompt,
+            response=result if isinstance(result, str) else "[Binary data]",
+            metadata={**metadata, "replay": True, **metrics.as_metadata()}
+        )
+        return result
+
+    async def aclose(self):
+        """Close the pooled connections held by this client."""
+        await self.http_client.aclose()
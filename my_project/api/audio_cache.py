@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Content-addressed cache for synthesized TTS audio.
+Audio segments are stored as files named by a hash of the text and the voice and
+audio settings; a SQLite index tracks their sizes for least-recently-used eviction.
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any
+
+from config import settings
+
+
+class AudioCache:
+    """File-backed, size-capped LRU cache of synthesized audio segments."""
+
+    def __init__(self, directory: str = None, max_bytes: int = None):
+        """
+        Initialize the audio cache.
+
+        Args:
+            directory: Directory holding the audio files and index (defaults to settings)
+            max_bytes: Maximum total size of cached audio (defaults to settings)
+        """
+        self.directory = directory or settings.TTS_CACHE_DIR
+        self.max_bytes = max_bytes or settings.TTS_CACHE_MAX_BYTES
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "key TEXT PRIMARY KEY, "
+            "size INTEGER NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_segments_last_access ON segments (last_access)"
+        )
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, model: str, voice_id: str, speed: float, sample_rate: int, format: str) -> str:
+        """
+        Build the cache key of an audio segment.
+
+        Args:
+            text: The synthesized text
+            model: TTS model name
+            voice_id: Voice used for synthesis
+            speed: Speech speed
+            sample_rate: Audio sample rate
+            format: Audio format, e.g. 'mp3'
+
+        Returns:
+            Hex digest identifying the segment
+        """
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return hashlib.sha256(
+            f"{model}|{voice_id}|{speed}|{sample_rate}|{format}|{text_hash}".encode('utf-8')
+        ).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """Path of the audio file of a key, sharded by its first two hex digits."""
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str, output_path: str) -> bool:
+        """
+        Copy a cached segment to output_path.
+
+        Args:
+            key: Cache key from make_key
+            output_path: Path to write the audio to on a hit
+
+        Returns:
+            True on a hit, False on a miss
+        """
+        path = self._path(key)
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM segments WHERE key = ?", (key,)).fetchone()
+            if row is None or not os.path.exists(path):
+                if row is not None:
+                    # The file was removed behind the index's back
+                    self._conn.execute("DELETE FROM segments WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return False
+
+            self._conn.execute("UPDATE segments SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+
+        shutil.copyfile(path, output_path)
+        return True
+
+    def set(self, key: str, audio_path: str):
+        """
+        Store a synthesized segment and evict the least recently used ones over the size cap.
+
+        Args:
+            key: Cache key from make_key
+            audio_path: Path of the synthesized audio file
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Copy next to the final name first so readers never see a partial file
+        temp_path = f"{path}.{threading.get_ident()}.part"
+        shutil.copyfile(audio_path, temp_path)
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO segments (key, size, last_access) VALUES (?, ?, ?)",
+                (key, size, time.time())
+            )
+
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM segments").fetchone()[0]
+            if total > self.max_bytes:
+                for old_key, old_size in self._conn.execute(
+                    "SELECT key, size FROM segments ORDER BY last_access ASC"
+                ).fetchall():
+                    if total <= self.max_bytes or old_key == key:
+                        break
+                    self._conn.execute("DELETE FROM segments WHERE key = ?", (old_key,))
+                    try:
+                        os.remove(self._path(old_key))
+                    except OSError:
+                        pass
+                    total -= old_size
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the stored size of the cache."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM segments"
+            ).fetchone()
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "entries": entries,
+                "bytes": size
+            }
+
+
+# Process-wide cache, created on first use
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    """Get the shared TTS audio cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache()
+        return _cache
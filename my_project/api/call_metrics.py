@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Per-call metrics recorded alongside every logged provider interaction:
+wall time, queue wait, time to first token, token usage, retries and HTTP status.
+"""
+
+import time
+import threading
+from typing import Dict, Any, Optional
+
+from api.resilience import get_status_code
+
+
+class CallMetrics:
+    """Collects the timings and usage of one provider call across its attempts."""
+
+    def __init__(self):
+        """Start the wall clock of the call."""
+        self.start_time = time.perf_counter()
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.queue_wait = 0.0
+        self.first_token_time = None
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self.cached_prompt_tokens = None
+        self.status_code = None
+
+    def record_attempt(self, queue_wait: float = 0.0):
+        """
+        Count one request sent to the provider (retries and hedges included).
+
+        Args:
+            queue_wait: Seconds the attempt waited for the rate limiter
+        """
+        with self._lock:
+            self.attempts += 1
+            self.queue_wait += queue_wait
+
+    def record_first_token(self):
+        """Mark the arrival of the first streamed token or audio chunk."""
+        with self._lock:
+            if self.first_token_time is None:
+                self.first_token_time = time.perf_counter()
+
+    def record_usage(self, usage: Any):
+        """
+        Record token usage reported by an OpenAI-compatible provider.
+
+        Args:
+            usage: The response.usage object (may be None)
+        """
+        if usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached = getattr(details, 'cached_tokens', None)
+        if cached is None:
+            # DeepSeek reports context-cache hits as prompt_cache_hit_tokens
+            cached = getattr(usage, 'prompt_cache_hit_tokens', None)
+        with self._lock:
+            self.prompt_tokens = getattr(usage, 'prompt_tokens', None)
+            self.completion_tokens = getattr(usage, 'completion_tokens', None)
+            self.cached_prompt_tokens = cached
+
+    def record_status(self, status_code: Optional[int]):
+        """Record the HTTP status of the final response."""
+        with self._lock:
+            self.status_code = status_code
+
+    def record_error(self, error: Exception):
+        """Record the HTTP status carried by a failed call, if any."""
+        self.record_status(get_status_code(error))
+
+    def as_metadata(self) -> Dict[str, Any]:
+        """Get the metrics as log metadata fields."""
+        with self._lock:
+            return {
+                "wall_time": round(time.perf_counter() - self.start_time, 3),
+                "queue_wait": round(self.queue_wait, 3),
+                "time_to_first_token": (
+                    round(self.first_token_time - self.start_time, 3) if self.first_token_time else None
+                ),
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cached_prompt_tokens": self.cached_prompt_tokens,
+                "retries": max(0, self.attempts - 1),
+                "status_code": self.status_code
+            }
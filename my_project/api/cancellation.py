@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cancellation of in-flight provider requests (e.g. the losing request of a hedged pair).
+Kept free of provider SDK imports, so modules that only need these names (api/hedging.py)
+can be imported by the service without loading openai, httpx or requests.
+"""
+
+import threading
+from typing import Optional
+
+
+class CallCancelled(Exception):
+    """Raised by a provider request that was stopped by its caller (e.g. a hedge that lost)."""
+
+
+def check_cancelled(cancel: Optional[threading.Event]):
+    """Raise CallCancelled if the request's cancel event is set."""
+    if cancel is not None and cancel.is_set():
+        raise CallCancelled("Provider request cancelled")
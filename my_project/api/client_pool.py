@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Process-wide registry of pooled ModelClient instances.
+Components share one client (and one connection pool) per model type and config
+instead of building a new OpenAI client and log file on every request.
+The client modules (and with them openai, httpx and requests) are imported when the
+first client is created, so reading pool stats does not load the provider SDKs.
+"""
+
+import asyncio
+import threading
+from typing import Dict, Any, Optional, Tuple, List, TYPE_CHECKING
+
+from config import settings
+from utils.llm_logger import LLMLogger
+
+if TYPE_CHECKING:
+    from api.model_client import ModelClient
+    from api.async_model_client import AsyncModelClient
+
+
+class ClientPool:
+    """Thread-safe registry of ModelClient instances keyed by model type and config."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str, str], "ModelClient"] = {}
+        self._async_clients: Dict[Tuple[str, str, str], "AsyncModelClient"] = {}
+        self._logger: Optional[LLMLogger] = None
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "warmed": 0
+        }
+
+    def _get_logger(self) -> LLMLogger:
+        """Get the logger shared by all pooled clients."""
+        if self._logger is None:
+            self._logger = LLMLogger()
+        return self._logger
+
+    def get(self,
+            model_type: str = 'text',
+            api_key: Optional[str] = None,
+            api_base: Optional[str] = None) -> "ModelClient":
+        """
+        Get the shared client for a model type, creating it on first use.
+
+        Args:
+            model_type: Type of model ('text', 'image', or 'tts')
+            api_key: API key override. If None, uses settings.
+            api_base: Endpoint override. If None, uses settings.
+
+        Returns:
+            A pooled ModelClient
+        """
+        from api.model_client import ModelClient
+        return self._get_or_create(self._clients, ModelClient, model_type, api_key, api_base)
+
+    def get_async(self,
+                  model_type: str = 'text',
+                  api_key: Optional[str] = None,
+                  api_base: Optional[str] = None) -> "AsyncModelClient":
+        """
+        Get the shared asyncio client for a model type, creating it on first use.
+        Async clients are bound to the event loop that first uses them.
+
+        Args:
+            model_type: Type of model ('text', 'image', or 'tts')
+            api_key: API key override. If None, uses settings.
+            api_base: Endpoint override. If None, uses settings.
+
+        Returns:
+            A pooled AsyncModelClient
+        """
+        from api.async_model_client import AsyncModelClient
+        return self._get_or_create(self._async_clients, AsyncModelClient, model_type, api_key, api_base)
+
+    def _get_or_create(self, clients: Dict, client_class, model_type: str,
+                       api_key: Optional[str], api_base: Optional[str]):
+        """Look up a client by model type and config, creating it on first use."""
+        config = settings.get_api_config(model_type)
+        key = (
+            model_type,
+            api_key or config.get('api_key') or '',
+            api_base or config.get('api_base') or ''
+        )
+
+        with self._lock:
+            client = clients.get(key)
+            if client is not None:
+                self._stats["reused"] += 1
+                return client
+
+            client = client_class(
+                model_type=model_type,
+                api_key=api_key,
+                api_base=api_base,
+                logger=self._get_logger()
+            )
+            clients[key] = client
+            self._stats["created"] += 1
+            return client
+
+    def warm_up(self, model_types: Optional[List[str]] = None) -> Dict[str, bool]:
+        """
+        Create the clients for the given model types and open their connections.
+        Model types that are not configured are skipped.
+
+        Args:
+            model_types: Model types to warm up (defaults to text and tts)
+
+        Returns:
+            Dictionary mapping model type to whether warm-up succeeded
+        """
+        results = {}
+        for model_type in model_types or ['text', 'tts']:
+            try:
+                client = self.get(model_type)
+            except ValueError as e:
+                print(f"Skipping warm-up for {model_type} model: {e}")
+                results[model_type] = False
+                continue
+
+            results[model_type] = client.warm_up()
+            if results[model_type]:
+                with self._lock:
+                    self._stats["warmed"] += 1
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry reuse counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["clients"] = len(self._clients)
+            stats["async_clients"] = len(self._async_clients)
+            if self._logger is not None:
+                stats["llm_log"] = self._logger.get_stats()
+        return stats
+
+    def _take_all(self) -> Tuple[List["ModelClient"], List["AsyncModelClient"]]:
+        """Remove all clients from the registry and return them."""
+        with self._lock:
+            clients = list(self._clients.values())
+            async_clients = list(self._async_clients.values())
+            self._clients.clear()
+            self._async_clients.clear()
+        return clients, async_clients
+
+    def close(self):
+        """
+        Close all pooled clients and clear the registry.
+        Called from an event loop, the async clients are closed by tasks on that loop;
+        otherwise they are closed on a temporary loop.
+        """
+        clients, async_clients = self._take_all()
+        for client in clients:
+            client.close()
+        if not async_clients:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        for client in async_clients:
+            if loop is not None:
+                loop.create_task(client.aclose())
+                continue
+            try:
+                asyncio.run(client.aclose())
+            except Exception as e:
+                print(f"Closing async {client.model_type} client failed: {str(e)}")
+
+    async def aclose(self):
+        """Close all pooled clients and clear the registry, awaiting the async clients."""
+        clients, async_clients = self._take_all()
+        for client in clients:
+            client.close()
+        for client in async_clients:
+            await client.aclose()
+
+
+# Process-wide pool shared by all pipeline components
+_pool = ClientPool()
+
+
+def get_model_client(model_type: str = 'text',
+                     api_key: Optional[str] = None,
+                     api_base: Optional[str] = None) -> "ModelClient":
+    """Get the shared ModelClient for a model type."""
+    return _pool.get(model_type, api_key=api_key, api_base=api_base)
+
+
+def get_async_model_client(model_type: str = 'text',
+                           api_key: Optional[str] = None,
+                           api_base: Optional[str] = None) -> "AsyncModelClient":
+    """Get the shared AsyncModelClient for a model type."""
+    return _pool.get_async(model_type, api_key=api_key, api_base=api_base)
+
+
+def warm_up_clients(model_types: Optional[List[str]] = None) -> Dict[str, bool]:
+    """Pre-warm the shared clients, e.g. at service startup."""
+    return _pool.warm_up(model_types)
+
+
+def close_clients():
+    """Close the shared clients and their connection pools, e.g. at shutdown."""
+    _pool.close()
+
+
+async def aclose_clients():
+    """Asyncio counterpart of close_clients, for event-loop shutdown hooks."""
+    await _pool.aclose()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get reuse counters of the shared client pool."""
+    return _pool.get_stats()
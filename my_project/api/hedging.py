@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hedged requests to cut tail latency of slow provider calls.
+If a call has not returned within a percentile of its component's recent latency,
+a duplicate is fired and the first response wins; the other request is cancelled.
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import contextvars
+import concurrent.futures
+from collections import deque
+from typing import Dict, Any, Awaitable, Callable, Optional
+
+from config import settings
+from api.cancellation import CallCancelled
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize the tracker.
+
+        Args:
+            window: Number of recent latencies to keep
+        """
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+
+    def record(self, latency: float):
+        """Record the latency of a successful call in seconds."""
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Get a percentile of the recorded latencies.
+
+        Args:
+            percentile: Percentile between 0 and 100
+
+        Returns:
+            The latency in seconds, or None if there are not enough samples yet
+        """
+        with self._lock:
+            if len(self._samples) < settings.HEDGE_MIN_SAMPLES:
+                return None
+            samples = sorted(self._samples)
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+
+class _HedgeTimer:
+    """One thread firing scheduled hedges at their deadlines, instead of a sleeping thread per call."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._sequence = itertools.count()
+        self._thread = None
+
+    def schedule(self, delay: float, action: Callable[[], None]) -> list:
+        """Run action on the timer thread after delay seconds; returns a handle for cancel()."""
+        entry = [time.monotonic() + delay, next(self._sequence), action]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="hedge-timer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return entry
+
+    def cancel(self, entry: list):
+        """Drop a scheduled action that has not run yet."""
+        with self._cond:
+            entry[2] = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, action = heapq.heappop(self._heap)
+            if action is not None:
+                try:
+                    action()
+                except Exception as e:
+                    print(f"Hedge timer action failed: {str(e)}")
+
+
+class _Race:
+    """State shared by the primary request of a call and its hedge."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.primary_cancel = threading.Event()
+        self.hedge_cancel = threading.Event()
+        self.primary_done = False
+        self.timer = None
+        self.hedge: Optional[concurrent.futures.Future] = None
+
+
+class Hedger:
+    """Runs a component's provider calls with an optional hedged duplicate."""
+
+    def __init__(self, component: str, budget: float, executor: concurrent.futures.Executor,
+                 timer: _HedgeTimer):
+        """
+        Initialize the hedger.
+
+        Args:
+            component: Name of the component whose calls are hedged
+            budget: Maximum fraction of calls that may fire a duplicate
+            executor: Executor running the hedged duplicates
+            timer: Timer firing the duplicates at the hedge threshold
+        """
+        self.component = component
+        self.budget = budget
+        self.executor = executor
+        self.timer = timer
+        self.latency = LatencyTracker()
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0
+        }
+
+    def _try_spend_budget(self) -> bool:
+        """Reserve a hedge if the component is still within its budget."""
+        with self._lock:
+            if self._stats["hedged"] + 1 > self.budget * self._stats["calls"]:
+                return False
+            self._stats["hedged"] += 1
+            return True
+
+    def _timed(self, fn: Callable[[threading.Event], Any], cancel: threading.Event) -> Any:
+        """Run fn, feeding the latency tracker with successful calls."""
+        start_time = time.perf_counter()
+        result = fn(cancel)
+        self.latency.record(time.perf_counter() - start_time)
+        return result
+
+    def _fire_hedge(self, race: _Race, fn: Callable[[threading.Event], Any], delay: float,
+                    context: contextvars.Context):
+        """Timer action: start the duplicate if the primary is still running and the budget allows."""
+        with race.lock:
+            if race.primary_done or not self._try_spend_budget():
+                return
+            print(f"{self.component} call slower than p{settings.HEDGE_PERCENTILE:g} ({delay:.2f}s), firing hedged request")
+            # The duplicate runs with the caller's context (e.g. its lane priority)
+            race.hedge = self.executor.submit(context.run, self._run_hedge, race, fn)
+
+    def _run_hedge(self, race: _Race, fn: Callable[[threading.Event], Any]) -> Any:
+        """Run the duplicate; if it wins, stop the primary at its next chunk."""
+        result = self._timed(fn, race.hedge_cancel)
+        race.primary_cancel.set()
+        return result
+
+    def call(self, fn: Callable[[threading.Event], Any]) -> Any:
+        """
+        Call fn, firing a duplicate if it is slower than the hedge threshold.
+        The primary request runs on the calling thread; the duplicate runs on the executor.
+        Each gets its own cancel event, set once the other has returned, so the loser
+        stops at its next checkpoint and frees its connection and rate-limit slot.
+
+        Args:
+            fn: Function performing one provider request; takes a cancel event and
+                raises CallCancelled once it is set
+
+        Returns:
+            The result of whichever request returns first
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+
+        delay = self.latency.percentile(settings.HEDGE_PERCENTILE)
+        if delay is None:
+            # Not enough history yet to know what "slow" means
+            return self._timed(fn, threading.Event())
+
+        race = _Race()
+        race.timer = self.timer.schedule(delay, lambda: self._fire_hedge(
+            race, fn, delay, contextvars.copy_context()))
+        try:
+            result = self._timed(fn, race.primary_cancel)
+        except CallCancelled:
+            # The hedge won and stopped the primary
+            with self._lock:
+                self._stats["hedge_wins"] += 1
+            return race.hedge.result()
+        except Exception as error:
+            with race.lock:
+                race.primary_done = True
+                hedge = race.hedge
+            if hedge is None:
+                raise
+            # A running duplicate may still succeed where the primary failed
+            try:
+                result = hedge.result()
+            except Exception:
+                raise error
+            with self._lock:
+                self._stats["hedge_wins"] += 1
+            return result
+        finally:
+            self.timer.cancel(race.timer)
+            with race.lock:
+                race.primary_done = True
+                hedge = race.hedge
+
+        if hedge is not None:
+            # The primary won: stop the duplicate (or drop it if it has not started)
+            race.hedge_cancel.set()
+            hedge.cancel()
+        return result
+
+    async def _async_timed(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Asyncio counterpart of _timed."""
+        start_time = time.perf_counter()
+        result = await fn()
+        self.latency.record(time.perf_counter() - start_time)
+        return result
+
+    async def async_call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Asyncio counterpart of call. Both requests run as tasks on the caller's event
+        loop and the loser is stopped by cancelling its task, so fn takes no cancel event.
+        Latencies, the threshold and the budget are shared with the threaded calls.
+
+        Args:
+            fn: Coroutine function performing one provider request
+
+        Returns:
+            The result of whichever request returns first
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+
+        delay = self.latency.percentile(settings.HEDGE_PERCENTILE)
+        if delay is None:
+            # Not enough history yet to know what "slow" means
+            return await self._async_timed(fn)
+
+        primary = asyncio.ensure_future(self._async_timed(fn))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._try_spend_budget():
+                print(f"{self.component} call slower than p{settings.HEDGE_PERCENTILE:g} ({delay:.2f}s), firing hedged request")
+                # The duplicate task copies the caller's context (e.g. its lane priority)
+                tasks.append(asyncio.ensure_future(self._async_timed(fn)))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            with self._lock:
+                                self._stats["hedge_wins"] += 1
+                        return task.result()
+            # Both requests failed: report the primary's error
+            return primary.result()
+        finally:
+            # Stop the loser (or both, if the caller was cancelled)
+            for task in tasks:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedge counters and the current hedge threshold."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["budget"] = self.budget
+        stats["threshold"] = self.latency.percentile(settings.HEDGE_PERCENTILE)
+        return stats
+
+
+# Process-wide hedgers, one per hedged component
+_hedgers: Dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+_executor = None
+_timer = _HedgeTimer()
+
+
+def _get_hedger(component: str, budget: float) -> Hedger:
+    """Get the shared hedger of a component, creating it on first use."""
+    global _executor
+    with _hedgers_lock:
+        if _executor is None:
+            # Only threaded duplicates run here; primaries run on their callers' threads
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=settings.HEDGE_MAX_WORKERS, thread_name_prefix="hedge"
+            )
+        hedger = _hedgers.get(component)
+        if hedger is None:
+            hedger = _hedgers[component] = Hedger(component, budget, _executor, _timer)
+        return hedger
+
+
+def is_hedged(component: str) -> bool:
+    """Check whether a component has a hedge budget, i.e. its requests must honour cancellation."""
+    return bool(settings.HEDGE_BUDGETS.get(component))
+
+
+def hedged_call(component: str, fn: Callable[[threading.Event], Any]) -> Any:
+    """
+    Call fn, hedging it if the component has a hedge budget configured.
+
+    Args:
+        component: Name of the component making the request
+        fn: Function performing one provider request; takes a cancel event
+
+    Returns:
+        The result of fn
+    """
+    budget = settings.HEDGE_BUDGETS.get(component)
+    if not budget:
+        return fn(threading.Event())
+
+    return _get_hedger(component, budget).call(fn)
+
+
+async def async_hedged_call(component: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Asyncio counterpart of hedged_call.
+
+    Args:
+        component: Name of the component making the request
+        fn: Coroutine function performing one provider request
+
+    Returns:
+        The result of fn
+    """
+    budget = settings.HEDGE_BUDGETS.get(component)
+    if not budget:
+        return await fn()
+    return await _get_hedger(component, budget).async_call(fn)
+
+
+def get_hedge_stats() -> Dict[str, Dict[str, Any]]:
+    """Get hedge stats of all hedged components."""
+    with _hedgers_lock:
+        hedgers = dict(_hedgers)
+    return {component: hedger.get_stats() for component, hedger in hedgers.items()}
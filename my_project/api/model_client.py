@@ -7,20 +7,104 @@ This centralizes all API calls to OpenAI models for both text (LLM) and image (V
 """
 
 import os
+import time
+import threading
 import requests
 import json
-from typing import Dict, Any, List, Optional, Union
+import httpx
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional, Union, Iterator
 from config import settings
 from utils.llm_logger import LLMLogger
+from api.response_cache import is_cache_enabled, get_response_cache
+from api.single_flight import get_flight
+from api.resilience import get_policy, ProviderError
+from api.cancellation import check_cancelled
+from api.hedging import hedged_call, is_hedged
+from api.rate_limiter import get_limiter, estimate_tokens
+from api.call_metrics import CallMetrics
+from api.replay import get_recorder
 from openai import OpenAI
 
+class ThinkStripper:
+    """
+    Incrementally applies ModelClient.cut_think to streamed text, so a streamed
+    completion yields the same text as the non-streamed one.
+    Everything up to the first </think> is dropped, with or without an opening <think>,
+    and the text after it is emitted up to any second </think>, whitespace-stripped.
+    Until the first </think> arrives nothing can be emitted, as the tag may still come;
+    a stream without one is returned unchanged by flush, like cut_think does.
+    """
+    
+    TAG = '</think>'
+    
+    def __init__(self):
+        """Initialize the stripper before the closing tag."""
+        self.buffer = ''
+        self.after_tag = False
+        self.started = False
+        self.done = False
+    
+    def feed(self, text: str) -> str:
+        """
+        Feed the next streamed delta.
+        
+        Args:
+            text: The delta received from the provider
+            
+        Returns:
+            The part of the text that can be emitted now
+        """
+        if self.done:
+            return ''
+        self.buffer += text
+        if not self.after_tag:
+            if self.TAG not in self.buffer:
+                return ''
+            self.after_tag = True
+            self.buffer = self.buffer.split(self.TAG, 1)[1]
+        
+        if self.TAG in self.buffer:
+            # cut_think keeps only the text between the first and second closing tags
+            text, self.buffer = self.buffer.split(self.TAG, 1)[0], ''
+            self.done = True
+            return self._trim(text).rstrip()
+        
+        # Hold back a possible partial closing tag and trailing whitespace, which
+        # cut_think would strip at the end
+        hold = next((size for size in range(min(len(self.TAG) - 1, len(self.buffer)), 0, -1)
+                     if self.TAG.startswith(self.buffer[-size:])), 0)
+        ready = self.buffer[:len(self.buffer) - hold]
+        text = ready.rstrip()
+        self.buffer = ready[len(text):] + self.buffer[len(self.buffer) - hold:]
+        return self._trim(text)
+    
+    def flush(self) -> str:
+        """Flush anything still buffered at the end of the stream."""
+        text, self.buffer = self.buffer, ''
+        if self.done:
+            return ''
+        self.done = True
+        if not self.after_tag:
+            return text
+        return self._trim(text).rstrip()
+    
+    def _trim(self, text: str) -> str:
+        """Drop the whitespace right after the closing tag."""
+        if not self.started:
+            text = text.lstrip()
+            self.started = bool(text)
+        return text
+
+
 class ModelClient:
     """Client for interacting with OpenAI models."""
     
     def __init__(self, 
                 model_type: str = 'text',
                 api_key: Optional[str] = None, 
-                api_base: Optional[str] = None):
+                api_base: Optional[str] = None,
+                logger: Optional[LLMLogger] = None):
         """
         Initialize the client with OpenAI API credentials.
         
@@ -28,11 +112,16 @@ class ModelClient:
             model_type: Type of model ('text', 'image', or 'tts')
             api_key: OpenAI API key. If None, tries to get from environment.
             api_base: OpenAI endpoint. If None, tries to get from environment.
+            logger: Shared LLM logger. If None, a new log file is created.
         """
+        self.model_type = model_type
+        
         # Get API configuration based on model type
         config = settings.get_api_config(model_type)
         
-        self.api_key = api_key or config.get('api_key')
+        # Replays never reach a provider, so credentials are optional
+        replaying = settings.PROVIDER_MODE == "replay"
+        self.api_key = api_key or config.get('api_key') or ("replay" if replaying else None)
         if not self.api_key:
             raise ValueError(f"OpenAI API key is required for {model_type} model. Set it as an argument or {model_type.upper()}_API_KEY environment variable.")
         
@@ -46,20 +135,62 @@ class ModelClient:
             
         # For TTS model, we also need group_id for minimaxi API
         if model_type == 'tts':
-            self.group_id = config.get('group_id')
+            self.group_id = config.get('group_id') or ("replay" if replaying else None)
             print(self.group_id)
             if not self.group_id:
                 raise ValueError("Group ID is required for TTS model. Set it as TTS_GROUP_ID environment variable.")
         
+        # Keep-alive HTTP connection pool shared by all calls of this client
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=settings.CLIENT_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CLIENT_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.CLIENT_POOL_KEEPALIVE_EXPIRY
+            )
+        )
+        
         # Initialize OpenAI client (only for text and image models)
         if model_type in ['text', 'image']:
             self.client = OpenAI(
                 api_key=self.api_key,
-                base_url=self.api_base
+                base_url=self.api_base,
+                http_client=self.http_client,
+                max_retries=0  # Retries are handled by the resilience policy
             )
         
+        # The TTS endpoint is called through requests, so give it a pooled session too
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.CLIENT_POOL_MAX_KEEPALIVE,
+            pool_maxsize=settings.CLIENT_POOL_MAX_CONNECTIONS
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
         # Initialize the LLM logger
-        self.logger = LLMLogger()
+        self.logger = logger or LLMLogger()
+    
+    def warm_up(self) -> bool:
+        """
+        Open a connection to the provider so the first real request skips the TLS handshake.
+        
+        Returns:
+            True if the provider answered, False otherwise
+        """
+        try:
+            if self.model_type in ['text', 'image']:
+                self.http_client.head(self.api_base, timeout=5)
+            else:
+                self.session.head(self.api_base, timeout=5)
+            return True
+        except Exception as e:
+            print(f"Warm-up failed for {self.model_type} model at {self.api_base}: {e}")
+            return False
+    
+    def close(self):
+        """Close the pooled connections held by this client."""
+        self.http_client.close()
+        self.session.close()
         
     def cut_think(self, text: str) -> str:
         """
@@ -100,34 +231,275 @@ class ModelClient:
         if model is None:
             model = settings.get_api_config('text').get('model_name', 'deepseek-reasoner')
         
-        try:
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
+        metrics = CallMetrics()
+        recorder = get_recorder()
+        if recorder is not None and recorder.replaying:
+            return self._replay(recorder, component, prompt, {"model": model}, metrics)
+        
+        # Serve repeated calls from the on-disk cache for opted-in components
+        cache = get_response_cache() if is_cache_enabled(component) else None
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.make_key(model, prompt, temperature, max_tokens)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                self.logger.log_interaction(
+                    component=component,
+                    prompt=prompt,
+                    response=cached,
+                    metadata={
+                        "model": model,
+                        "temperature": temperature,
+                        "max_tokens": max_tokens,
+                        "cache": "hit",
+                        "cache_stats": cache.get_stats(),
+                        **metrics.as_metadata()
+                    }
+                )
+                if recorder is not None:
+                    recorder.record(component, prompt, metrics.as_metadata(), response=cached)
+                return cached
+        
+        policy = get_policy('text')
+        
+        limiter = get_limiter('text')
+        # Hedged requests are streamed so that the losing one can stop between chunks
+        hedged = is_hedged(component)
+        
+        def attempt(cancel: threading.Event) -> str:
+            check_cancelled(cancel)
+            with limiter.slot(tokens=estimate_tokens(prompt)) as wait:
+                check_cancelled(cancel)
+                metrics.record_attempt(wait)
+                if hedged:
+                    return self._read_completion_stream(self.client.chat.completions.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        timeout=policy.timeout
+                    ), cancel, metrics, limiter)
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=policy.timeout
+                )
+            if response.usage is not None:
+                limiter.record_usage(response.usage.completion_tokens)
+            metrics.record_usage(response.usage)
+            metrics.record_status(200)
+            return response.choices[0].message.content
+        
+        def request_text() -> str:
+            result = hedged_call(component, lambda cancel: policy.call(lambda: attempt(cancel)))
             
-            result = response.choices[0].message.content
             # 删去思考部分
             result = self.cut_think(result)
             # 删去json部分
             result = self.cut_json(result)
+            return result
+        
+        try:
+            # Identical concurrent requests share one upstream call
+            flight = get_flight('text')
+            result, coalesced = flight.do(
+                flight.make_key(self.api_base, model, prompt, temperature, max_tokens),
+                request_text
+            )
+            
+            metadata = {
+                "model": model,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "coalesced": coalesced
+            }
+            if cache is not None:
+                cache.set(cache_key, result)
+                metadata["cache"] = "miss"
+                metadata["cache_stats"] = cache.get_stats()
+            metadata.update(metrics.as_metadata())
+            
             # Log the interaction
             self.logger.log_interaction(
                 component=component,
                 prompt=prompt,
                 response=result,
-                metadata={
-                    "model": model,
-                    "temperature": temperature,
-                    "max_tokens": max_tokens
-                }
+                metadata=metadata
             )
+            if recorder is not None:
+                recorder.record(component, prompt, metadata, response=result)
             
             return result
         except Exception as e:
             print(f"Error in generate_text: {e}")
+            self._log_failure(component, prompt, {"model": model}, metrics, e)
+            raise
+    
+    def _read_completion_stream(self, stream, cancel: threading.Event, metrics: CallMetrics, limiter) -> str:
+        """
+        Collect the text of a streamed chat completion, stopping if the request is cancelled.
+        
+        Args:
+            stream: The opened completion stream
+            cancel: Event set once the request's result is no longer needed
+            metrics: Metrics of the call the request belongs to
+            limiter: Rate limiter charged with the completion tokens
+            
+        Returns:
+            The full message content
+        
+        Raises:
+            CallCancelled: If the cancel event was set before the stream ended
+        """
+        parts = []
+        try:
+            metrics.record_status(200)
+            for chunk in stream:
+                check_cancelled(cancel)
+                # The last chunk carries the usage of the whole stream
+                if chunk.usage is not None:
+                    metrics.record_usage(chunk.usage)
+                    limiter.record_usage(chunk.usage.completion_tokens)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    metrics.record_first_token()
+                    parts.append(chunk.choices[0].delta.content)
+        finally:
+            # Release the connection, also when the request is abandoned
+            stream.close()
+        return ''.join(parts)
+    
+    def generate_text_iter(self,
+                          prompt: str,
+                          model: str = None,
+                          temperature: float = 0.6,
+                          max_tokens: int = 8192,
+                          component: str = "unknown",
+                          cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """
+        Generate text using OpenAI's LLM, yielding deltas as they arrive.
+        
+        Args:
+            prompt: The input prompt
+            model: Model name to use (if None, uses default from config)
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum number of tokens to generate
+            component: Name of the component making the request
+            cancel: Optional event; once set, the stream is closed at the next chunk
+            
+        Yields:
+            Generated text deltas with the think block removed
+        """
+        # Use model from config if not provided
+        if model is None:
+            model = settings.get_api_config('text').get('model_name', 'deepseek-reasoner')
+        
+        metrics = CallMetrics()
+        stripper = ThinkStripper()
+        parts = []
+        recorder = get_recorder()
+        if recorder is not None and recorder.replaying:
+            for text in recorder.replay_iter(component, prompt):
+                if cancel is not None and cancel.is_set():
+                    break
+                metrics.record_first_token()
+                parts.append(text)
+                yield text
+            self.logger.log_interaction(
+                component=component,
+                prompt=prompt,
+                response=''.join(parts),
+                metadata={"model": model, "stream": True, "replay": True, **metrics.as_metadata()}
+            )
+            return
+        
+        try:
+            # Only opening the stream is retried; deltas already yielded cannot be replayed
+            policy = get_policy('text')
+            limiter = get_limiter('text')
+            
+            def open_stream():
+                with limiter.slot(tokens=estimate_tokens(prompt)) as wait:
+                    metrics.record_attempt(wait)
+                    return self.client.chat.completions.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        timeout=policy.timeout
+                    )
+            
+            stream = policy.call(open_stream)
+            metrics.record_status(200)
+            
+            cancelled = False
+            try:
+                for chunk in stream:
+                    # Reasoning models send chunks during the think phase too, so this
+                    # check runs every few tokens even before any text is yielded
+                    if cancel is not None and cancel.is_set():
+                        cancelled = True
+                        break
+                    # The last chunk carries the usage of the whole stream
+                    if chunk.usage is not None:
+                        metrics.record_usage(chunk.usage)
+                        limiter.record_usage(chunk.usage.completion_tokens)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    metrics.record_first_token()
+                    text = stripper.feed(delta)
+                    if text:
+                        parts.append(text)
+                        yield text
+                
+                if not cancelled:
+                    text = stripper.flush()
+                    if text:
+                        parts.append(text)
+                        yield text
+            except GeneratorExit:
+                cancelled = True
+                raise
+            finally:
+                # Release the connection if the consumer stops early
+                stream.close()
+                if cancelled:
+                    self.logger.log_interaction(
+                        component=component,
+                        prompt=prompt,
+                        response=''.join(parts),
+                        metadata={"model": model, "stream": True, "cancelled": True, **metrics.as_metadata()}
+                    )
+            if cancelled:
+                return
+            
+            # Log the interaction
+            metadata = {
+                "model": model,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": True,
+                **metrics.as_metadata()
+            }
+            self.logger.log_interaction(
+                component=component,
+                prompt=prompt,
+                response=''.join(parts),
+                metadata=metadata
+            )
+            if recorder is not None:
+                recorder.record(component, prompt, metadata, response=''.join(parts))
+        except Exception as e:
+            print(f"Error in generate_text_iter: {e}")
+            self._log_failure(component, prompt, {"model": model, "stream": True}, metrics, e)
             raise
     
     def generate_image(self, 
@@ -155,33 +527,52 @@ class ModelClient:
         if model is None:
             model = settings.get_api_config('image').get('model_name', 'dall-e-3')
         
+        metrics = CallMetrics()
+        recorder = get_recorder()
+        if recorder is not None and recorder.replaying:
+            return self._replay(recorder, component, prompt, {"model": model}, metrics)
+        
         try:
-            response = self.client.images.generate(
-                model=model,
-                prompt=prompt,
-                n=n,
-                size=size,
-                quality=quality
-            )
+            policy = get_policy('image')
+            
+            def attempt():
+                with get_limiter('image').slot() as wait:
+                    metrics.record_attempt(wait)
+                    return self.client.images.generate(
+                        model=model,
+                        prompt=prompt,
+                        n=n,
+                        size=size,
+                        quality=quality,
+                        timeout=policy.timeout
+                    )
+            
+            response = policy.call(attempt)
+            metrics.record_status(200)
             
             image_url = response.data[0].url
             
             # Log the interaction
+            metadata = {
+                "model": model,
+                "size": size,
+                "quality": quality,
+                "n": n,
+                **metrics.as_metadata()
+            }
             self.logger.log_interaction(
                 component=component,
                 prompt=prompt,
                 response=image_url,
-                metadata={
-                    "model": model,
-                    "size": size,
-                    "quality": quality,
-                    "n": n
-                }
+                metadata=metadata
             )
+            if recorder is not None:
+                recorder.record(component, prompt, metadata, response=image_url)
             
             return image_url
         except Exception as e:
             print(f"Error in generate_image: {e}")
+            self._log_failure(component, prompt, {"model": model}, metrics, e)
             raise
     
     def text_to_speech(self,
@@ -197,35 +588,319 @@ class ModelClient:
         Returns:
             Audio data as bytes
         """
-        # Get TTS configuration
-        config = settings.get_api_config('tts')
-        model = config.get('model_name', 'speech-02-turbo')
+        model = settings.get_api_config('tts').get('model_name', 'speech-02-turbo')
+        # Hedged requests are streamed so that the losing one can stop between chunks
+        hedged = is_hedged(component)
+        url, headers, payload = self._build_speech_request(text, stream=hedged)
+        metrics = CallMetrics()
+        recorder = get_recorder()
+        if recorder is not None and recorder.replaying:
+            return self._replay(recorder, component, text, {"model": model}, metrics)
+        
+        try:
+            # Identical concurrent requests share one upstream call
+            flight = get_flight('tts')
+            audio_data, coalesced = flight.do(
+                flight.make_key(url, payload),
+                lambda: hedged_call(component, lambda cancel: get_policy('tts').call(
+                    lambda: self._request_speech(url, headers, payload, tokens=estimate_tokens(text),
+                                                 metrics=metrics, cancel=cancel if hedged else None)
+                ))
+            )
+            
+            # Log the interaction
+            metadata = {
+                "model": model,
+                "voice_id": "male-qn-qingse",
+                "format": "mp3",
+                "coalesced": coalesced,
+                "prompt_chars": len(text),
+                **metrics.as_metadata()
+            }
+            self.logger.log_interaction(
+                component=component,
+                prompt=text,
+                response="[Binary audio data]",
+                metadata=metadata
+            )
+            if recorder is not None:
+                recorder.record(component, text, metadata, data=audio_data)
+            
+            return audio_data
+        except Exception as e:
+            print(f"Error in text_to_speech: {e}")
+            self._log_failure(component, text, {"model": model}, metrics, e)
+            raise
+    
+    def text_to_speech_stream(self,
+                             text: str,
+                             output_path: str,
+                             component: str = "unknown") -> str:
+        """
+        Convert text to speech with minimaxi's streaming API, writing audio to disk as it arrives.
+        Each hex chunk is decoded on its own, so memory stays bounded by one chunk.
+        
+        Args:
+            text: The text to convert to speech
+            output_path: Path of the audio file to write
+            component: Name of the component making the request
+            
+        Returns:
+            Path to the written audio file
+        """
+        model = settings.get_api_config('tts').get('model_name', 'speech-02-turbo')
+        url, headers, payload = self._build_speech_request(text, stream=True)
+        partial_path = output_path + ".part"
+        policy = get_policy('tts')
+        metrics = CallMetrics()
+        recorder = get_recorder()
+        if recorder is not None and recorder.replaying:
+            audio_data = self._replay(recorder, component, text, {"model": model, "stream": True}, metrics)
+            with open(output_path, 'wb') as f:
+                f.write(audio_data)
+            return output_path
+        
+        def attempt():
+            start_time = time.perf_counter()
+            first_audio_time = None
+            audio_bytes = 0
+            
+            with get_limiter('tts').slot(tokens=estimate_tokens(text)) as wait:
+                metrics.record_attempt(wait)
+                with self.session.post(url, headers=headers, data=payload,
+                                       stream=True, timeout=policy.timeout) as response:
+                    metrics.record_status(response.status_code)
+                    response.raise_for_status()
+                    
+                    # Each attempt starts the file from scratch
+                    with open(partial_path, 'wb') as f:
+                        for chunk in self._iter_speech_stream(response):
+                            f.write(chunk)
+                            f.flush()
+                            audio_bytes += len(chunk)
+                            if first_audio_time is None:
+                                first_audio_time = time.perf_counter()
+                                metrics.record_first_token()
+            
+            if not audio_bytes:
+                raise ProviderError("TTS stream returned no audio")
+            
+            return {
+                "time_to_first_audio": round(first_audio_time - start_time, 3),
+                "total_time": round(time.perf_counter() - start_time, 3),
+                "audio_bytes": audio_bytes
+            }
+        
+        try:
+            timings = policy.call(attempt)
+            os.replace(partial_path, output_path)
+            
+            # Log the interaction
+            metadata = {
+                "model": model,
+                "voice_id": "male-qn-qingse",
+                "format": "mp3",
+                "stream": True,
+                "prompt_chars": len(text),
+                **timings,
+                **metrics.as_metadata()
+            }
+            self.logger.log_interaction(
+                component=component,
+                prompt=text,
+                response="[Binary audio data]",
+                metadata=metadata
+            )
+            if recorder is not None:
+                with open(output_path, 'rb') as f:
+                    recorder.record(component, text, metadata, data=f.read())
+            
+            return output_path
+        except Exception as e:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            print(f"Error in text_to_speech_stream: {e}")
+            self._log_failure(component, text, {"model": model, "stream": True}, metrics, e)
+            raise
+    
+    def _iter_speech_stream(self, response: requests.Response,
+                            cancel: Optional[threading.Event] = None) -> Iterator[bytes]:
+        """
+        Decode the audio chunks of a streamed minimaxi text-to-speech response.
+        
+        Args:
+            response: The streamed response
+            cancel: Optional event; once set, CallCancelled is raised at the next event
+            
+        Yields:
+            Decoded audio chunks
+        """
+        for line in response.iter_lines():
+            check_cancelled(cancel)
+            audio = self._decode_speech_event(line)
+            if audio:
+                yield audio
+    
+    @staticmethod
+    def _decode_speech_event(line: bytes) -> Optional[bytes]:
+        """
+        Decode one line of a streamed minimaxi text-to-speech response.
+        
+        Args:
+            line: A line of the response body
+            
+        Returns:
+            The audio chunk carried by the line, or None if it carries none
+        """
+        if not line.startswith(b'data:'):
+            return None
+        event = json.loads(line[5:])
+        
+        base_resp = event.get('base_resp') or {}
+        if base_resp.get('status_code'):
+            raise ProviderError(f"TTS API error: {base_resp.get('status_msg')}")
+        
+        # The final event repeats the whole audio alongside extra_info; skip it
+        if 'extra_info' in event:
+            return None
+        
+        audio_hex = (event.get('data') or {}).get('audio')
+        return bytes.fromhex(audio_hex) if audio_hex else None
+    
+    def _request_speech(self, url: str, headers: Dict[str, str], payload: str, tokens: int = 0,
+                        metrics: Optional[CallMetrics] = None,
+                        cancel: Optional[threading.Event] = None) -> bytes:
+        """
+        Send one request to the minimaxi text-to-speech API.
+        
+        Args:
+            url: The t2a endpoint including the group id
+            headers: Request headers
+            payload: JSON-encoded request body
+            tokens: Estimated tokens of the text, charged to the TTS rate limit
+            metrics: Metrics of the call this request belongs to
+            cancel: Cancel event of a hedged request; its payload must ask for a stream,
+                    which is read chunk by chunk so the request can stop once cancelled
+            
+        Returns:
+            Decoded audio data
+        """
+        metrics = metrics or CallMetrics()
+        with get_limiter('tts').slot(tokens=tokens) as wait:
+            check_cancelled(cancel)
+            metrics.record_attempt(wait)
+            if cancel is not None:
+                with self.session.post(url, headers=headers, data=payload, stream=True,
+                                       timeout=get_policy('tts').timeout) as response:
+                    metrics.record_status(response.status_code)
+                    response.raise_for_status()
+                    audio_data = b"".join(self._iter_speech_stream(response, cancel))
+                if not audio_data:
+                    raise ProviderError("TTS stream returned no audio")
+                return audio_data
+            response = self.session.post(url, headers=headers, data=payload, timeout=get_policy('tts').timeout)
+        metrics.record_status(response.status_code)
+        response.raise_for_status()  # Raise an exception for bad status codes
+        
+        return self._decode_speech(response.json())
+    
+    def _replay(self, recorder, component: str, prompt: str, metadata: Dict[str, Any],
+                metrics: CallMetrics) -> Union[str, bytes]:
+        """
+        Serve a call from its recording and log it like a live call.
+        
+        Args:
+            recorder: The replaying ProviderRecorder
+            component: Name of the component making the request
+            prompt: The input prompt (or text for TTS)
+            metadata: Call parameters to log
+            metrics: Metrics collected for the call
+            
+        Returns:
+            The recorded text or binary data
+        """
+        result = recorder.replay(component, prompt)
+        self.logger.log_interaction(
+            component=component,
+            prompt=prompt,
+            response=result if isinstance(result, str) else "[Binary data]",
+            metadata={**metadata, "replay": True, **metrics.as_metadata()}
+        )
+        return result
+    
+    def _log_failure(self, component: str, prompt: str, metadata: Dict[str, Any],
+                     metrics: CallMetrics, error: Exception):
+        """
+        Log a failed call with its metrics, so slow or failing components show up in the logs.
+        
+        Args:
+            component: Name of the component making the request
+            prompt: The input prompt
+            metadata: Call parameters to log
+            metrics: Metrics collected for the call
+            error: The error that ended the call
+        """
+        metrics.record_error(error)
+        self.logger.log_interaction(
+            component=component,
+            prompt=prompt,
+            response="",
+            metadata={**metadata, "error": str(error), **metrics.as_metadata()}
+        )
+    
+    def speech_settings(self) -> Dict[str, Any]:
+        """
+        Get the voice and audio settings sent with every text-to-speech request.
+        
+        Returns:
+            Dictionary with model, voice_id, speed, sample_rate and format
+        """
+        return {
+            "model": settings.get_api_config('tts').get('model_name', 'speech-02-turbo'),
+            "voice_id": "English_expressive_narrator",
+            "speed": 0.83,
+            "sample_rate": 32000,
+            "format": "mp3"
+        }
+    
+    def _build_speech_request(self, text: str, stream: bool = False):
+        """
+        Build the URL, headers and JSON body of a minimaxi text-to-speech request.
+        
+        Args:
+            text: The text to convert to speech
+            stream: Whether to request streamed audio chunks
+            
+        Returns:
+            Tuple of URL, headers and JSON-encoded payload
+        """
+        voice = self.speech_settings()
         
         # Construct the API URL with group_id
         url = f"{self.api_base}/v1/t2a_v2?GroupId={self.group_id}"
         
         # Fixed payload parameters as specified by the user
         payload = json.dumps({
-            "model": model,
+            "model": voice["model"],
             "text": text,
-            "stream": False,
+            "stream": stream,
             "timber_weights": [
                 {
-                    "voice_id": "English_expressive_narrator",
+                    "voice_id": voice["voice_id"],
                     "weight": 1
                 }
             ],
             "voice_setting": {
                 "voice_id": "",
-                "speed": 0.83,
+                "speed": voice["speed"],
                 "vol": 1,
                 "pitch": 0,
                 "latex_read": False
             },
             "audio_setting": {
-                "sample_rate": 32000,
+                "sample_rate": voice["sample_rate"],
                 "bitrate": 128000,
-                "format": "mp3",
+                "format": voice["format"],
                 "channel": 1
             },
             "language_boost": "auto"
@@ -235,40 +910,30 @@ class ModelClient:
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
         }
+        return url, headers, payload
+    
+    def _decode_speech(self, parsed_json: Dict[str, Any]) -> bytes:
+        """
+        Extract and decode the hex audio of a minimaxi text-to-speech response.
         
-        try:
-            response = requests.post(url, headers=headers, data=payload)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            
-            parsed_json = response.json()
-            print(f"TTS API response: {parsed_json}")  # Debug info
-            
-            # Check if the expected structure exists
-            if 'data' not in parsed_json:
-                print(f"Error: 'data' field not found in response. Available keys: {list(parsed_json.keys())}")
-                raise KeyError("'data' field not found in API response")
-            
-            if 'audio' not in parsed_json['data']:
-                print(f"Error: 'audio' field not found in data. Available keys: {list(parsed_json['data'].keys())}")
-                raise KeyError("'audio' field not found in data")
-            
-            # Extract audio data from the response
-            audio_hex = parsed_json['data']['audio']
-            audio_data = bytes.fromhex(audio_hex)
-            
-            # Log the interaction
-            self.logger.log_interaction(
-                component=component,
-                prompt=text,
-                response="[Binary audio data]",
-                metadata={
-                    "model": model,
-                    "voice_id": "male-qn-qingse",
-                    "format": "mp3"
-                }
-            )
+        Args:
+            parsed_json: The parsed JSON response
             
-            return audio_data
-        except Exception as e:
-            print(f"Error in text_to_speech: {e}")
-            raise 
\ No newline at end of file
+        Returns:
+            Decoded audio data
+        """
+        print(f"TTS API response: {parsed_json}")  # Debug info
+        
+        # Check if the expected structure exists
+        if 'data' not in parsed_json:
+            print(f"Error: 'data' field not found in response. Available keys: {list(parsed_json.keys())}")
+            raise KeyError("'data' field not found in API response")
+        
+        if 'audio' not in parsed_json['data']:
+            print(f"Error: 'audio' field not found in data. Available keys: {list(parsed_json['data'].keys())}")
+            raise KeyError("'audio' field not found in data")
+        
+        # Extract audio data from the response
+        audio_hex = parsed_json['data']['audio']
+        audio_data = bytes.fromhex(audio_hex)
+        return audio_data
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Per-provider rate limiting shared by all pipeline stages and eval scripts.
+Each provider gets token buckets for requests and tokens per minute plus a cap
+on requests in flight. Callers queue until a slot is free. Callers running in a
+lower-priority lane (utils/lanes.py) cannot use the share of each limit reserved
+for priority 0.
+"""
+
+import time
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Any, Iterator, AsyncIterator
+
+from config import settings
+from utils.lanes import current_priority
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float):
+        """
+        Initialize the bucket.
+
+        Args:
+            per_minute: Refill rate and capacity per minute (0 means unlimited)
+        """
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, amount: float = 1, reserve: float = 0) -> float:
+        """
+        Take the amount from the bucket if available.
+        Amounts larger than the capacity wait for a full bucket.
+
+        Args:
+            amount: Tokens to take
+            reserve: Tokens that must be left in the bucket afterwards
+
+        Returns:
+            0 if the amount was taken, otherwise the seconds until it could be
+        """
+        if not self.capacity:
+            return 0.0
+        amount = min(amount, self.capacity)
+        needed = min(amount + reserve, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= needed:
+                self.tokens -= amount
+                return 0.0
+            return (needed - self.tokens) / self.rate
+
+    def acquire(self, amount: float = 1, reserve: float = 0):
+        """Block until the amount can be taken from the bucket."""
+        while True:
+            wait = self.try_acquire(amount, reserve)
+            if not wait:
+                return
+            time.sleep(min(wait, 1.0))
+
+    async def async_acquire(self, amount: float = 1, reserve: float = 0):
+        """Wait without blocking the event loop until the amount can be taken."""
+        while True:
+            wait = self.try_acquire(amount, reserve)
+            if not wait:
+                return
+            await asyncio.sleep(min(wait, 1.0))
+
+    def consume(self, amount: float):
+        """Take tokens without waiting (the bucket may go negative), e.g. for actual usage."""
+        if not self.capacity:
+            return
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+
+
+class ProviderLimiter:
+    """Requests-per-minute, tokens-per-minute and in-flight limits of one provider."""
+
+    def __init__(self, provider: str, config: Dict[str, Any]):
+        """
+        Initialize the limiter.
+
+        Args:
+            provider: Provider name ('text', 'tts' or 'image')
+            config: Limits from settings.RATE_LIMITS
+        """
+        self.provider = provider
+        self.requests = TokenBucket(config.get('requests_per_minute', 0))
+        self.tokens = TokenBucket(config.get('tokens_per_minute', 0))
+        max_in_flight = config.get('max_in_flight', 0)
+        self.in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        # Lower-priority lanes share what is left after the reserved slots (at least one)
+        reserved = min(int(max_in_flight * settings.LANE_RESERVED_SHARE), max_in_flight - 1) if max_in_flight else 0
+        self.reserved_in_flight = reserved
+        self.background_in_flight = threading.BoundedSemaphore(max_in_flight - reserved) if reserved else None
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "background_requests": 0,
+            "queued": 0,
+            "in_flight": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0
+        }
+
+    @contextmanager
+    def slot(self, tokens: int = 0) -> Iterator[float]:
+        """
+        Wait for the provider's limits, then hold an in-flight slot.
+
+        Args:
+            tokens: Estimated tokens of the request
+
+        Yields:
+            Time spent queueing in seconds
+        """
+        start_time = time.perf_counter()
+        background = current_priority() > 0
+        with self._lock:
+            self._stats["queued"] += 1
+
+        held = []
+        try:
+            self.requests.acquire(1, self._reserve(self.requests, background))
+            if tokens:
+                self.tokens.acquire(tokens, self._reserve(self.tokens, background))
+            for semaphore in self._semaphores(background):
+                semaphore.acquire()
+                held.append(semaphore)
+        except BaseException:
+            self._release_semaphores(held)
+            with self._lock:
+                self._stats["queued"] -= 1
+            raise
+
+        wait = self._record_admitted(start_time, background)
+        try:
+            yield wait
+        finally:
+            self._release(held)
+
+    @asynccontextmanager
+    async def async_slot(self, tokens: int = 0) -> AsyncIterator[float]:
+        """
+        Asyncio counterpart of slot; shares the same limits as threaded callers.
+
+        Args:
+            tokens: Estimated tokens of the request
+
+        Yields:
+            Time spent queueing in seconds
+        """
+        start_time = time.perf_counter()
+        background = current_priority() > 0
+        with self._lock:
+            self._stats["queued"] += 1
+
+        held = []
+        try:
+            await self.requests.async_acquire(1, self._reserve(self.requests, background))
+            if tokens:
+                await self.tokens.async_acquire(tokens, self._reserve(self.tokens, background))
+            for semaphore in self._semaphores(background):
+                while not semaphore.acquire(blocking=False):
+                    await asyncio.sleep(0.05)
+                held.append(semaphore)
+        except BaseException:
+            self._release_semaphores(held)
+            with self._lock:
+                self._stats["queued"] -= 1
+            raise
+
+        wait = self._record_admitted(start_time, background)
+        try:
+            yield wait
+        finally:
+            self._release(held)
+
+    @staticmethod
+    def _reserve(bucket: TokenBucket, background: bool) -> float:
+        """Tokens a caller must leave in the bucket: the reserved share for lower-priority lanes."""
+        return bucket.capacity * settings.LANE_RESERVED_SHARE if background else 0.0
+
+    def _semaphores(self, background: bool) -> list:
+        """In-flight semaphores a caller takes, in order: lower-priority lanes first take a background slot."""
+        semaphores = []
+        if background and self.background_in_flight is not None:
+            semaphores.append(self.background_in_flight)
+        if self.in_flight is not None:
+            semaphores.append(self.in_flight)
+        return semaphores
+
+    @staticmethod
+    def _release_semaphores(held: list):
+        for semaphore in reversed(held):
+            semaphore.release()
+
+    def _record_admitted(self, start_time: float, background: bool = False) -> float:
+        """Move a request from the queue to in flight and record its queue wait."""
+        wait = time.perf_counter() - start_time
+        with self._lock:
+            self._stats["queued"] -= 1
+            self._stats["requests"] += 1
+            if background:
+                self._stats["background_requests"] += 1
+            self._stats["in_flight"] += 1
+            self._stats["queue_wait_total"] += wait
+            self._stats["queue_wait_max"] = max(self._stats["queue_wait_max"], wait)
+        return wait
+
+    def _release(self, held: list):
+        """Free the in-flight slots of a finished request."""
+        self._release_semaphores(held)
+        with self._lock:
+            self._stats["in_flight"] -= 1
+
+    def record_usage(self, tokens: int):
+        """Charge tokens reported by the provider after the request (e.g. completion tokens)."""
+        if tokens:
+            self.tokens.consume(tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request and queue-wait metrics of the provider."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_wait_avg"] = round(stats["queue_wait_total"] / stats["requests"], 4) if stats["requests"] else 0.0
+        stats["reserved_in_flight"] = self.reserved_in_flight
+        return stats
+
+
+# Process-wide limiters, one per provider
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """Get the shared limiter for a provider ('text', 'tts' or 'image')."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ProviderLimiter(provider, settings.RATE_LIMITS.get(provider, {}))
+        return _limiters[provider]
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Get metrics of all provider limiters, including queue-wait time."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {provider: limiter.get_stats() for provider, limiter in limiters.items()}
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Record/replay provider backend for reproducible benchmarks.
+In record mode every successful provider call is written in the LLMLogger JSONL format,
+with binary results (audio, images) stored as artifact files next to it. In replay mode
+calls are served from those recordings, matched by component and prompt hash, with the
+recorded latency re-injected or with zero latency. Plain LLMLogger logs can be replayed
+too, for the text calls they contain.
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional, Union, Iterator, AsyncIterator, Tuple
+
+from config import settings
+from utils.llm_logger import LLMLogger
+from utils.log_summary import iter_log_files, iter_entries
+
+# Streamed replays are split into this many deltas
+REPLAY_STREAM_PARTS = 20
+
+
+class ReplayMissError(KeyError):
+    """Raised in replay mode when no recording matches a call."""
+
+
+class ProviderRecorder:
+    """Records provider calls to, or replays them from, a recording directory."""
+
+    def __init__(self,
+                 mode: str = None,
+                 directory: str = None,
+                 latency: str = None,
+                 strict: Optional[bool] = None):
+        """
+        Initialize the recorder.
+
+        Args:
+            mode: 'record' or 'replay' (defaults to settings)
+            directory: Directory of the recordings (defaults to settings)
+            latency: 'recorded' to re-inject recorded latencies, 'zero' to answer at once
+            strict: Fail on a prompt that was not recorded instead of falling back to
+                    the component's recordings in order (defaults to settings)
+        """
+        self.mode = mode or settings.PROVIDER_MODE
+        self.directory = directory or settings.REPLAY_DIR
+        self.latency = latency or settings.REPLAY_LATENCY
+        self.strict = settings.REPLAY_STRICT if strict is None else strict
+
+        self._lock = threading.Lock()
+        self._logger: Optional[LLMLogger] = None
+        self._by_key: Optional[Dict[str, deque]] = None
+        self._by_component: Dict[str, deque] = defaultdict(deque)
+        self._stats = {
+            "recorded": 0,
+            "replayed": 0,
+            "fallbacks": 0
+        }
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def make_key(component: str, prompt: str) -> str:
+        """Key matching a call to its recordings: component plus prompt hash."""
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return f"{component}|{prompt_hash}"
+
+    def record(self,
+               component: str,
+               prompt: str,
+               metadata: Dict[str, Any],
+               response: Optional[str] = None,
+               data: Optional[bytes] = None):
+        """
+        Record one successful provider call.
+
+        Args:
+            component: Name of the component making the request
+            prompt: The input prompt (or text for TTS)
+            metadata: Call metadata including wall_time and time_to_first_token
+            response: Text result of the call
+            data: Binary result of the call (audio or image), stored as an artifact
+        """
+        metadata = dict(metadata)
+        if data is not None:
+            digest = hashlib.sha256(data).hexdigest()
+            artifact = os.path.join("artifacts", f"{digest}.bin")
+            path = os.path.join(self.directory, artifact)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path + ".part", 'wb') as f:
+                    f.write(data)
+                os.replace(path + ".part", path)
+            metadata["artifact"] = artifact
+            response = "[Binary data]"
+
+        with self._lock:
+            if self._logger is None:
+                self._logger = LLMLogger(log_dir=self.directory)
+            self._stats["recorded"] += 1
+        self._logger.log_interaction(component=component, prompt=prompt, response=response, metadata=metadata)
+
+    def _load_index(self):
+        """Index every successful recorded call by key and by component, in log order."""
+        by_key = defaultdict(deque)
+        for entry in iter_entries(iter_log_files(self.directory)):
+            metadata = entry.get("metadata") or {}
+            if metadata.get("error"):
+                continue
+            response = entry.get("response")
+            if not metadata.get("artifact") and (not response or response.startswith("[Binary")):
+                # Binary results are only replayable when their artifact was recorded
+                continue
+            component = entry.get("component", "unknown")
+            by_key[self.make_key(component, entry.get("prompt") or "")].append(entry)
+            self._by_component[component].append(entry)
+        self._by_key = by_key
+        print(f"Replay: loaded {sum(len(v) for v in by_key.values())} recordings from {self.directory}")
+
+    def _lookup(self, component: str, prompt: str) -> Dict[str, Any]:
+        """Find the recording of a call, cycling through repeated recordings of the same key."""
+        with self._lock:
+            if self._by_key is None:
+                self._load_index()
+
+            entries = self._by_key.get(self.make_key(component, prompt))
+            if not entries:
+                if self.strict or not self._by_component.get(component):
+                    raise ReplayMissError(f"No recording for {component} prompt: {prompt[:80]!r}")
+                # Prompts that embed earlier random output fall back to recording order
+                entries = self._by_component[component]
+                self._stats["fallbacks"] += 1
+
+            entry = entries.popleft()
+            entries.append(entry)
+            self._stats["replayed"] += 1
+            return entry
+
+    def _load(self, entry: Dict[str, Any]) -> Union[str, bytes]:
+        """Get the recorded text, or the artifact data of a binary result."""
+        artifact = (entry.get("metadata") or {}).get("artifact")
+        if artifact:
+            with open(os.path.join(self.directory, artifact), 'rb') as f:
+                return f.read()
+        return entry.get("response") or ""
+
+    def _delays(self, entry: Dict[str, Any]) -> Tuple[float, float]:
+        """Recorded time to first token and total time of a call (zero in zero-latency mode)."""
+        if self.latency == "zero":
+            return 0.0, 0.0
+        metadata = entry.get("metadata") or {}
+        total = metadata.get("wall_time", metadata.get("total_time")) or 0.0
+        first = metadata.get("time_to_first_token")
+        return (total if first is None else min(first, total)), total
+
+    def replay(self, component: str, prompt: str) -> Union[str, bytes]:
+        """
+        Serve a call from its recording after the recorded latency.
+
+        Args:
+            component: Name of the component making the request
+            prompt: The input prompt (or text for TTS)
+
+        Returns:
+            The recorded text, or the recorded binary data
+
+        Raises:
+            ReplayMissError: If no recording matches the call
+        """
+        entry = self._lookup(component, prompt)
+        time.sleep(self._delays(entry)[1])
+        return self._load(entry)
+
+    async def async_replay(self, component: str, prompt: str) -> Union[str, bytes]:
+        """Asyncio counterpart of replay."""
+        entry = self._lookup(component, prompt)
+        await asyncio.sleep(self._delays(entry)[1])
+        return self._load(entry)
+
+    def _split(self, text: str) -> list:
+        """Split a recorded text into evenly sized stream deltas."""
+        size = max(1, -(-len(text) // REPLAY_STREAM_PARTS))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def replay_iter(self, component: str, prompt: str) -> Iterator[str]:
+        """
+        Replay a streamed call: the first delta arrives after the recorded time to first
+        token and the rest are spread evenly over the remaining recorded time.
+
+        Args:
+            component: Name of the component making the request
+            prompt: The input prompt
+
+        Yields:
+            Deltas of the recorded text
+        """
+        entry = self._lookup(component, prompt)
+        first, total = self._delays(entry)
+        parts = self._split(self._load(entry))
+        time.sleep(first)
+        for index, part in enumerate(parts):
+            if index:
+                time.sleep((total - first) / len(parts))
+            yield part
+
+    async def async_replay_iter(self, component: str, prompt: str) -> AsyncIterator[str]:
+        """Asyncio counterpart of replay_iter."""
+        entry = self._lookup(component, prompt)
+        first, total = self._delays(entry)
+        parts = self._split(self._load(entry))
+        await asyncio.sleep(first)
+        for index, part in enumerate(parts):
+            if index:
+                await asyncio.sleep((total - first) / len(parts))
+            yield part
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get recorded/replayed counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["mode"] = self.mode
+        return stats
+
+
+# Process-wide recorder, created on first use
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> Optional[ProviderRecorder]:
+    """Get the shared recorder, or None when providers are called live."""
+    global _recorder
+    if settings.PROVIDER_MODE not in ("record", "replay"):
+        return None
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = ProviderRecorder()
+        return _recorder
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Resilience policy for provider calls: timeouts, jittered retries and a circuit breaker.
+Policies are configured per provider ('text', 'tts', 'image') in config/settings.py.
+"""
+
+import time
+import random
+import asyncio
+import threading
+from typing import Dict, Any, Callable, Optional, Awaitable
+
+import httpx
+import requests
+import openai
+
+from config import settings
+from api.cancellation import CallCancelled
+
+
+class ProviderError(Exception):
+    """Error returned by a provider that is not raised by an HTTP client library."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+
+def get_status_code(error: Exception) -> Optional[int]:
+    """Get the HTTP status code carried by a provider error, if any."""
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        response = getattr(error, 'response', None)
+        status_code = getattr(response, 'status_code', None)
+    return status_code
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Get the Retry-After delay (in seconds) sent with a provider error, if any."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Check whether an error is transient: 429, 5xx, timeouts and connection errors."""
+    status_code = get_status_code(error)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, (
+        requests.ConnectionError,
+        requests.Timeout,
+        httpx.TransportError,
+        openai.APIConnectionError
+    ))
+
+
+class CircuitBreaker:
+    """Fails fast after repeated provider failures, then lets one trial call through."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Current state: 'closed', 'open' or 'half_open'."""
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Check whether a call may go to the provider."""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Give up a half-open trial that ended without an outcome (e.g. the caller was cancelled)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Count a provider failure and open the circuit past the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class ResiliencePolicy:
+    """Runs provider calls with retries, jittered exponential backoff and a circuit breaker."""
+
+    def __init__(self, provider: str, config: Dict[str, Any]):
+        """
+        Initialize the policy.
+
+        Args:
+            provider: Provider name ('text', 'tts' or 'image')
+            config: Policy settings from settings.RESILIENCE_POLICIES
+        """
+        self.provider = provider
+        self.timeout = config.get('timeout', 60)
+        self.max_retries = config.get('max_retries', 3)
+        self.backoff_base = config.get('backoff_base', 1.0)
+        self.backoff_max = config.get('backoff_max', 30.0)
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.get('breaker_threshold', 5),
+            reset_timeout=config.get('breaker_reset_timeout', 60)
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay before the given retry."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def retry_delay(self, error: Exception, attempt: int) -> float:
+        """
+        Delay before the given retry: the provider's Retry-After if it sent one, else backoff.
+        Both are capped at backoff_max, so a long Retry-After cannot pin a request thread.
+        """
+        return min(get_retry_after(error) or self.backoff(attempt), self.backoff_max)
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """
+        Call fn under the policy.
+
+        Args:
+            fn: Function performing one provider request
+
+        Returns:
+            The result of fn
+
+        Raises:
+            CircuitOpenError: If the provider's circuit is open
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit breaker open for {self.provider} provider, failing fast")
+
+            try:
+                result = fn()
+            except CallCancelled:
+                # Stopped by the caller, not failed: neither retried nor counted
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered; the request itself is at fault
+                    self.breaker.record_success()
+                    raise
+
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+
+                delay = self.retry_delay(e, attempt)
+                attempt += 1
+                print(f"{self.provider} provider call failed ({e}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Interrupted, not failed: let the next caller run the trial instead
+                self.breaker.release_trial()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    async def async_call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn under the policy; the asyncio counterpart of call.
+
+        Args:
+            fn: Coroutine function performing one provider request
+
+        Returns:
+            The result of fn
+
+        Raises:
+            CircuitOpenError: If the provider's circuit is open
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit breaker open for {self.provider} provider, failing fast")
+
+            try:
+                result = await fn()
+            except CallCancelled:
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.record_success()
+                    raise
+
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+
+                delay = self.retry_delay(e, attempt)
+                attempt += 1
+                print(f"{self.provider} provider call failed ({e}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (e.g. a stream client disconnected), not failed: let the
+                # next caller run the trial instead
+                self.breaker.release_trial()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+
+# Process-wide policies, one per provider
+_policies: Dict[str, ResiliencePolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_policy(provider: str) -> ResiliencePolicy:
+    """Get the shared resilience policy for a provider ('text', 'tts' or 'image')."""
+    with _policies_lock:
+        if provider not in _policies:
+            _policies[provider] = ResiliencePolicy(
+                provider, settings.RESILIENCE_POLICIES.get(provider, {})
+            )
+        return _policies[provider]
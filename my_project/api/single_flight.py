@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Single-flight coalescing of identical in-flight provider calls.
+While a call is running, identical calls wait for it and share its result
+instead of going to the provider again.
+"""
+
+import asyncio
+import hashlib
+import threading
+from typing import Dict, Any, Awaitable, Callable, Tuple
+
+from config import settings
+
+
+class _Call:
+    """A provider call in flight, shared by its waiters."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share the same key."""
+
+    def __init__(self, name: str, enabled: bool = True):
+        """
+        Initialize a single-flight group.
+
+        Args:
+            name: Name of the group (used in stats)
+            enabled: If False, every call goes straight to the provider
+        """
+        self.name = name
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        # Asyncio calls, keyed by event loop and key since a future belongs to one loop
+        self._async_calls: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._stats = {
+            "calls": 0,
+            "upstream_calls": 0,
+            "coalesced": 0
+        }
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a key from the parts that identify a call."""
+        return hashlib.sha256("|".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn, or wait for an identical call already in flight.
+
+        Args:
+            key: Key identifying the call
+            fn: Function performing the upstream call
+
+        Returns:
+            Tuple of the result and whether it was shared from another caller
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key) if self.enabled else None
+            if call is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call()
+                if self.enabled:
+                    self._calls[key] = call
+                self._stats["upstream_calls"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    async def async_do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Asyncio counterpart of do: await fn, or an identical call already in flight
+        on the same event loop.
+
+        Args:
+            key: Key identifying the call
+            fn: Coroutine function performing the upstream call
+
+        Returns:
+            Tuple of the result and whether it was shared from another caller
+        """
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        with self._lock:
+            self._stats["calls"] += 1
+
+        while True:
+            with self._lock:
+                future = self._async_calls.get(call_key) if self.enabled else None
+                if future is not None:
+                    self._stats["coalesced"] += 1
+                    leader = False
+                else:
+                    future = loop.create_future()
+                    if self.enabled:
+                        self._async_calls[call_key] = future
+                    self._stats["upstream_calls"] += 1
+                    leader = True
+
+            if not leader:
+                try:
+                    # Shielded so that a waiter being cancelled does not cancel the shared call
+                    return await asyncio.shield(future), True
+                except asyncio.CancelledError:
+                    if not future.cancelled():
+                        raise
+                    # The caller running the call was cancelled: make the call ourselves
+                    with self._lock:
+                        self._stats["coalesced"] -= 1
+                    continue
+
+            try:
+                result = await fn()
+                future.set_result(result)
+                return result, False
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Retrieved here so that a call nobody waited for is not logged as unhandled
+                future.exception()
+                raise
+            finally:
+                with self._lock:
+                    if self._async_calls.get(call_key) is future:
+                        del self._async_calls[call_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call counters and the coalesce rate of the group."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["coalesce_rate"] = round(stats["coalesced"] / stats["calls"], 3) if stats["calls"] else 0.0
+        return stats
+
+
+# Process-wide groups, one per kind of provider call
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_flight(name: str) -> SingleFlight:
+    """Get the shared single-flight group for a kind of call ('text', 'tts', 'image')."""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name, enabled=settings.SINGLE_FLIGHT_ENABLED)
+        return _groups[name]
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Get stats of all single-flight groups, e.g. to see upstream calls saved."""
+    with _groups_lock:
+        groups = dict(_groups)
+    return {name: group.get_stats() for name, group in groups.items()}
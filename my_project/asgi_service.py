@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASGI service for the Peace Processor Pipeline.
+Serves the same routes as service.py on the asyncio pipeline (AsyncOrchestrator), so
+a worker process keeps many requests waiting on providers at once instead of pinning
+a thread per request, and runs under uvicorn with several worker processes.
+Requests need no lane worker pools here, but run at their lane's priority for the
+provider rate limits.
+
+Usage:
+    python asgi_service.py
+    gunicorn asgi_service:app -k uvicorn.workers.UvicornWorker --workers 4 \\
+        --bind 0.0.0.0:8008 --keep-alive 5 --graceful-timeout 300
+"""
+
+import os
+import asyncio
+import contextlib
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from api.client_pool import get_pool_stats, aclose_clients
+from api.single_flight import get_single_flight_stats
+from api.hedging import get_hedge_stats
+from api.rate_limiter import get_rate_limiter_stats
+from api.audio_cache import get_audio_cache
+from pipeline.async_orchestrator import get_async_orchestrator
+from utils.sse import format_event
+from utils.lanes import get_lane, lane_priority
+from utils.file_utils import DEFAULT_OUTPUT_PATH, ensure_upload_dirs
+from config import settings
+
+
+def _error(message: str, status_code: int) -> JSONResponse:
+    return JSONResponse({"success": False, "message": message}, status_code=status_code)
+
+
+async def _read_json(request: Request, required: str) -> Tuple[Optional[Dict[str, Any]], Optional[JSONResponse]]:
+    """Parse the JSON body and check the required field, returning (data, error response)."""
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    if not data:
+        return None, _error("No JSON data provided", 400)
+    if not data.get(required):
+        return None, _error(f"{required} is required", 400)
+    return data, None
+
+
+def _session_id(data: Dict[str, Any]) -> str:
+    # 使用提供的session_id或生成新的时间戳
+    return data.get('session_id') or datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+async def process_pipeline(request: Request) -> JSONResponse:
+    """Run the whole pipeline; same payload and response as service.py /process."""
+    data, error = await _read_json(request, 'user_prompt')
+    if error:
+        return error
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = os.path.join(data.get('output_path', DEFAULT_OUTPUT_PATH), "temp", timestamp)
+    try:
+        with lane_priority(get_lane('process').priority):
+            final_video_path = await get_async_orchestrator().run_pipeline(
+                user_prompt=data['user_prompt'],
+                emotional_state=data.get('emotional_state', 'neutral'),
+                output_path=output_path
+            )
+    except Exception as e:
+        return _error(f"Pipeline execution failed: {str(e)}", 500)
+    return JSONResponse({
+        "success": True,
+        "video_path": final_video_path,
+        "message": "Pipeline execution completed successfully"
+    })
+
+
+async def generate_text(request: Request) -> JSONResponse:
+    """Generate meditation text only; same payload and response as service.py."""
+    data, error = await _read_json(request, 'user_prompt')
+    if error:
+        return error
+
+    try:
+        with lane_priority(get_lane('text').priority):
+            generated_text = await get_async_orchestrator().generate_text_only(
+                user_prompt=data['user_prompt'],
+                emotional_state=data.get('emotional_state', 'neutral')
+            )
+    except Exception as e:
+        return _error(f"Text generation failed: {str(e)}", 500)
+    return JSONResponse({
+        "success": True,
+        "text": generated_text,
+        "message": "Text generation completed successfully"
+    })
+
+
+async def generate_image(request: Request) -> JSONResponse:
+    """Generate an image for a text; same payload and response as service.py."""
+    data, error = await _read_json(request, 'text_content')
+    if error:
+        return error
+
+    session_id = _session_id(data)
+    output_path = os.path.join(data.get('output_path', DEFAULT_OUTPUT_PATH), "images", session_id)
+    try:
+        with lane_priority(get_lane('image').priority):
+            image_path = await get_async_orchestrator().generate_image_only(
+                text_content=data['text_content'],
+                output_path=output_path
+            )
+    except Exception as e:
+        return _error(f"Image generation failed: {str(e)}", 500)
+    return JSONResponse({
+        "success": True,
+        "image_path": image_path,
+        "session_id": session_id,
+        "message": "Image generation completed successfully"
+    })
+
+
+async def generate_video(request: Request) -> JSONResponse:
+    """Generate a video for a text and optional image; same payload and response as service.py."""
+    data, error = await _read_json(request, 'text_content')
+    if error:
+        return error
+
+    session_id = _session_id(data)
+    output_path = os.path.join(data.get('output_path', DEFAULT_OUTPUT_PATH), "videos", session_id)
+    try:
+        with lane_priority(get_lane('video').priority):
+            video_path = await get_async_orchestrator().generate_video_only(
+                text_content=data['text_content'],
+                image_path=data.get('image_path'),
+                output_path=output_path
+            )
+    except Exception as e:
+        return _error(f"Video generation failed: {str(e)}", 500)
+    return JSONResponse({
+        "success": True,
+        "video_path": video_path,
+        "session_id": session_id,
+        "message": "Video generation completed successfully"
+    })
+
+
+async def generate_text_stream(request: Request):
+    """
+    Stream meditation text as Server-Sent Events, in the same format as service.py.
+    When the client disconnects the server cancels this response, which closes the
+    chunk generators and with them the upstream LLM stream.
+    """
+    data, error = await _read_json(request, 'user_prompt')
+    if error:
+        return error
+
+    async def events():
+        chunks = get_async_orchestrator().generate_text_stream(
+            user_prompt=data['user_prompt'],
+            emotional_state=data.get('emotional_state', 'neutral')
+        )
+        event_id = 0
+        next_chunk = None
+        try:
+            yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+            while True:
+                # Keep waiting on the same pending chunk across keep-alives; wait_for
+                # would cancel it, and with it the stream, on every timeout
+                next_chunk = next_chunk or asyncio.ensure_future(chunks.__anext__())
+                done, _ = await asyncio.wait({next_chunk}, timeout=settings.SSE_HEARTBEAT_INTERVAL)
+                if not done:
+                    yield ": keep-alive\n\n"
+                    continue
+                event_id += 1
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    yield format_event("[DONE]", event="done", event_id=event_id)
+                    return
+                except Exception as e:
+                    yield format_event(f"[ERROR]: {str(e)}", event="error", event_id=event_id)
+                    return
+                finally:
+                    next_chunk = None
+                yield format_event(chunk, event_id=event_id)
+        finally:
+            if next_chunk is not None:
+                next_chunk.cancel()
+                with contextlib.suppress(BaseException):
+                    await next_chunk
+            await chunks.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        # Stop proxies (e.g. nginx) from buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+async def health_check(request: Request) -> JSONResponse:
+    """Health check endpoint."""
+    return JSONResponse({
+        "status": "healthy",
+        "service": "Peace Processor Pipeline",
+        "server": "asgi",
+        "pid": os.getpid(),
+        "client_pool": get_pool_stats(),
+        "single_flight": get_single_flight_stats(),
+        "hedging": get_hedge_stats(),
+        "rate_limits": get_rate_limiter_stats(),
+        "tts_cache": get_audio_cache().get_stats() if settings.TTS_CACHE_ENABLED else None
+    })
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    """Per-worker start-up (upload directories, pipeline components) and shutdown (client connections)."""
+    ensure_upload_dirs()
+    if settings.ORCHESTRATOR_PREWARM:
+        # Component construction is blocking (imports, filesystem checks); keep the loop free
+        warm_up = asyncio.get_running_loop().run_in_executor(None, get_async_orchestrator().warm_up)
+        warm_up.add_done_callback(lambda f: print(f"Orchestrator warm-up (pid {os.getpid()}): {f.result()}")
+                                  if not f.exception() else None)
+    yield
+    await aclose_clients()
+
+
+app = Starlette(
+    routes=[
+        Route('/process', process_pipeline, methods=['POST']),
+        Route('/generate-text', generate_text, methods=['POST']),
+        Route('/generate-image', generate_image, methods=['POST']),
+        Route('/generate-video', generate_video, methods=['POST']),
+        Route('/generate-text-stream', generate_text_stream, methods=['POST']),
+        Route('/health', health_check, methods=['GET'])
+    ],
+    lifespan=lifespan
+)
+
+
+def main():
+    import uvicorn
+
+    # Workers are separate processes, so uvicorn needs the import string, not the app object
+    uvicorn.run(
+        "asgi_service:app",
+        host=settings.ASGI_HOST,
+        port=settings.ASGI_PORT,
+        workers=settings.ASGI_WORKERS,
+        timeout_keep_alive=settings.ASGI_KEEPALIVE,
+        timeout_graceful_shutdown=settings.ASGI_GRACEFUL_TIMEOUT
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarking tools: local provider stand-ins, load tests and stage benchmarks.
+"""
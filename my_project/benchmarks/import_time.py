@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cold-start budget check for the service.
+Imports service.py in a fresh interpreter with -X importtime and reports the slowest
+imports, flags provider SDKs that are loaded eagerly, then starts the service in a
+subprocess and measures how long it takes until /health answers. Exits 1 when a budget
+is exceeded, so it can gate CI.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --import-budget 0.8 --startup-budget 1.5 --top 15
+
+The import check runs on every push (.github/workflows/import-budget.yml).
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import urllib.request
+from typing import Dict, Any, List
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Deferred until first use; importing any of these with service.py is a regression
+DEFERRED_MODULES = ["openai", "dashscope", "httpx", "requests", "pipeline.intention_recognition",
+                    "pipeline.prompt_creator", "pipeline.image_prompt_creator", "pipeline.text_to_speech",
+                    "api.model_client", "api.async_model_client"]
+
+HEALTH_SERVER = (
+    "import sys, service\n"
+    "from werkzeug.serving import make_server\n"
+    "server = make_server('127.0.0.1', int(sys.argv[1]), service.app, threaded=True)\n"
+    "server.serve_forever()\n"
+)
+
+
+def _environment() -> Dict[str, str]:
+    """Environment of the measured interpreters: no warm-up, so only the import is timed."""
+    env = dict(os.environ)
+    env.setdefault("CLIENT_POOL_PREWARM", "false")
+    env.setdefault("ORCHESTRATOR_PREWARM", "false")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def measure_imports(module: str) -> Dict[str, Any]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        Total import time in seconds and the per-module entries (self and cumulative seconds)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR, env=_environment(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self": int(self_us) / 1e6,
+            "cumulative": int(cumulative_us) / 1e6
+        })
+
+    # Interpreter start-up imports (site, encodings) are listed too but not counted
+    target = next(entry for entry in reversed(entries) if entry["depth"] == 0 and entry["module"] == module)
+    return {
+        "module": module,
+        "total": round(target["cumulative"], 4),
+        "entries": entries
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_startup(timeout: float) -> float:
+    """
+    Start the service in a subprocess and time how long /health takes to answer.
+
+    Args:
+        timeout: Seconds to wait for /health before giving up
+
+    Returns:
+        Seconds from process start to the first successful /health response
+    """
+    port = _free_port()
+    start_time = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", HEALTH_SERVER, str(port)], cwd=PROJECT_DIR,
+                               env=_environment(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        while time.perf_counter() - start_time < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Service exited during start-up:\n{process.stderr.read()[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start_time
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"/health did not answer within {timeout:.0f}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def print_report(imports: Dict[str, Any], top: int) -> List[str]:
+    """
+    Print the slowest imports and return the deferred modules that were imported eagerly.
+    """
+    print(f"\n=== import {imports['module']}: {imports['total']:.3f}s ===")
+    print(f"{'cumulative':>11}{'self':>9}  module")
+    for entry in sorted(imports["entries"], key=lambda item: item["cumulative"], reverse=True)[:top]:
+        print(f"{entry['cumulative']:>11.4f}{entry['self']:>9.4f}  {'  ' * entry['depth']}{entry['module']}")
+
+    loaded = {entry["module"] for entry in imports["entries"]}
+    eager = [module for module in DEFERRED_MODULES if module in loaded]
+    if eager:
+        print(f"\nImported eagerly (should be deferred): {', '.join(eager)}")
+    return eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time and start-up budget check for the service')
+    parser.add_argument('--module', type=str, default='service', help='Module to import')
+    parser.add_argument('--import-budget', type=float, default=1.0, help='Maximum import time in seconds')
+    parser.add_argument('--startup-budget', type=float, default=2.0,
+                        help='Maximum seconds from process start until /health answers')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per measurement; the fastest counts')
+    parser.add_argument('--top', type=int, default=20, help='Slowest imports to list')
+    parser.add_argument('--skip-startup', action='store_true', help='Only measure the import')
+    parser.add_argument('--output', type=str, default=None, help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    # The fastest run is the least disturbed by disk cache and scheduling noise
+    imports = min((measure_imports(args.module) for _ in range(args.runs)), key=lambda run: run["total"])
+    eager = print_report(imports, args.top)
+
+    results = {
+        "module": args.module,
+        "import_time": imports["total"],
+        "import_budget": args.import_budget,
+        "eager_imports": eager,
+        "startup_time": None,
+        "startup_budget": args.startup_budget
+    }
+    failed = bool(eager) or imports["total"] > args.import_budget
+    print(f"\nImport time:   {imports['total']:.3f}s (budget {args.import_budget:.3f}s)")
+
+    if not args.skip_startup:
+        results["startup_time"] = round(min(measure_startup(args.startup_budget * 5) for _ in range(args.runs)), 4)
+        failed = failed or results["startup_time"] > args.startup_budget
+        print(f"/health ready: {results['startup_time']:.3f}s (budget {args.startup_budget:.3f}s)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if failed:
+        print("\nStart-up budget exceeded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Concurrent load-test harness for the Flask service.
+Simulated users run a weighted mix of scenarios, such as the frontend's
+text -> image -> video session, while the number of users ramps up in steps.
+Each step reports throughput, p50/p95/p99 and error rate per endpoint, and the
+run ends with a saturation curve (users vs throughput, latency and errors).
+
+Usage:
+    python -m benchmarks.stub_providers &
+    PROVIDER_STUB_URL=http://127.0.0.1:8090 python service.py &
+    python -m benchmarks.load_test --users 1,5,10,25,50 --step-duration 60
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+import concurrent.futures
+from collections import defaultdict
+from typing import Dict, Any, List, Callable, Optional
+
+import requests
+
+from utils.log_summary import Reservoir
+
+PROMPTS = [
+    ("I feel stressed and need help with relaxation", "anxious"),
+    ("I can't fall asleep because my mind keeps racing", "restless"),
+    ("Work has been overwhelming and I want to reset", "tired"),
+    ("I had an argument with a friend and feel hurt", "sad"),
+    ("I want to start my morning with more focus", "neutral")
+]
+
+
+class EndpointStats:
+    """Latency samples and error counts of one endpoint within a step."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency = Reservoir()
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "throughput": round(self.requests / duration, 3) if duration else 0.0,
+            "p50": self.latency.percentile(50),
+            "p95": self.latency.percentile(95),
+            "p99": self.latency.percentile(99)
+        }
+
+
+class LoadTest:
+    """Runs simulated users against the service and collects per-endpoint statistics."""
+
+    def __init__(self, base_url: str, timeout: float, think_time: float, output_path: str):
+        """
+        Initialize the load test.
+
+        Args:
+            base_url: Base URL of the service
+            timeout: Timeout of one HTTP request in seconds
+            think_time: Mean pause between a user's scenarios in seconds
+            output_path: output_path sent to the service for generated files
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.think_time = think_time
+        self.output_path = output_path
+        self._lock = threading.Lock()
+        self._stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.sessions_completed = 0
+
+    def _record(self, endpoint: str, latency: float, ok: bool):
+        with self._lock:
+            stats = self._stats[endpoint]
+            stats.requests += 1
+            stats.latency.add(latency)
+            if not ok:
+                stats.errors += 1
+
+    def _post(self, http: requests.Session, endpoint: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """POST to an endpoint and record its latency; returns the JSON body on success."""
+        start_time = time.perf_counter()
+        result = None
+        try:
+            response = http.post(f"{self.base_url}{endpoint}", json=payload, timeout=self.timeout)
+            if response.status_code == 200:
+                body = response.json()
+                if body.get('success'):
+                    result = body
+        except (requests.RequestException, ValueError):
+            pass
+        self._record(endpoint, time.perf_counter() - start_time, result is not None)
+        return result
+
+    def scenario_session(self, http: requests.Session):
+        """The frontend flow: text, then an image and a video for the same session."""
+        user_prompt, emotional_state = random.choice(PROMPTS)
+        text = self._post(http, '/generate-text', {"user_prompt": user_prompt, "emotional_state": emotional_state})
+        if text is None:
+            return
+        image = self._post(http, '/generate-image', {"text_content": text['text'], "output_path": self.output_path})
+        if image is None:
+            return
+        video = self._post(http, '/generate-video', {
+            "text_content": text['text'],
+            "image_path": image['image_path'],
+            "session_id": image['session_id'],
+            "output_path": self.output_path
+        })
+        if video is not None:
+            with self._lock:
+                self.sessions_completed += 1
+
+    def scenario_process(self, http: requests.Session):
+        """The one-shot full pipeline."""
+        user_prompt, emotional_state = random.choice(PROMPTS)
+        self._post(http, '/process', {
+            "user_prompt": user_prompt,
+            "emotional_state": emotional_state,
+            "output_path": self.output_path
+        })
+
+    def scenario_text(self, http: requests.Session):
+        """Text generation only."""
+        user_prompt, emotional_state = random.choice(PROMPTS)
+        self._post(http, '/generate-text', {"user_prompt": user_prompt, "emotional_state": emotional_state})
+
+    def scenario_stream(self, http: requests.Session):
+        """
+        Streamed text generation, recording time to the first text event and total time.
+        The retry preamble and keep-alive comments do not count as the first chunk; a
+        stream ending in an 'error' event, or without a 'done' event, is a failure.
+        """
+        user_prompt, emotional_state = random.choice(PROMPTS)
+        start_time = time.perf_counter()
+        first_chunk = None
+        ok = False
+        try:
+            with http.post(f"{self.base_url}/generate-text-stream",
+                           json={"user_prompt": user_prompt, "emotional_state": emotional_state},
+                           stream=True, timeout=self.timeout) as response:
+                if response.status_code == 200:
+                    event, has_data = "message", False
+                    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                        if line:
+                            # Comments (": keep-alive") and id/retry fields carry no text
+                            if line.startswith("event:"):
+                                event = line[len("event:"):].strip()
+                            elif line.startswith("data:"):
+                                has_data = True
+                            continue
+                        # A blank line ends the frame
+                        if has_data and event == "message" and first_chunk is None:
+                            first_chunk = time.perf_counter() - start_time
+                        if has_data and event in ("done", "error"):
+                            ok = event == "done"
+                            break
+                        event, has_data = "message", False
+        except requests.RequestException:
+            ok = False
+        self._record('/generate-text-stream', time.perf_counter() - start_time, ok)
+        if first_chunk is not None:
+            self._record('/generate-text-stream (first chunk)', first_chunk, True)
+
+    def _user(self, scenarios: List[Callable], weights: List[float], deadline: float):
+        """One simulated user: run scenarios until the deadline, with think time in between."""
+        with requests.Session() as http:
+            while time.monotonic() < deadline:
+                random.choices(scenarios, weights)[0](http)
+                if self.think_time:
+                    time.sleep(random.expovariate(1.0 / self.think_time))
+
+    def run_step(self, users: int, duration: float, mix: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Run one ramp step with a fixed number of concurrent users.
+
+        Args:
+            users: Number of concurrent simulated users
+            duration: Seconds during which users start new scenarios
+            mix: Scenario name to weight
+
+        Returns:
+            Per-endpoint statistics of the step
+        """
+        with self._lock:
+            self._stats = defaultdict(EndpointStats)
+            self.sessions_completed = 0
+
+        scenarios = [getattr(self, f"scenario_{name}") for name in mix]
+        weights = list(mix.values())
+        start_time = time.monotonic()
+        deadline = start_time + duration
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=users) as executor:
+            futures = [executor.submit(self._user, scenarios, weights, deadline) for _ in range(users)]
+            for future in futures:
+                future.result()
+
+        # Scenarios in flight at the deadline finish, so measure the real elapsed time
+        elapsed = time.monotonic() - start_time
+        with self._lock:
+            endpoints = {endpoint: stats.summary(elapsed) for endpoint, stats in sorted(self._stats.items())}
+            totals = EndpointStats()
+            for endpoint, stats in self._stats.items():
+                if endpoint.endswith('(first chunk)'):
+                    continue
+                totals.requests += stats.requests
+                totals.errors += stats.errors
+                for sample in stats.latency.samples:
+                    totals.latency.add(sample)
+            sessions = self.sessions_completed
+
+        return {
+            "users": users,
+            "elapsed": round(elapsed, 1),
+            "sessions_completed": sessions,
+            "endpoints": endpoints,
+            "total": totals.summary(elapsed)
+        }
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def print_step(step: Dict[str, Any]):
+    """Print the per-endpoint table of one step."""
+    print(f"\n=== {step['users']} users, {step['elapsed']}s, {step['sessions_completed']} sessions completed ===")
+    print(f"{'endpoint':<38}{'reqs':>7}{'err %':>8}{'req/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}")
+    for endpoint, stats in list(step['endpoints'].items()) + [("TOTAL", step['total'])]:
+        print(f"{endpoint:<38}{stats['requests']:>7}{stats['error_rate'] * 100:>8.1f}{stats['throughput']:>8.2f}"
+              f"{_format_seconds(stats['p50']):>8}{_format_seconds(stats['p95']):>8}{_format_seconds(stats['p99']):>8}")
+
+
+def print_saturation(steps: List[Dict[str, Any]]):
+    """Print throughput, latency and errors as users ramp up."""
+    print("\n=== Saturation curve ===")
+    print(f"{'users':>6}{'req/s':>9}{'sessions/s':>12}{'p50':>8}{'p95':>8}{'p99':>8}{'err %':>8}")
+    for step in steps:
+        total = step['total']
+        print(f"{step['users']:>6}{total['throughput']:>9.2f}"
+              f"{step['sessions_completed'] / step['elapsed'] if step['elapsed'] else 0:>12.3f}"
+              f"{_format_seconds(total['p50']):>8}{_format_seconds(total['p95']):>8}{_format_seconds(total['p99']):>8}"
+              f"{total['error_rate'] * 100:>8.1f}")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse a scenario mix such as 'session=0.6,text=0.3,stream=0.1'."""
+    mix = {}
+    for item in spec.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if not hasattr(LoadTest, f"scenario_{name}"):
+            raise ValueError(f"Unknown scenario: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent load test for the pipeline service')
+    parser.add_argument('--base-url', type=str, default='http://localhost:8008', help='Base URL of the service')
+    parser.add_argument('--users', type=str, default='1,5,10,25,50',
+                        help='Comma-separated concurrent users of each ramp step')
+    parser.add_argument('--step-duration', type=float, default=60, help='Seconds per ramp step')
+    parser.add_argument('--mix', type=str, default='session=0.6,text=0.2,stream=0.15,process=0.05',
+                        help='Weighted scenarios: session, process, text, stream')
+    parser.add_argument('--think-time', type=float, default=1.0, help='Mean pause between scenarios of a user')
+    parser.add_argument('--timeout', type=float, default=600, help='Timeout of one HTTP request')
+    parser.add_argument('--output-path', type=str, default='load_test_output',
+                        help='output_path sent to the service for generated files')
+    parser.add_argument('--json', type=str, default=None, help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    load_test = LoadTest(args.base_url, args.timeout, args.think_time, args.output_path)
+    mix = parse_mix(args.mix)
+
+    steps = []
+    for users in [int(value) for value in args.users.split(',')]:
+        print(f"\nRamping to {users} users for {args.step_duration:.0f}s...")
+        step = load_test.run_step(users, args.step_duration, mix)
+        print_step(step)
+        steps.append(step)
+
+    print_saturation(steps)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"mix": mix, "steps": steps}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
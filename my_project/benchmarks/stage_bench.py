@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Per-stage benchmark suite for the pipeline.
+Every provider is replaced by the local stand-in server (benchmarks/stub_providers.py),
+started in-process with zero latency by default, so the timings measure local overhead:
+client and rate-limiter bookkeeping, hex decoding and file writes, FFmpeg work and the
+orchestration itself. FFmpeg stages run on synthetic lavfi media.
+
+Results are saved as JSON; --compare flags stages that got slower than a previous run.
+
+Usage:
+    python -m benchmarks.stage_bench --iterations 5 --output bench_results.json
+    python -m benchmarks.stage_bench --compare bench_results.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import platform
+import threading
+import subprocess
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+
+from utils.log_summary import Reservoir
+
+SAMPLE_PROMPT = ("I feel stressed and need help with relaxation", "anxious")
+SAMPLE_INTENTION = {
+    "intention": "relaxation",
+    "theme": "mindfulness",
+    "emotional_context": "anxious",
+    "rewritten_prompt": "A short guided meditation to release the stress of a long day",
+    "key_concepts": ["breath", "calm", "presence"]
+}
+SAMPLE_SCRIPT = (
+    "Find a comfortable position and gently close your eyes. <#1.0#> "
+    "Breathe in slowly through your nose, and out through your mouth. <#0.5#> "
+    "Notice the weight of your body resting where you are. "
+) * 12
+
+
+def start_stub_server(latency: str) -> str:
+    """
+    Start the provider stand-ins on a free local port in a background thread.
+
+    Args:
+        latency: Latency distribution used for every stand-in endpoint
+
+    Returns:
+        Base URL of the stand-in server
+    """
+    from werkzeug.serving import make_server
+    from benchmarks import stub_providers
+
+    stub_providers.config = stub_providers.StubConfig(stub_providers.parse_args([
+        '--text-ttft', latency, '--token-delay', 'fixed:0', '--tts-latency', latency,
+        '--tts-chunk-delay', 'fixed:0', '--image-latency', latency
+    ]))
+    server = make_server('127.0.0.1', 0, stub_providers.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="stub-providers", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def make_synthetic_media(directory: str, seconds: int) -> Dict[str, str]:
+    """
+    Create narration, music and image files with FFmpeg lavfi sources.
+
+    Args:
+        directory: Directory to write the media to
+        seconds: Duration of the narration (the music is half as long, so it loops)
+
+    Returns:
+        Dictionary with narration, music and image paths
+    """
+    media = {
+        "narration": os.path.join(directory, "narration.mp3"),
+        "music": os.path.join(directory, "music.mp3"),
+        "image": os.path.join(directory, "image.png")
+    }
+    commands = [
+        ["-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}", "-c:a", "libmp3lame", media["narration"]],
+        ["-f", "lavfi", "-i", f"anoisesrc=color=pink:duration={max(1, seconds // 2)}", "-c:a", "libmp3lame", media["music"]],
+        ["-f", "lavfi", "-i", "gradients=s=1024x1024", "-frames:v", "1", media["image"]]
+    ]
+    for command in commands:
+        subprocess.run(["ffmpeg", "-y", "-v", "error", *command], check=True)
+    return media
+
+
+def time_stage(fn: Callable[[], Any], iterations: int, warmup: int) -> Dict[str, Any]:
+    """
+    Time a stage.
+
+    Args:
+        fn: Function running the stage once
+        iterations: Timed runs
+        warmup: Untimed runs first (connection set-up, caches)
+
+    Returns:
+        Timing statistics in seconds
+    """
+    for _ in range(warmup):
+        fn()
+    samples = Reservoir()
+    total = 0.0
+    for _ in range(iterations):
+        start_time = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start_time
+        samples.add(elapsed)
+        total += elapsed
+    return {
+        "iterations": iterations,
+        "mean": round(total / iterations, 4),
+        "min": round(min(samples.samples), 4),
+        "p50": round(samples.percentile(50), 4),
+        "p95": round(samples.percentile(95), 4),
+        "max": round(max(samples.samples), 4)
+    }
+
+
+def build_stages(work_dir: str, media: Optional[Dict[str, str]]) -> Dict[str, Callable[[], Any]]:
+    """Create the pipeline components and return one callable per stage."""
+    from pipeline.intention_recognition import IntentionRecognizer
+    from pipeline.prompt_creator import PromptCreator
+    from pipeline.image_prompt_creator import ImagePromptCreator
+    from pipeline.text_to_speech import TextToSpeech
+    from pipeline.video_synthesizer import VideoSynthesizer
+    from pipeline.orchestrator import Orchestrator
+
+    recognizer = IntentionRecognizer()
+    prompt_creator = PromptCreator()
+    image_prompt_creator = ImagePromptCreator()
+    tts = TextToSpeech(chunked=False)
+    chunked_tts = TextToSpeech(chunked=True)
+    synthesizer = VideoSynthesizer()
+    orchestrator = Orchestrator()
+
+    def path(name: str) -> str:
+        return os.path.join(work_dir, name)
+
+    stages = {
+        "intention_recognizer.process": lambda: recognizer.process(*SAMPLE_PROMPT),
+        "prompt_creator.create_prompt": lambda: prompt_creator.create_prompt(SAMPLE_INTENTION),
+        "image_prompt_creator.create_prompt": lambda: image_prompt_creator.create_prompt(SAMPLE_INTENTION),
+        "image_prompt_creator.generate_image": lambda: image_prompt_creator.generate_image(
+            SAMPLE_INTENTION["rewritten_prompt"], path("image/image.png")),
+        "text_to_speech.convert": lambda: tts.convert(SAMPLE_SCRIPT[:500], path("tts/narration.mp3")),
+        "text_to_speech.convert (chunked)": lambda: chunked_tts.convert(SAMPLE_SCRIPT, path("tts/narration_chunked.mp3")),
+        "orchestrator.run_pipeline": lambda: orchestrator.run_pipeline(*SAMPLE_PROMPT, output_path=path("pipeline"))
+    }
+    if media is not None:
+        stages["video_synthesizer._mix_audio"] = lambda: synthesizer._mix_audio(
+            media["narration"], media["music"], path("mixed_audio.mp3"))
+        stages["video_synthesizer._create_video_from_image_and_audio"] = lambda: (
+            synthesizer._create_video_from_image_and_audio(media["image"], media["narration"], path("video.mp4")))
+    return stages
+
+
+def compare(results: Dict[str, Any], baseline_path: str, threshold: float) -> bool:
+    """
+    Print the change of each stage's p50 against a baseline run.
+
+    Returns:
+        True if any stage regressed by more than the threshold
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)["stages"]
+
+    regressed = False
+    print(f"\n=== Compared with {baseline_path} (p50) ===")
+    for stage, timing in results["stages"].items():
+        before = baseline.get(stage)
+        if not before:
+            print(f"{stage:<56}{'new':>10}")
+            continue
+        change = (timing["p50"] - before["p50"]) / before["p50"] if before["p50"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{stage:<56}{before['p50']:>9.4f}s -> {timing['p50']:>8.4f}s {change * 100:+7.1f}%{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-stage pipeline benchmarks with stand-in providers')
+    parser.add_argument('--iterations', type=int, default=5, help='Timed runs per stage')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs per stage before timing')
+    parser.add_argument('--latency', type=str, default='fixed:0',
+                        help='Stand-in provider latency distribution (fixed:0 measures local overhead only)')
+    parser.add_argument('--media-seconds', type=int, default=30, help='Duration of the synthetic narration')
+    parser.add_argument('--stages', type=str, default=None, help='Comma-separated subset of stages to run')
+    parser.add_argument('--output', type=str, default=None, help='Write the results to this JSON file')
+    parser.add_argument('--compare', type=str, default=None, help='Baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='p50 slowdown counted as a regression')
+    args = parser.parse_args()
+
+    # Providers must point at the stand-ins before the settings module is imported
+    work_dir = tempfile.mkdtemp(prefix="stage_bench_")
+    os.environ["PROVIDER_STUB_URL"] = start_stub_server(args.latency)
+    os.environ.setdefault("PROVIDER_MODE", "live")
+    os.environ.setdefault("TTS_CACHE_ENABLED", "false")
+    os.environ.setdefault("RESPONSE_CACHE_COMPONENTS", "")
+    os.environ.setdefault("LLM_LOG_DIR", os.path.join(work_dir, "logs"))
+
+    try:
+        media = make_synthetic_media(work_dir, args.media_seconds) if shutil.which("ffmpeg") else None
+        if media is None:
+            print("FFmpeg not found, skipping the video synthesizer stages")
+
+        stages = build_stages(work_dir, media)
+        if args.stages:
+            selected = [name.strip() for name in args.stages.split(',')]
+            stages = {name: fn for name, fn in stages.items() if name in selected}
+
+        results: Dict[str, Any] = {
+            "timestamp": datetime.now().isoformat(),
+            "commit": subprocess.run(["git", "rev-parse", "--short", "HEAD"], stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, text=True).stdout.strip() or None,
+            "python": platform.python_version(),
+            "latency": args.latency,
+            "stages": {}
+        }
+        for name, fn in stages.items():
+            print(f"Benchmarking {name}...")
+            results["stages"][name] = time_stage(fn, args.iterations, args.warmup)
+
+        print(f"\n{'stage':<56}{'mean':>9}{'p50':>9}{'p95':>9}{'min':>9}{'max':>9}")
+        for name, timing in results["stages"].items():
+            print(f"{name:<56}{timing['mean']:>9.4f}{timing['p50']:>9.4f}{timing['p95']:>9.4f}"
+                  f"{timing['min']:>9.4f}{timing['max']:>9.4f}")
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            print(f"\nResults written to {args.output}")
+
+        if args.compare and compare(results, args.compare, args.threshold):
+            sys.exit(1)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Local stand-in server for the text, TTS and image providers.
+Serves an OpenAI-compatible /chat/completions (with streaming) and /images/generations,
+the minimaxi /v1/t2a_v2 endpoint returning hex mp3 (with streaming), and the DashScope
+image task API with a download URL. Latencies are drawn from configurable distributions,
+and errors and 429 responses can be injected at a given rate.
+
+Usage:
+    python -m benchmarks.stub_providers --port 8090 --text-ttft lognormal:-0.5,0.4
+    PROVIDER_STUB_URL=http://127.0.0.1:8090 python service.py
+"""
+
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from typing import Dict, Any, Callable, Iterator, Optional
+
+from flask import Flask, request, jsonify, Response
+
+app = Flask(__name__)
+
+# Smallest valid MP3 frame (MPEG-1 Layer III, 32 kbps, 32 kHz, mono, silent)
+SILENT_MP3_FRAME = bytes.fromhex("fffb18c0") + bytes(140)
+
+# 1x1 transparent PNG
+PIXEL_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c48900"
+    "00000b49444154789c6360000200000500017a5eab3f0000000049454e44ae426082"
+)
+
+FILLER_WORDS = (
+    "breathe slowly and notice the gentle rise and fall of your chest "
+    "let your shoulders soften and allow each thought to pass like a cloud"
+).split()
+
+
+def parse_distribution(spec: str) -> Callable[[], float]:
+    """
+    Parse a latency distribution such as 'fixed:0.5', 'uniform:0.2,1.0',
+    'normal:1.0,0.2', 'lognormal:-0.5,0.4' or 'exponential:0.8'.
+
+    Args:
+        spec: Distribution name and comma-separated parameters, in seconds
+
+    Returns:
+        Function drawing one non-negative latency
+    """
+    name, _, params = spec.partition(':')
+    values = [float(value) for value in params.split(',') if value]
+    samplers = {
+        'fixed': lambda: values[0],
+        'uniform': lambda: random.uniform(values[0], values[1]),
+        'normal': lambda: random.gauss(values[0], values[1]),
+        'lognormal': lambda: random.lognormvariate(values[0], values[1]),
+        'exponential': lambda: random.expovariate(1.0 / values[0])
+    }
+    if name not in samplers:
+        raise ValueError(f"Unknown latency distribution: {spec}")
+    sampler = samplers[name]
+    return lambda: max(0.0, sampler())
+
+
+class StubConfig:
+    """Latency, error and rate-limit settings of the stand-in providers."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.text_ttft = parse_distribution(args.text_ttft)
+        self.token_delay = parse_distribution(args.token_delay)
+        self.tts_latency = parse_distribution(args.tts_latency)
+        self.tts_chunk_delay = parse_distribution(args.tts_chunk_delay)
+        self.image_latency = parse_distribution(args.image_latency)
+        self.completion_tokens = args.completion_tokens
+        self.error_rate = args.error_rate
+        self.rate_limit_rate = args.rate_limit_rate
+        self.retry_after = args.retry_after
+
+
+# Replaced by main() with the command line settings
+config: Optional[StubConfig] = None
+
+# DashScope tasks: task_id -> time the task finishes
+_tasks: Dict[str, float] = {}
+_tasks_lock = threading.Lock()
+_stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+_stats_lock = threading.Lock()
+
+
+def inject_failure() -> Optional[Response]:
+    """Count the request and return an injected 429 or 500 response, if one is drawn."""
+    with _stats_lock:
+        _stats["requests"] += 1
+    draw = random.random()
+    if draw < config.rate_limit_rate:
+        with _stats_lock:
+            _stats["rate_limited"] += 1
+        response = jsonify({"error": {"message": "Rate limit reached", "type": "rate_limit_error"}})
+        response.status_code = 429
+        response.headers["Retry-After"] = str(config.retry_after)
+        return response
+    if draw < config.rate_limit_rate + config.error_rate:
+        with _stats_lock:
+            _stats["errors"] += 1
+        response = jsonify({"error": {"message": "Injected server error", "type": "server_error"}})
+        response.status_code = 500
+        return response
+    return None
+
+
+def completion_text(prompt: str, max_tokens: int) -> str:
+    """Filler completion; prompts asking for JSON get an intention-shaped object."""
+    if 'json' in prompt.lower():
+        return json.dumps({
+            "intention": "relaxation",
+            "theme": "mindfulness",
+            "emotional_context": "calm",
+            "rewritten_prompt": "A short guided meditation to release tension",
+            "key_concepts": ["breath", "calm", "presence"]
+        })
+    count = min(max_tokens, config.completion_tokens)
+    return ' '.join(FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(count))
+
+
+def sse(payload: Dict[str, Any]) -> str:
+    """Encode one server-sent event."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@app.route('/chat/completions', methods=['POST'])
+@app.route('/v1/chat/completions', methods=['POST'])
+def chat_completions():
+    """OpenAI-compatible chat completion, streamed when requested."""
+    failure = inject_failure()
+    if failure is not None:
+        return failure
+
+    body = request.get_json()
+    prompt = ''.join(message.get('content') or '' for message in body.get('messages', []))
+    text = completion_text(prompt, body.get('max_tokens') or 8192)
+    words = text.split(' ')
+    usage = {
+        "prompt_tokens": max(1, len(prompt) // 4),
+        "completion_tokens": len(words),
+        "total_tokens": max(1, len(prompt) // 4) + len(words)
+    }
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    model = body.get('model', 'stub')
+
+    if not body.get('stream'):
+        time.sleep(config.text_ttft() + sum(config.token_delay() for _ in words))
+        return jsonify({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+
+    include_usage = (body.get('stream_options') or {}).get('include_usage')
+
+    def generate() -> Iterator[str]:
+        time.sleep(config.text_ttft())
+        for index, word in enumerate(words):
+            if index:
+                time.sleep(config.token_delay())
+            yield sse({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if index == 0 else ' ' + word},
+                    "finish_reason": None
+                }]
+            })
+        yield sse({
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+        })
+        if include_usage:
+            yield sse({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [],
+                "usage": usage
+            })
+        yield "data: [DONE]\n\n"
+
+    return Response(generate(), mimetype='text/event-stream')
+
+
+@app.route('/images/generations', methods=['POST'])
+@app.route('/v1/images/generations', methods=['POST'])
+def image_generations():
+    """OpenAI-compatible image generation returning a download URL."""
+    failure = inject_failure()
+    if failure is not None:
+        return failure
+
+    time.sleep(config.image_latency())
+    return jsonify({
+        "created": int(time.time()),
+        "data": [{"url": f"{request.host_url}files/{uuid.uuid4().hex}.png"}]
+    })
+
+
+@app.route('/v1/t2a_v2', methods=['POST'])
+def text_to_audio():
+    """minimaxi text-to-speech returning hex-encoded mp3, streamed when requested."""
+    failure = inject_failure()
+    if failure is not None:
+        return failure
+
+    body = json.loads(request.get_data())
+    text = body.get('text', '')
+    # Roughly one silent frame per character keeps audio size proportional to the text
+    frames = max(1, len(text))
+    audio_hex = (SILENT_MP3_FRAME * frames).hex()
+    base_resp = {"status_code": 0, "status_msg": "success"}
+    extra_info = {"audio_length": frames * 36, "audio_size": frames * len(SILENT_MP3_FRAME), "audio_format": "mp3"}
+
+    if not body.get('stream'):
+        time.sleep(config.tts_latency())
+        return jsonify({"data": {"audio": audio_hex, "status": 2}, "extra_info": extra_info, "base_resp": base_resp})
+
+    def generate() -> Iterator[str]:
+        time.sleep(config.tts_latency())
+        chunk_chars = len(SILENT_MP3_FRAME) * 2 * 32
+        for start in range(0, len(audio_hex), chunk_chars):
+            if start:
+                time.sleep(config.tts_chunk_delay())
+            yield sse({"data": {"audio": audio_hex[start:start + chunk_chars], "status": 1}, "base_resp": base_resp})
+        # The final event repeats the whole audio alongside extra_info
+        yield sse({"data": {"audio": audio_hex, "status": 2}, "extra_info": extra_info, "base_resp": base_resp})
+
+    return Response(generate(), mimetype='text/event-stream')
+
+
+@app.route('/api/v1/services/aigc/text2image/image-synthesis', methods=['POST'])
+def image_synthesis():
+    """DashScope text-to-image task submission."""
+    failure = inject_failure()
+    if failure is not None:
+        return failure
+
+    task_id = uuid.uuid4().hex
+    with _tasks_lock:
+        _tasks[task_id] = time.monotonic() + config.image_latency()
+    return jsonify({
+        "request_id": uuid.uuid4().hex,
+        "output": {"task_id": task_id, "task_status": "PENDING"}
+    })
+
+
+@app.route('/api/v1/tasks/<task_id>', methods=['GET', 'POST'])
+def image_task(task_id: str):
+    """DashScope task status; the task succeeds once its drawn latency has passed."""
+    with _tasks_lock:
+        finish_at = _tasks.get(task_id)
+    if finish_at is None:
+        return jsonify({"code": "InvalidParameter", "message": f"Task {task_id} not found"}), 404
+
+    if time.monotonic() < finish_at:
+        return jsonify({
+            "request_id": uuid.uuid4().hex,
+            "output": {"task_id": task_id, "task_status": "RUNNING"}
+        })
+
+    return jsonify({
+        "request_id": uuid.uuid4().hex,
+        "output": {
+            "task_id": task_id,
+            "task_status": "SUCCEEDED",
+            "results": [{"url": f"{request.host_url}files/{task_id}.png"}]
+        },
+        "usage": {"image_count": 1}
+    })
+
+
+@app.route('/files/<name>', methods=['GET'])
+def download(name: str):
+    """Download URL of generated images."""
+    return Response(PIXEL_PNG, mimetype='image/png')
+
+
+@app.route('/', methods=['GET', 'HEAD'])
+@app.route('/stats', methods=['GET'])
+def stats():
+    """Request and injected-failure counters (the root path also answers client warm-up)."""
+    with _stats_lock:
+        return jsonify(dict(_stats))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Local stand-in server for the text, TTS and image providers')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8090, help='Port to listen on')
+    parser.add_argument('--text-ttft', type=str, default='lognormal:-0.7,0.4',
+                        help='Time to first token of chat completions')
+    parser.add_argument('--token-delay', type=str, default='fixed:0.01',
+                        help='Delay between streamed completion tokens')
+    parser.add_argument('--tts-latency', type=str, default='lognormal:0.0,0.3',
+                        help='Latency of a TTS response (time to first chunk when streaming)')
+    parser.add_argument('--tts-chunk-delay', type=str, default='fixed:0.05',
+                        help='Delay between streamed TTS chunks')
+    parser.add_argument('--image-latency', type=str, default='uniform:3,6',
+                        help='Time until an image task succeeds')
+    parser.add_argument('--completion-tokens', type=int, default=300,
+                        help='Maximum tokens of a filler completion')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with HTTP 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with HTTP 429')
+    parser.add_argument('--retry-after', type=float, default=1.0,
+                        help='Retry-After seconds sent with 429 responses')
+    return parser.parse_args(argv)
+
+
+def main():
+    global config
+    args = parse_args()
+    config = StubConfig(args)
+    print(f"Provider stand-ins listening on http://{args.host}:{args.port} "
+          f"(set PROVIDER_STUB_URL=http://{args.host}:{args.port} to use them)")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,21 +19,46 @@ except ImportError:
 # API Configuration for Different Model Types
 # =============================================================================
 
+# Point every provider at the local stand-in server for benchmarks
+# (python -m benchmarks.stub_providers), e.g. PROVIDER_STUB_URL=http://127.0.0.1:8090
+PROVIDER_STUB_URL = os.environ.get("PROVIDER_STUB_URL")
+
+def _provider(name: str, default: Optional[str], stub: str = "stub") -> Optional[str]:
+    """
+    Read a provider endpoint or credential. With PROVIDER_STUB_URL set, the stub value
+    wins over the environment and .env, so a stubbed run never reaches a live provider.
+    """
+    if PROVIDER_STUB_URL:
+        return stub
+    return os.environ.get(name, default)
+
 # Text Model Configuration
-TEXT_API_KEY = os.environ.get("TEXT_API_KEY")
-TEXT_BASE_URL = os.environ.get("TEXT_BASE_URL", "https://api.deepseek.com")
+TEXT_API_KEY = _provider("TEXT_API_KEY", None)
+TEXT_BASE_URL = _provider("TEXT_BASE_URL", "https://api.deepseek.com", PROVIDER_STUB_URL)
 TEXT_MODEL_NAME = os.environ.get("TEXT_MODEL_NAME", "deepseek-chat")
 
 # Image Model API Settings  
-IMAGE_API_KEY = os.environ.get("IMAGE_API_KEY")
-IMAGE_BASE_URL = os.environ.get("IMAGE_BASE_URL", "https://api.openai.com")
+IMAGE_API_KEY = _provider("IMAGE_API_KEY", None)
+IMAGE_BASE_URL = _provider("IMAGE_BASE_URL", "https://api.openai.com", PROVIDER_STUB_URL)
 IMAGE_MODEL_NAME = os.environ.get("IMAGE_MODEL_NAME", "dall-e-3")
 
 # Text-to-Speech Model API Settings (minimaxi)
-TTS_API_KEY = os.environ.get("TTS_API_KEY")
-TTS_GROUP_ID = os.environ.get("TTS_GROUP_ID")
-TTS_BASE_URL = os.environ.get("TTS_BASE_URL", "https://api.minimaxi.com")
+TTS_API_KEY = _provider("TTS_API_KEY", None)
+TTS_GROUP_ID = _provider("TTS_GROUP_ID", None)
+TTS_BASE_URL = _provider("TTS_BASE_URL", "https://api.minimaxi.com", PROVIDER_STUB_URL)
 TTS_MODEL_NAME = os.environ.get("TTS_MODEL_NAME", "speech-02-hd")
+# Stream TTS audio chunks straight to disk instead of one JSON response
+TTS_STREAMING = os.environ.get("TTS_STREAMING", "false").lower() == "true"
+# Split long scripts into sentence-aligned chunks synthesized in parallel
+TTS_CHUNKED = os.environ.get("TTS_CHUNKED", "true").lower() == "true"
+TTS_CHUNK_CHARS = int(os.environ.get("TTS_CHUNK_CHARS", "400"))
+TTS_CHUNK_WORKERS = int(os.environ.get("TTS_CHUNK_WORKERS", "4"))
+
+# DashScope Image Synthesis API Settings
+DASHSCOPE_API_KEY = _provider("DASHSCOPE_API_KEY", None)
+DASHSCOPE_BASE_URL = _provider("DASHSCOPE_BASE_URL", "https://dashscope.aliyuncs.com/api/v1",
+                               f"{PROVIDER_STUB_URL}/api/v1")
+DASHSCOPE_POLL_INTERVAL = float(os.environ.get("DASHSCOPE_POLL_INTERVAL", "1.0"))
 
 # =============================================================================
 # Model Default Settings
@@ -49,6 +74,230 @@ MODEL_DEFAULTS = {
 # Output settings
 OUTPUT_DIR = os.environ.get("OUTPUT_DIR", "output")
 
+# =============================================================================
+# Client Pool Settings
+# =============================================================================
+
+# Connection pool sizes for the shared ModelClient registry
+CLIENT_POOL_MAX_CONNECTIONS = int(os.environ.get("CLIENT_POOL_MAX_CONNECTIONS", "20"))
+CLIENT_POOL_MAX_KEEPALIVE = int(os.environ.get("CLIENT_POOL_MAX_KEEPALIVE", "10"))
+CLIENT_POOL_KEEPALIVE_EXPIRY = float(os.environ.get("CLIENT_POOL_KEEPALIVE_EXPIRY", "60"))
+
+# Open connections to every configured provider when the service starts
+CLIENT_POOL_PREWARM = os.environ.get("CLIENT_POOL_PREWARM", "true").lower() == "true"
+
+# Build the shared orchestrator's pipeline components when the service starts
+ORCHESTRATOR_PREWARM = os.environ.get("ORCHESTRATOR_PREWARM", "true").lower() == "true"
+
+# =============================================================================
+# Response Cache Settings
+# =============================================================================
+
+# Components whose generate_text calls are served from the on-disk cache (opt-in),
+# e.g. RESPONSE_CACHE_COMPONENTS=MusicSelector,ImagePromptCreator_Text
+RESPONSE_CACHE_COMPONENTS = [
+    name.strip() for name in os.environ.get("RESPONSE_CACHE_COMPONENTS", "").split(",") if name.strip()
+]
+RESPONSE_CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH", os.path.join("cache", "llm_responses.sqlite3"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Synthesized TTS chunks are stored as files keyed by text, voice and audio settings
+TTS_CACHE_ENABLED = os.environ.get("TTS_CACHE_ENABLED", "true").lower() == "true"
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", os.path.join("cache", "tts_audio"))
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Share one upstream call between identical concurrent text, TTS and image requests
+SINGLE_FLIGHT_ENABLED = os.environ.get("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+# =============================================================================
+# LLM Interaction Log Settings
+# =============================================================================
+
+LLM_LOG_DIR = os.environ.get("LLM_LOG_DIR", "logs")
+# Entries wait in a bounded queue for the background writer; when it is full,
+# "drop" discards new entries and "block" makes the caller wait
+LLM_LOG_QUEUE_SIZE = int(os.environ.get("LLM_LOG_QUEUE_SIZE", "10000"))
+LLM_LOG_FULL_POLICY = os.environ.get("LLM_LOG_FULL_POLICY", "drop")
+LLM_LOG_BATCH_SIZE = int(os.environ.get("LLM_LOG_BATCH_SIZE", "100"))
+LLM_LOG_FLUSH_INTERVAL = float(os.environ.get("LLM_LOG_FLUSH_INTERVAL", "1.0"))
+# Start a new file past this size or age; rotated files are gzipped
+LLM_LOG_MAX_BYTES = int(os.environ.get("LLM_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LLM_LOG_ROTATE_INTERVAL = float(os.environ.get("LLM_LOG_ROTATE_INTERVAL", str(24 * 3600)))
+LLM_LOG_COMPRESS = os.environ.get("LLM_LOG_COMPRESS", "true").lower() == "true"
+
+# =============================================================================
+# Record/Replay Settings
+# =============================================================================
+
+# "live" calls providers; "record" also saves every result to REPLAY_DIR;
+# "replay" serves calls from REPLAY_DIR without touching providers
+PROVIDER_MODE = os.environ.get("PROVIDER_MODE", "live")
+REPLAY_DIR = os.environ.get("REPLAY_DIR", "recordings")
+# "recorded" re-injects the recorded latencies, "zero" answers immediately
+REPLAY_LATENCY = os.environ.get("REPLAY_LATENCY", "recorded")
+# Fail on unrecorded prompts instead of replaying the component's recordings in order
+REPLAY_STRICT = os.environ.get("REPLAY_STRICT", "false").lower() == "true"
+
+# =============================================================================
+# Resilience Settings
+# =============================================================================
+
+def _resilience_policy(prefix: str, timeout: float) -> Dict[str, Any]:
+    """Read the resilience policy of one provider from <PREFIX>_* environment variables."""
+    return {
+        "timeout": float(os.environ.get(f"{prefix}_TIMEOUT", str(timeout))),
+        "max_retries": int(os.environ.get(f"{prefix}_MAX_RETRIES", "3")),
+        "backoff_base": float(os.environ.get(f"{prefix}_BACKOFF_BASE", "1.0")),
+        "backoff_max": float(os.environ.get(f"{prefix}_BACKOFF_MAX", "30")),
+        "breaker_threshold": int(os.environ.get(f"{prefix}_BREAKER_THRESHOLD", "5")),
+        "breaker_reset_timeout": float(os.environ.get(f"{prefix}_BREAKER_RESET_TIMEOUT", "60"))
+    }
+
+# Timeouts (seconds), retries on 429/5xx and circuit breakers per provider
+RESILIENCE_POLICIES = {
+    "text": _resilience_policy("TEXT", 300),
+    "image": _resilience_policy("IMAGE", 180),
+    "tts": _resilience_policy("TTS", 120)
+}
+
+# =============================================================================
+# Hedging Settings
+# =============================================================================
+
+# Components whose calls may be hedged, with the maximum fraction of calls that
+# may fire a duplicate, e.g. HEDGE_BUDGETS=TextToSpeech=0.1,PromptCreator=0.05
+HEDGE_BUDGETS = {
+    name.strip(): float(budget)
+    for name, budget in (
+        item.split("=", 1) for item in os.environ.get("HEDGE_BUDGETS", "").split(",") if "=" in item
+    )
+}
+# Fire the duplicate once a call is slower than this percentile of recent latency
+HEDGE_PERCENTILE = float(os.environ.get("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", "20"))
+# Threads running hedged duplicates (primary requests run on the calling thread)
+HEDGE_MAX_WORKERS = int(os.environ.get("HEDGE_MAX_WORKERS", "32"))
+
+# =============================================================================
+# Rate Limit Settings
+# =============================================================================
+
+def _rate_limit(prefix: str, max_in_flight: int) -> Dict[str, int]:
+    """Read the rate limits of one provider from <PREFIX>_* environment variables (0 = unlimited)."""
+    return {
+        "requests_per_minute": int(os.environ.get(f"{prefix}_REQUESTS_PER_MINUTE", "0")),
+        "tokens_per_minute": int(os.environ.get(f"{prefix}_TOKENS_PER_MINUTE", "0")),
+        "max_in_flight": int(os.environ.get(f"{prefix}_MAX_IN_FLIGHT", str(max_in_flight)))
+    }
+
+# Limits shared by all pipeline components and eval scripts in the process
+RATE_LIMITS = {
+    "text": _rate_limit("TEXT", 16),
+    "image": _rate_limit("IMAGE", 4),
+    "tts": _rate_limit("TTS", 8)
+}
+
+# =============================================================================
+# Job Queue Settings
+# =============================================================================
+
+# Pipeline runs submitted as jobs execute on this many worker threads
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+# Submissions beyond this many waiting jobs are rejected
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "100"))
+# Finished jobs are forgotten after this many seconds
+JOB_RETENTION = float(os.environ.get("JOB_RETENTION", "3600"))
+# Job store backend: 'memory' (this process only), 'sqlite' (shared by every process
+# using JOB_STORE_PATH) or 'module:ClassName' of a custom JobStore implementation
+JOB_STORE = os.environ.get("JOB_STORE", "memory")
+JOB_STORE_PATH = os.environ.get("JOB_STORE_PATH", os.path.join("jobs", "jobs.sqlite3"))
+# A claimed job is invisible to other workers for this long unless its worker heartbeats
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "60"))
+JOB_HEARTBEAT_INTERVAL = float(os.environ.get("JOB_HEARTBEAT_INTERVAL", "15"))
+# Runs per job (failures and expired leases) before it is marked failed
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = float(os.environ.get("JOB_RETRY_DELAY", "10"))
+# Idle workers check the store for jobs submitted by other processes this often
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "1.0"))
+
+# =============================================================================
+# Streaming (Server-Sent Events) Settings
+# =============================================================================
+
+# Keep-alive comment after this many quiet seconds; a failed write ends the stream,
+# so this also bounds how long generation continues for a disconnected client
+SSE_HEARTBEAT_INTERVAL = float(os.environ.get("SSE_HEARTBEAT_INTERVAL", "5"))
+# Chunks buffered for a slow client before generation is paused
+SSE_BUFFER_SIZE = int(os.environ.get("SSE_BUFFER_SIZE", "64"))
+# Chunks arriving within this many seconds are sent as one event (0 = send each at once)
+SSE_FLUSH_INTERVAL = float(os.environ.get("SSE_FLUSH_INTERVAL", "0"))
+SSE_RETRY_MS = int(os.environ.get("SSE_RETRY_MS", "3000"))
+
+# =============================================================================
+# Admission Control Settings
+# =============================================================================
+
+def _admission(prefix: str, max_concurrent: int, max_queue: int, max_wait: float) -> Dict[str, Any]:
+    """Read the admission limits of one endpoint class from ADMISSION_<PREFIX>_* environment variables."""
+    return {
+        "max_concurrent": int(os.environ.get(f"ADMISSION_{prefix}_CONCURRENT", str(max_concurrent))),
+        "max_queue": int(os.environ.get(f"ADMISSION_{prefix}_QUEUE", str(max_queue))),
+        "max_wait": float(os.environ.get(f"ADMISSION_{prefix}_MAX_WAIT", str(max_wait)))
+    }
+
+# Requests beyond max_concurrent wait (FIFO, up to max_wait seconds) while fewer than
+# max_queue are waiting; the rest get 429 with Retry-After
+ADMISSION_LIMITS = {
+    "process": _admission("PROCESS", 2, 4, 60),
+    "video": _admission("VIDEO", 2, 4, 60),
+    "image": _admission("IMAGE", 4, 8, 30),
+    "text": _admission("TEXT", 16, 32, 10)
+}
+# Retry-After before any request has completed, and its upper bound
+ADMISSION_DEFAULT_RETRY_AFTER = int(os.environ.get("ADMISSION_DEFAULT_RETRY_AFTER", "5"))
+ADMISSION_MAX_RETRY_AFTER = int(os.environ.get("ADMISSION_MAX_RETRY_AFTER", "600"))
+
+# =============================================================================
+# Priority Lane Settings
+# =============================================================================
+
+def _lane(prefix: str, workers: int, priority: int) -> Dict[str, int]:
+    """Read the worker pool size and priority of one lane from LANE_<PREFIX>_* environment variables."""
+    return {
+        "workers": int(os.environ.get(f"LANE_{prefix}_WORKERS", str(workers))),
+        "priority": int(os.environ.get(f"LANE_{prefix}_PRIORITY", str(priority)))
+    }
+
+# Each lane runs its requests on its own worker threads. Priority 0 is the highest;
+# lanes with a lower priority cannot use the reserved share of provider capacity
+LANES = {
+    "interactive": _lane("INTERACTIVE", 16, 0),
+    "render": _lane("RENDER", 4, 1)
+}
+# Lane of each endpoint class (see ADMISSION_LIMITS); text streams run in the text lane
+LANE_ROUTES = {
+    "text": os.environ.get("LANE_TEXT", "interactive"),
+    "image": os.environ.get("LANE_IMAGE", "render"),
+    "video": os.environ.get("LANE_VIDEO", "render"),
+    "process": os.environ.get("LANE_PROCESS", "render")
+}
+# Share of each provider's rate and in-flight limits kept free for priority 0 work
+LANE_RESERVED_SHARE = float(os.environ.get("LANE_RESERVED_SHARE", "0.25"))
+
+# =============================================================================
+# ASGI Server Settings (asgi_service.py)
+# =============================================================================
+
+ASGI_HOST = os.environ.get("ASGI_HOST", "0.0.0.0")
+ASGI_PORT = int(os.environ.get("ASGI_PORT", "8008"))
+# Worker processes; each runs its own event loop, client pool and orchestrator
+ASGI_WORKERS = int(os.environ.get("ASGI_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Seconds an idle keep-alive connection is held open
+ASGI_KEEPALIVE = int(os.environ.get("ASGI_KEEPALIVE", "5"))
+# On shutdown, seconds in-flight requests get to finish before they are cancelled
+ASGI_GRACEFUL_TIMEOUT = int(os.environ.get("ASGI_GRACEFUL_TIMEOUT", "300"))
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
@@ -1,4 +1,4 @@
-from api.model_client import ModelClient
+from api.client_pool import get_model_client
 import os
 import json
 import copy
@@ -160,7 +160,7 @@ def call_deepseek(prompt: str) -> str:
     """
     调用DeepSeek（OpenAI兼容API），返回生成的文本结果。
     """
-    client = ModelClient(model_type='text')
+    client = get_model_client('text')
     return client.generate_text(prompt) 
 
 def test_deepseek():
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Asyncio-native orchestrator for the pipeline flow.
+Provider calls are awaited on AsyncModelClient instead of pinning a thread each,
+so one process can hold many concurrent sessions waiting on providers.
+"""
+
+import os
+import asyncio
+import threading
+from typing import Dict, Any, Optional, AsyncIterator, Callable, Awaitable
+
+from pipeline.orchestrator import Orchestrator
+
+
+class AsyncOrchestrator(Orchestrator):
+    """Orchestrates the pipeline flow with asyncio."""
+
+    async def generate_text_only(self, user_prompt: str, emotional_state: str = "neutral") -> str:
+        """
+        Generate meditation text only.
+
+        Args:
+            user_prompt: The user's input prompt
+            emotional_state: The user's emotional state
+
+        Returns:
+            Generated meditation text
+        """
+        recognized_intention = await self.intention_recognizer.process_async(
+            user_prompt, emotional_state
+        )
+        return await self.prompt_creator.create_prompt_async(recognized_intention)
+
+    async def generate_text_stream(self, user_prompt: str, emotional_state: str = "neutral") -> AsyncIterator[str]:
+        """
+        Generate meditation text with streaming output.
+
+        Args:
+            user_prompt: The user's input prompt
+            emotional_state: The user's emotional state
+
+        Yields:
+            Text chunks as they are generated
+        """
+        recognized_intention = await self.intention_recognizer.process_async(
+            user_prompt, emotional_state
+        )
+        chunks = self.prompt_creator.create_prompt_stream_async(recognized_intention)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            # Close the LLM stream now if the consumer stopped early, not at garbage collection
+            await chunks.aclose()
+
+    async def generate_image_only(self, text_content: str, output_path: str) -> str:
+        """
+        Generate image based on text content.
+
+        Args:
+            text_content: The meditation text content
+            output_path: Path to save output files
+
+        Returns:
+            Path to the generated image file
+        """
+        os.makedirs(output_path, exist_ok=True)
+
+        # Create a mock intention data structure from text content
+        intention_data = {
+            "intention": "meditation",
+            "theme": "mindfulness",
+            "emotional_context": "calm",
+            "key_concepts": ["peace", "tranquility", "meditation"],
+            "rewritten_prompt": text_content
+        }
+
+        image_prompt = await self.image_prompt_creator.create_prompt_async(intention_data)
+        return await self.image_prompt_creator.generate_image_async(
+            image_prompt,
+            output_path=os.path.join(output_path, "image.png")
+        )
+
+    async def generate_video_only(self, text_content: str, image_path: Optional[str] = None,
+                                  output_path: str = "output") -> str:
+        """
+        Generate video based on text content and optional image.
+
+        Args:
+            text_content: The meditation text content
+            image_path: Optional path to existing image (will generate if not provided)
+            output_path: Path to save output files
+
+        Returns:
+            Path to the generated video file
+        """
+        os.makedirs(output_path, exist_ok=True)
+
+        image_path = self._resolve_image_path(image_path)
+
+        # Limit text length for audio generation unless long scripts are chunked
+        script = text_content if self.text_to_speech.chunked else text_content[:500]
+        script_path = os.path.join(output_path, "script.txt")
+        with open(script_path, "w") as f:
+            f.write(f"generated script:\n{script}")
+
+        # Image (if missing) and narration do not depend on each other
+        audio_task = self.text_to_speech.convert_async(
+            script,
+            output_path=os.path.join(output_path, "narration.mp3")
+        )
+        if image_path is None or not os.path.exists(image_path):
+            print("Generating new image...")
+            image_path, audio_path = await asyncio.gather(
+                self.generate_image_only(text_content, output_path), audio_task
+            )
+        else:
+            audio_path = await audio_task
+
+        print(f"Using image path: {image_path}")
+
+        return await self._create_video(image_path, audio_path, self._default_music_path(), output_path)
+
+    async def _text_pipeline(self, recognized_intention: Dict[str, Any], output_path: str) -> str:
+        """
+        Execute the text pipeline branch.
+
+        Args:
+            recognized_intention: The recognized user intention
+            output_path: Path to save output files
+
+        Returns:
+            Path to the generated audio file
+        """
+        script = await self.prompt_creator.create_prompt_async(recognized_intention)
+        script_path = os.path.join(output_path, "script.txt")
+        with open(script_path, "w") as f:
+            f.write(f"generated script:\n{script}")
+        # 测试一下，限制字数 (chunked TTS handles full-length scripts)
+        if not self.text_to_speech.chunked:
+            script = script[:500]
+        return await self.text_to_speech.convert_async(
+            script,
+            output_path=os.path.join(output_path, "narration.mp3")
+        )
+
+    async def _image_pipeline(self, recognized_intention: Dict[str, Any], output_path: str) -> str:
+        """
+        Execute the image pipeline branch.
+
+        Args:
+            recognized_intention: The recognized user intention
+            output_path: Path to save output files
+
+        Returns:
+            Path to the generated image file
+        """
+        image_prompt = await self.image_prompt_creator.create_prompt_async(recognized_intention)
+        return await self.image_prompt_creator.generate_image_async(
+            image_prompt,
+            output_path=os.path.join(output_path, "image.png")
+        )
+
+    async def _music_pipeline(self, recognized_intention: Dict[str, Any], output_path: str) -> str:
+        """
+        Execute the music pipeline branch.
+
+        Args:
+            recognized_intention: The recognized user intention
+            output_path: Path to save output files
+
+        Returns:
+            Path to the selected music file
+        """
+        return self._default_music_path()
+
+    async def _create_video(self, image_path: str, audio_path: str, music_path: str, output_path: str) -> str:
+        """Run the blocking ffmpeg synthesis in a worker thread."""
+        return await asyncio.to_thread(
+            self.video_synthesizer.create_video,
+            image_path=image_path,
+            audio_path=audio_path,
+            music_path=music_path,
+            output_path=os.path.join(output_path, "final_video.mp4")
+        )
+
+    async def run_pipeline(self,
+                           user_prompt: str,
+                           emotional_state: str = "neutral",
+                           output_path: str = "output",
+                           progress: Optional[Callable[..., None]] = None) -> str:
+        """
+        Run the entire pipeline, awaiting the three branches concurrently.
+
+        Args:
+            user_prompt: The user's input prompt
+            emotional_state: The user's emotional state
+            output_path: Path to save output files
+            progress: Optional callback progress(stage, status, artifact=None), as in
+                      Orchestrator.run_pipeline
+
+        Returns:
+            Path to the final output video
+        """
+        report = progress or (lambda stage, status, artifact=None: None)
+
+        async def branch(stage: str, step: Awaitable[str]) -> str:
+            report(stage, "running")
+            result = await step
+            report(stage, "done", result if isinstance(result, str) else None)
+            return result
+
+        os.makedirs(output_path, exist_ok=True)
+
+        # Step 1: Intention recognition and rewrite
+        recognized_intention = await branch("intention", self.intention_recognizer.process_async(
+            user_prompt, emotional_state
+        ))
+
+        # Step 2: Execute the three branches concurrently
+        audio_path, image_path, music_path = await asyncio.gather(
+            branch("narration", self._text_pipeline(recognized_intention, output_path)),
+            branch("image", self._image_pipeline(recognized_intention, output_path)),
+            branch("music", self._music_pipeline(recognized_intention, output_path))
+        )
+
+        # Step 3: Synthesize video from all components
+        return await branch("video", self._create_video(image_path, audio_path, music_path, output_path))
+
+
+# Process-wide asyncio orchestrator, created on first use
+_async_orchestrator = None
+_async_orchestrator_lock = threading.Lock()
+
+
+def get_async_orchestrator() -> AsyncOrchestrator:
+    """Get the shared asyncio orchestrator."""
+    global _async_orchestrator
+    with _async_orchestrator_lock:
+        if _async_orchestrator is None:
+            _async_orchestrator = AsyncOrchestrator()
+        return _async_orchestrator
@@ -11,12 +11,25 @@ from typing import Dict, Any, Optional
 from http import HTTPStatus
 from urllib.parse import urlparse, unquote
 from pathlib import PurePosixPath
-from dashscope import ImageSynthesis
 
-from api.model_client import ModelClient
+from api.client_pool import get_model_client, get_async_model_client
+from api.single_flight import get_flight
+from api.resilience import get_policy, ProviderError
+from api.rate_limiter import get_limiter
+from api.call_metrics import CallMetrics
+from api.replay import get_recorder
 from config import settings
 
 
+def _load_image_synthesis():
+    """Import the DashScope SDK on first use; it is slow to import and only needed for images."""
+    import dashscope
+    from dashscope import ImageSynthesis
+    # The SDK shares the REST endpoint setting (e.g. the local stand-in server)
+    dashscope.base_http_api_url = settings.DASHSCOPE_BASE_URL
+    return ImageSynthesis
+
+
 class ImagePromptCreator:
     """Creates prompts for image generation and handles image generation."""
     
@@ -31,25 +44,25 @@ class ImagePromptCreator:
             image_model: Name of the image model to use (not used with dashscope)
         """
         # Initialize text model client for prompt enhancement
-        self.text_client = ModelClient(model_type='text')
+        self.text_client = get_model_client('text')
         
         # Text model for prompt enhancement
         self.text_model = text_model or settings.MODEL_DEFAULTS["text_model"]
         
         # Get API key from environment variable
-        self.api_key = os.getenv("DASHSCOPE_API_KEY")
+        self.api_key = settings.DASHSCOPE_API_KEY
         if not self.api_key:
             print("Warning: DASHSCOPE_API_KEY environment variable not found")
     
-    def create_prompt(self, intention_data: Dict[str, Any]) -> str:
+    def _build_enhancement_prompt(self, intention_data: Dict[str, Any]) -> str:
         """
-        Create a prompt for image generation based on recognized intention.
+        Build the LLM prompt that turns the intention into an image generation prompt.
         
         Args:
             intention_data: Dictionary containing intention analysis
             
         Returns:
-            A detailed image generation prompt
+            The enhancement prompt sent to the LLM
         """
         # Extract data from the intention analysis
         intention = intention_data.get("intention", "").lower()
@@ -89,11 +102,22 @@ Enhance the prompt with specific details about:
 - Composition and perspective
 
 Return ONLY the enhanced prompt text, without any explanations, introductions or additional notes."""
+        return enhancement_prompt
+    
+    def create_prompt(self, intention_data: Dict[str, Any]) -> str:
+        """
+        Create a prompt for image generation based on recognized intention.
         
+        Args:
+            intention_data: Dictionary containing intention analysis
+            
+        Returns:
+            A detailed image generation prompt
+        """
         # Get the enhanced prompt from the LLM
         # 强化prompt
         enhanced_prompt = self.text_client.generate_text(
-            prompt=enhancement_prompt,
+            prompt=self._build_enhancement_prompt(intention_data),
             model=self.text_model,
             temperature=0.6,  # More creative for image descriptions
             component="ImagePromptCreator_Text"
@@ -113,14 +137,124 @@ Return ONLY the enhanced prompt text, without any explanations, introductions or
         Returns:
             Path to the saved image
         """
-        if not self.api_key:
+        recorder = get_recorder()
+        replaying = recorder is not None and recorder.replaying
+        if not self.api_key and not replaying:
             raise ValueError("DASHSCOPE_API_KEY environment variable is required")
             
         try:
             print(f"Generating image with DashScope...")
             print(f"Prompt: {image_prompt}")
             
-            # Call DashScope ImageSynthesis API
+            if replaying:
+                image_data = recorder.replay("ImagePromptCreator_Image", image_prompt)
+            else:
+                metrics = CallMetrics()
+                metadata = {"model": "wanx-v1", "style": "<watercolor>", "size": "1024*1024"}
+                try:
+                    # Identical concurrent requests share one DashScope call
+                    flight = get_flight('image')
+                    image_data, coalesced = flight.do(
+                        flight.make_key(image_prompt),
+                        lambda: get_policy('image').call(lambda: self._synthesize_image(image_prompt, metrics))
+                    )
+                except Exception as e:
+                    metrics.record_error(e)
+                    self.text_client.logger.log_interaction(
+                        component="ImagePromptCreator_Image",
+                        prompt=image_prompt,
+                        response="",
+                        metadata={**metadata, "error": str(e), **metrics.as_metadata()}
+                    )
+                    raise
+                if coalesced:
+                    print("Reusing image from an identical request in flight")
+                
+                # Log the call like the text and TTS calls
+                metadata = {**metadata, "coalesced": coalesced, **metrics.as_metadata()}
+                self.text_client.logger.log_interaction(
+                    component="ImagePromptCreator_Image",
+                    prompt=image_prompt,
+                    response="[Binary image data]",
+                    metadata=metadata
+                )
+                if recorder is not None:
+                    recorder.record("ImagePromptCreator_Image", image_prompt, metadata, data=image_data)
+            
+            # Ensure directory exists
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            
+            # Save image to the specified path
+            with open(output_path, 'wb') as f:
+                f.write(image_data)
+            
+            print(f"Image saved to: {output_path}")
+            return output_path
+                
+        except Exception as e:
+            print(f"Error generating image with DashScope: {e}")
+            raise
+    
+    async def create_prompt_async(self, intention_data: Dict[str, Any]) -> str:
+        """
+        Asyncio counterpart of create_prompt.
+        
+        Args:
+            intention_data: Dictionary containing intention analysis
+            
+        Returns:
+            A detailed image generation prompt
+        """
+        return await get_async_model_client('text').generate_text(
+            prompt=self._build_enhancement_prompt(intention_data),
+            model=self.text_model,
+            temperature=0.6,
+            component="ImagePromptCreator_Text"
+        )
+    
+    async def generate_image_async(self, image_prompt: str, output_path: str) -> str:
+        """
+        Asyncio counterpart of generate_image, using the DashScope task API.
+        
+        Args:
+            image_prompt: The detailed image generation prompt
+            output_path: Path to save the generated image
+            
+        Returns:
+            Path to the saved image
+        """
+        recorder = get_recorder()
+        if not self.api_key and not (recorder is not None and recorder.replaying):
+            raise ValueError("DASHSCOPE_API_KEY environment variable is required")
+        
+        image_data = await get_async_model_client('text').synthesize_image_dashscope(
+            prompt=image_prompt,
+            api_key=self.api_key,
+            component="ImagePromptCreator_Image"
+        )
+        
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'wb') as f:
+            f.write(image_data)
+        
+        print(f"Image saved to: {output_path}")
+        return output_path
+    
+    def _synthesize_image(self, image_prompt: str, metrics: CallMetrics) -> bytes:
+        """
+        Call DashScope ImageSynthesis and download the first result.
+        
+        Args:
+            image_prompt: The detailed image generation prompt
+            metrics: Metrics of the call this attempt belongs to
+            
+        Returns:
+            The downloaded image data
+        """
+        # Call DashScope ImageSynthesis API
+        ImageSynthesis = _load_image_synthesis()
+        with get_limiter('image').slot() as wait:
+            metrics.record_attempt(wait)
             rsp = ImageSynthesis.call(
                 api_key=self.api_key,
                 model=ImageSynthesis.Models.wanx_v1,
@@ -129,33 +263,22 @@ Return ONLY the enhanced prompt text, without any explanations, introductions or
                 style='<watercolor>',
                 size='1024*1024'
             )
-            
-            print(f'DashScope response status: {rsp.status_code}')
-            
-            if rsp.status_code == HTTPStatus.OK:
-                # Ensure directory exists
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                
-                # Download and save the image
-                for result in rsp.output.results:
-                    print(f"Downloading image from: {result.url}")
-                    response = requests.get(result.url)
-                    response.raise_for_status()
-                    
-                    # Save image to the specified path
-                    with open(output_path, 'wb') as f:
-                        f.write(response.content)
-                    
-                    print(f"Image saved to: {output_path}")
-                    return output_path
-            else:
-                print(f'Image generation failed, status_code: {rsp.status_code}, code: {rsp.code}, message: {rsp.message}')
-                raise Exception(f"DashScope API error: {rsp.code} - {rsp.message}")
-                
-        except Exception as e:
-            print(f"Error generating image with DashScope: {e}")
-            raise
-
+        
+        print(f'DashScope response status: {rsp.status_code}')
+        metrics.record_status(rsp.status_code)
+        
+        if rsp.status_code != HTTPStatus.OK:
+            print(f'Image generation failed, status_code: {rsp.status_code}, code: {rsp.code}, message: {rsp.message}')
+            raise ProviderError(f"DashScope API error: {rsp.code} - {rsp.message}", status_code=rsp.status_code)
+        
+        # Download the image
+        for result in rsp.output.results:
+            print(f"Downloading image from: {result.url}")
+            response = requests.get(result.url, timeout=get_policy('image').timeout)
+            response.raise_for_status()
+            return response.content
+        
+        raise Exception("DashScope API returned no image results")
 
 if __name__ == "__main__":
     import argparse
@@ -7,7 +7,7 @@ Intention recognition module that analyzes user prompts.
 import os
 from typing import Dict, Any
 
-from api.model_client import ModelClient
+from api.client_pool import get_model_client, get_async_model_client
 from config import settings
 
 
@@ -21,19 +21,19 @@ class IntentionRecognizer:
         Args:
             model_name: Name of the LLM model to use (defaults to settings)
         """
-        self.model_client = ModelClient(model_type='text')
+        self.model_client = get_model_client('text')
         self.model_name = model_name or settings.MODEL_DEFAULTS["text_model"]
     
-    def process(self, user_prompt: str, emotional_state: str) -> Dict[str, Any]:
+    def _build_prompt(self, user_prompt: str, emotional_state: str) -> str:
         """
-        Process the user prompt to recognize intention and rewrite it.
+        Build the intention analysis prompt.
         
         Args:
             user_prompt: The user's input prompt
             emotional_state: The user's emotional state
             
         Returns:
-            Dictionary containing recognized intention and context
+            The prompt sent to the LLM
         """
         # Intention recognition prompt
         # Create a prompt for the LLM to analyze the user input
@@ -54,14 +54,59 @@ Please provide:
 Please format the response as a JSON object with the keys: intention, theme, emotional_context, rewritten_prompt, and key_concepts.
 Do not output anything else after the JSON object.
 """
+        return analysis_prompt
+    
+    def process(self, user_prompt: str, emotional_state: str) -> Dict[str, Any]:
+        """
+        Process the user prompt to recognize intention and rewrite it.
         
+        Args:
+            user_prompt: The user's input prompt
+            emotional_state: The user's emotional state
+            
+        Returns:
+            Dictionary containing recognized intention and context
+        """
         # Get the analysis from the LLM
         result = self.model_client.generate_text(
-            prompt=analysis_prompt,
+            prompt=self._build_prompt(user_prompt, emotional_state),
             model=self.model_name,
             temperature=0.5,  # Lower temperature for more deterministic analysis
             component="IntentionRecognizer"  # Add component name
         )
+        return self._parse_result(result, user_prompt, emotional_state)
+    
+    async def process_async(self, user_prompt: str, emotional_state: str) -> Dict[str, Any]:
+        """
+        Asyncio counterpart of process.
+        
+        Args:
+            user_prompt: The user's input prompt
+            emotional_state: The user's emotional state
+            
+        Returns:
+            Dictionary containing recognized intention and context
+        """
+        result = await get_async_model_client('text').generate_text(
+            prompt=self._build_prompt(user_prompt, emotional_state),
+            model=self.model_name,
+            temperature=0.5,
+            component="IntentionRecognizer"
+        )
+        return self._parse_result(result, user_prompt, emotional_state)
+    
+    def _parse_result(self, result: str, user_prompt: str, emotional_state: str) -> Dict[str, Any]:
+        """
+        Parse the LLM analysis into the intention dictionary.
+        
+        Args:
+            result: The LLM response
+            user_prompt: The user's input prompt
+            emotional_state: The user's emotional state
+            
+        Returns:
+            Dictionary containing recognized intention and context
+        """
         print(f"recoginzer result:\n{result}")
         # Parse the JSON response
         # Note: In a production system, add more robust error handling
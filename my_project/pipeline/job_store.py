@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Job storage backends for pipeline jobs.
+JobStore defines what the job manager needs from a backend: enqueue, leased claims
+with heartbeats, progress updates and completion. MemoryJobStore keeps jobs in the
+process; SQLiteJobStore keeps them in a WAL-mode database that several service or
+worker processes on one host (or a shared volume) can claim work from. A job whose
+lease is not renewed, because its worker crashed, becomes claimable again until it
+has used up its attempts.
+"""
+
+import os
+import abc
+import copy
+import json
+import time
+import uuid
+import sqlite3
+import importlib
+import threading
+from typing import Dict, Any, Optional, List
+
+from config import settings
+
+STAGES = ("intention", "narration", "image", "music", "video")
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is full."""
+
+
+def _initial_stages() -> Dict[str, Dict[str, Any]]:
+    return {stage: {"status": "pending", "artifact": None} for stage in STAGES}
+
+
+class Job:
+    """One submitted pipeline run."""
+
+    def __init__(self, user_prompt: str, emotional_state: str, output_path: str):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.user_prompt = user_prompt
+        self.emotional_state = emotional_state
+        self.output_path = output_path
+        self.created_at = time.time()
+        self.available_at = self.created_at
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stages: Dict[str, Dict[str, Any]] = _initial_stages()
+        self.video_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.worker_id: Optional[str] = None
+        self.lease_expires: Optional[float] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Job":
+        """Rebuild a job from a stored row (stages as a JSON string)."""
+        job = cls.__new__(cls)
+        job.__dict__.update(row)
+        if isinstance(job.stages, str):
+            job.stages = json.loads(job.stages)
+        return job
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the job state as a JSON-serializable dictionary."""
+        now = time.time()
+        queue_wait = (self.started_at or now) - self.created_at
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_wait": round(queue_wait, 3),
+            "run_time": round((self.finished_at or now) - self.started_at, 3) if self.started_at else None,
+            "attempts": self.attempts,
+            "stages": {stage: dict(entry) for stage, entry in self.stages.items()},
+            "video_path": self.video_path,
+            "error": self.error
+        }
+
+
+class JobStore(abc.ABC):
+    """
+    Interface of a job storage backend.
+
+    Jobs move queued -> running -> succeeded/failed. A claim leases a job to one worker
+    until lease_expires; the worker renews the lease with heartbeat(). Updates from a
+    worker that no longer holds the lease are ignored, so a job reclaimed after a missed
+    heartbeat is only finished by its new worker. A backend missing a method fails at
+    instantiation.
+    """
+
+    @abc.abstractmethod
+    def enqueue(self, job: Job, max_queue: int):
+        """Store a new job, raising JobQueueFullError if max_queue jobs are already waiting."""
+
+    @abc.abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Job]:
+        """Lease the oldest available job to a worker, or return None if there is none."""
+
+    @abc.abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend a lease; returns False if the worker no longer holds it."""
+
+    @abc.abstractmethod
+    def update_stage(self, job_id: str, worker_id: str, stage: str, status: str, artifact: Optional[str] = None):
+        """Record the progress of one pipeline stage."""
+
+    @abc.abstractmethod
+    def complete(self, job_id: str, worker_id: str, video_path: str) -> bool:
+        """Mark a job succeeded; returns False if the worker no longer holds the lease."""
+
+    @abc.abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str, max_attempts: int, retry_delay: float) -> bool:
+        """Requeue a failed job after retry_delay, or mark it failed once it used max_attempts."""
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a snapshot of a job, or None if it is unknown or pruned."""
+
+    @abc.abstractmethod
+    def prune(self, retention: float):
+        """Delete jobs that finished more than retention seconds ago."""
+
+    @abc.abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Get job counts by status and queue wait statistics."""
+
+
+class MemoryJobStore(JobStore):
+    """Job store local to one process."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _owned(self, job_id: str, worker_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.status != "running" or job.worker_id != worker_id:
+            return None
+        return job
+
+    def enqueue(self, job: Job, max_queue: int):
+        with self._lock:
+            if sum(1 for queued in self._jobs.values() if queued.status == "queued") >= max_queue:
+                raise JobQueueFullError(f"Job queue is full ({max_queue} waiting)")
+            self._jobs[job.id] = job
+
+    def claim(self, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Job]:
+        now = time.time()
+        with self._lock:
+            candidates = []
+            for job in self._jobs.values():
+                expired = job.status == "running" and job.lease_expires < now
+                if expired and job.attempts >= max_attempts:
+                    job.status = "failed"
+                    job.error = f"Lease expired after {job.attempts} attempts"
+                    job.finished_at = now
+                elif expired or (job.status == "queued" and job.available_at <= now):
+                    candidates.append(job)
+            if not candidates:
+                return None
+
+            job = min(candidates, key=lambda candidate: candidate.created_at)
+            job.status = "running"
+            job.worker_id = worker_id
+            job.lease_expires = now + lease_seconds
+            job.attempts += 1
+            job.started_at = job.started_at or now
+            job.stages = _initial_stages()
+            return copy.deepcopy(job)
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        with self._lock:
+            job = self._owned(job_id, worker_id)
+            if job is None:
+                return False
+            job.lease_expires = time.time() + lease_seconds
+            return True
+
+    def update_stage(self, job_id: str, worker_id: str, stage: str, status: str, artifact: Optional[str] = None):
+        with self._lock:
+            job = self._owned(job_id, worker_id)
+            if job is not None:
+                entry = job.stages.setdefault(stage, {"status": "pending", "artifact": None})
+                entry["status"] = status
+                if artifact is not None:
+                    entry["artifact"] = artifact
+
+    def complete(self, job_id: str, worker_id: str, video_path: str) -> bool:
+        with self._lock:
+            job = self._owned(job_id, worker_id)
+            if job is None:
+                return False
+            job.status = "succeeded"
+            job.video_path = video_path
+            job.error = None
+            job.finished_at = time.time()
+            job.lease_expires = None
+            return True
+
+    def fail(self, job_id: str, worker_id: str, error: str, max_attempts: int, retry_delay: float) -> bool:
+        now = time.time()
+        with self._lock:
+            job = self._owned(job_id, worker_id)
+            if job is None:
+                return False
+            job.error = error
+            job.lease_expires = None
+            for entry in job.stages.values():
+                if entry["status"] == "running":
+                    entry["status"] = "failed"
+            if job.attempts < max_attempts:
+                job.status = "queued"
+                job.available_at = now + retry_delay
+            else:
+                job.status = "failed"
+                job.finished_at = now
+            return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return copy.deepcopy(job)
+
+    def prune(self, retention: float):
+        cutoff = time.time() - retention
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return _summarize([job.__dict__ for job in self._jobs.values()])
+
+
+def _summarize(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Count jobs by status and compute queue waits of started jobs."""
+    now = time.time()
+    stats = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+    waits = []
+    oldest = None
+    for job in jobs:
+        stats[job["status"]] = stats.get(job["status"], 0) + 1
+        if job["started_at"] is not None:
+            waits.append(job["started_at"] - job["created_at"])
+        elif job["status"] == "queued":
+            oldest = job["created_at"] if oldest is None else min(oldest, job["created_at"])
+    stats["queue_depth"] = stats["queued"]
+    stats["queue_wait_avg"] = round(sum(waits) / len(waits), 3) if waits else 0.0
+    stats["queue_wait_max"] = round(max(waits), 3) if waits else 0.0
+    stats["oldest_queued_wait"] = round(now - oldest, 3) if oldest is not None else 0.0
+    return stats
+
+
+class SQLiteJobStore(JobStore):
+    """Job store in a WAL-mode SQLite database shared by every process using the same path."""
+
+    COLUMNS = ("id", "status", "user_prompt", "emotional_state", "output_path", "created_at",
+               "available_at", "started_at", "finished_at", "stages", "video_path", "error",
+               "attempts", "worker_id", "lease_expires")
+
+    def __init__(self, path: str = None):
+        """
+        Initialize the SQLite job store.
+
+        Args:
+            path: Path to the SQLite database file (defaults to settings)
+        """
+        self.path = path or settings.JOB_STORE_PATH
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Autocommit mode: claims and read-modify-write updates use explicit BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, "
+            "status TEXT NOT NULL, "
+            "user_prompt TEXT NOT NULL, "
+            "emotional_state TEXT NOT NULL, "
+            "output_path TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "available_at REAL NOT NULL, "
+            "started_at REAL, "
+            "finished_at REAL, "
+            "stages TEXT NOT NULL, "
+            "video_path TEXT, "
+            "error TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "worker_id TEXT, "
+            "lease_expires REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_available ON jobs (status, available_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at)")
+
+    def _transaction(self, fn):
+        """Run fn(conn) inside BEGIN IMMEDIATE, so concurrent writers in other processes wait."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def enqueue(self, job: Job, max_queue: int):
+        row = {column: getattr(job, column) for column in self.COLUMNS}
+        row["stages"] = json.dumps(job.stages)
+
+        def insert(conn):
+            waiting = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if waiting >= max_queue:
+                raise JobQueueFullError(f"Job queue is full ({max_queue} waiting)")
+            conn.execute(
+                f"INSERT INTO jobs ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                [row[column] for column in self.COLUMNS]
+            )
+
+        self._transaction(insert)
+
+    def claim(self, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Job]:
+        def take(conn):
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, lease_expires = NULL, "
+                "error = 'Lease expired after ' || attempts || ' attempts' "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, now, max_attempts)
+            )
+            row = conn.execute(
+                "SELECT id FROM jobs "
+                "WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_expires < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker_id = ?, lease_expires = ?, attempts = attempts + 1, "
+                "started_at = COALESCE(started_at, ?), stages = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, json.dumps(_initial_stages()), row["id"])
+            )
+            return Job.from_row(dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()))
+
+        return self._transaction(take)
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def update_stage(self, job_id: str, worker_id: str, stage: str, status: str, artifact: Optional[str] = None):
+        def update(conn):
+            row = conn.execute(
+                "SELECT stages FROM jobs WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row["stages"])
+            entry = stages.setdefault(stage, {"status": "pending", "artifact": None})
+            entry["status"] = status
+            if artifact is not None:
+                entry["artifact"] = artifact
+            conn.execute("UPDATE jobs SET stages = ? WHERE id = ?", (json.dumps(stages), job_id))
+
+        self._transaction(update)
+
+    def complete(self, job_id: str, worker_id: str, video_path: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'succeeded', video_path = ?, error = NULL, finished_at = ?, "
+                "lease_expires = NULL WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (video_path, time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, max_attempts: int, retry_delay: float) -> bool:
+        def update(conn):
+            row = conn.execute(
+                "SELECT attempts, stages FROM jobs WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            stages = json.loads(row["stages"])
+            for entry in stages.values():
+                if entry["status"] == "running":
+                    entry["status"] = "failed"
+            now = time.time()
+            if row["attempts"] < max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', available_at = ?, error = ?, stages = ?, "
+                    "lease_expires = NULL WHERE id = ?",
+                    (now + retry_delay, error, json.dumps(stages), job_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, error = ?, stages = ?, "
+                    "lease_expires = NULL WHERE id = ?",
+                    (now, error, json.dumps(stages), job_id)
+                )
+            return True
+
+        return self._transaction(update)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(dict(row)) if row is not None else None
+
+    def prune(self, retention: float):
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE finished_at < ?", (time.time() - retention,))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            wait_avg, wait_max = self._conn.execute(
+                "SELECT AVG(started_at - created_at), MAX(started_at - created_at) FROM jobs "
+                "WHERE started_at IS NOT NULL"
+            ).fetchone()
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM jobs WHERE status = 'queued' AND started_at IS NULL"
+            ).fetchone()[0]
+        stats = {status: counts.get(status, 0) for status in ("queued", "running", "succeeded", "failed")}
+        stats["queue_depth"] = stats["queued"]
+        stats["queue_wait_avg"] = round(wait_avg or 0.0, 3)
+        stats["queue_wait_max"] = round(wait_max or 0.0, 3)
+        stats["oldest_queued_wait"] = round(time.time() - oldest, 3) if oldest is not None else 0.0
+        return stats
+
+
+def create_job_store(backend: str = None) -> JobStore:
+    """
+    Create the configured job store.
+
+    Args:
+        backend: 'memory', 'sqlite', or 'module:ClassName' of another JobStore
+                 implementation, e.g. one backed by a message broker (defaults to settings)
+
+    Returns:
+        The job store
+    """
+    backend = backend or settings.JOB_STORE
+    if backend == "memory":
+        return MemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore()
+    module_name, _, class_name = backend.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown job store: {backend}")
+    return getattr(importlib.import_module(module_name), class_name)()
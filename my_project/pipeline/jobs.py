@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Asynchronous pipeline jobs.
+Submitted runs are stored in a job store (pipeline/job_store.py) and executed by a
+fixed pool of worker threads on the shared Orchestrator. Workers lease the jobs
+they claim and renew the leases with heartbeats, so with a shared SQLite store several
+service or worker processes split the work and a crashed process's jobs are retried.
+Jobs report stage-level progress and the artifact paths of finished stages while they run.
+
+Usage (a worker-only process sharing the service's SQLite store):
+    JOB_STORE=sqlite python -m pipeline.jobs --workers 4
+"""
+
+import os
+import time
+import socket
+import argparse
+import threading
+import traceback
+from typing import Dict, Any, Optional
+
+from config import settings
+from utils.lanes import get_lane, lane_priority
+from pipeline.job_store import Job, JobStore, MemoryJobStore, JobQueueFullError, create_job_store
+
+
+class JobManager:
+    """Runs jobs from a job store on a fixed pool of worker threads."""
+
+    def __init__(self,
+                 workers: int = None,
+                 max_queue: int = None,
+                 retention: float = None,
+                 store: Optional[JobStore] = None):
+        """
+        Initialize the job manager. Worker threads start with start() or the first submission.
+
+        Args:
+            workers: Number of worker threads (defaults to settings)
+            max_queue: Maximum number of waiting jobs (defaults to settings)
+            retention: Seconds finished jobs are kept for status queries (defaults to settings)
+            store: Job store backend (defaults to the one configured in settings)
+        """
+        self.workers = workers or settings.JOB_WORKERS
+        self.max_queue = max_queue or settings.JOB_QUEUE_SIZE
+        self.retention = settings.JOB_RETENTION if retention is None else retention
+        self.store = store or create_job_store()
+
+        self.lease_seconds = settings.JOB_LEASE_SECONDS
+        self.heartbeat_interval = settings.JOB_HEARTBEAT_INTERVAL
+        self.max_attempts = settings.JOB_MAX_ATTEMPTS
+        self.retry_delay = settings.JOB_RETRY_DELAY
+        self.poll_interval = settings.JOB_POLL_INTERVAL
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._threads = []
+        # job id -> worker id of the jobs this process is running, for heartbeats
+        self._active: Dict[str, str] = {}
+        self._stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "lost_leases": 0
+        }
+
+    def start(self):
+        """Start the worker and heartbeat threads if they are not running yet."""
+        with self._lock:
+            if self._threads:
+                return
+            prefix = f"{socket.gethostname()}:{os.getpid()}"
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, args=(f"{prefix}:{index}",),
+                                          name=f"pipeline-job-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._heartbeat, name="pipeline-job-heartbeat", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, user_prompt: str, emotional_state: str, output_path: str) -> Job:
+        """
+        Queue a pipeline run.
+
+        Args:
+            user_prompt: The user's input prompt
+            emotional_state: The user's emotional state
+            output_path: Path to save output files
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFullError: If the store already holds max_queue waiting jobs
+        """
+        self.start()
+        self.store.prune(self.retention)
+        job = Job(user_prompt, emotional_state, output_path)
+        try:
+            self.store.enqueue(job, self.max_queue)
+        except JobQueueFullError:
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise
+        with self._lock:
+            self._stats["submitted"] += 1
+        self._wakeup.set()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id, or None if it is unknown or expired."""
+        return self.store.get(job_id)
+
+    def _worker(self, worker_id: str):
+        """Worker loop: claim jobs from the store and run them on the shared orchestrator."""
+        from pipeline.orchestrator import get_orchestrator
+
+        while True:
+            try:
+                job = self.store.claim(worker_id, self.lease_seconds, self.max_attempts)
+            except Exception as e:
+                print(f"Job claim failed on {worker_id}: {str(e)}")
+                job = None
+            if job is None:
+                # Woken early by local submissions; jobs from other processes are found by polling
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            with self._lock:
+                self._active[job.id] = worker_id
+            try:
+                # Jobs have their own workers but the priority of the /process lane
+                with lane_priority(get_lane('process').priority):
+                    video_path = get_orchestrator().run_pipeline(
+                        user_prompt=job.user_prompt,
+                        emotional_state=job.emotional_state,
+                        output_path=job.output_path,
+                        progress=lambda stage, status, artifact=None, job_id=job.id: self.store.update_stage(
+                            job_id, worker_id, stage, status, artifact)
+                    )
+                owned = self.store.complete(job.id, worker_id, video_path)
+            except Exception as e:
+                print(f"Job {job.id} failed (attempt {job.attempts}/{self.max_attempts}): {str(e)}")
+                traceback.print_exc()
+                try:
+                    owned = self.store.fail(job.id, worker_id, str(e), self.max_attempts, self.retry_delay)
+                except Exception as store_error:
+                    # The lease expires and the job is retried elsewhere
+                    print(f"Job {job.id}: recording the failure failed: {str(store_error)}")
+                    owned = True
+            finally:
+                with self._lock:
+                    self._active.pop(job.id, None)
+
+            if not owned:
+                print(f"Job {job.id}: lease was lost to another worker, result discarded")
+                with self._lock:
+                    self._stats["lost_leases"] += 1
+
+    def _heartbeat(self):
+        """Renew the leases of the jobs this process is running."""
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._lock:
+                active = list(self._active.items())
+            for job_id, worker_id in active:
+                try:
+                    if not self.store.heartbeat(job_id, worker_id, self.lease_seconds):
+                        print(f"Job {job_id}: heartbeat rejected, lease held by another worker")
+                except Exception as e:
+                    print(f"Job {job_id}: heartbeat failed: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, job counts and queue wait statistics."""
+        stats = self.store.get_stats()
+        with self._lock:
+            stats.update(self._stats)
+            stats["running_here"] = len(self._active)
+        stats["max_queue"] = self.max_queue
+        stats["workers"] = self.workers
+        stats["store"] = type(self.store).__name__
+        return stats
+
+
+# Process-wide job manager, created on first use
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Get the shared job manager."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
+
+
+def get_job_stats() -> Dict[str, Any]:
+    """Get job queue statistics without starting the workers."""
+    return get_job_manager().get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run pipeline job workers against the shared job store')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker threads')
+    args = parser.parse_args()
+
+    manager = JobManager(workers=args.workers)
+    if isinstance(manager.store, MemoryJobStore):
+        print("JOB_STORE is 'memory': a separate worker process would never see the service's jobs")
+        return
+    manager.start()
+    print(f"Running {manager.workers} job workers on {type(manager.store).__name__}")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"Jobs: {manager.get_stats()}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ import os
 import shutil
 from typing import Dict, Any, List, Optional
 
-from api.model_client import ModelClient
+from api.client_pool import get_model_client
 from config import settings
 
 
@@ -23,7 +23,7 @@ class MusicSelector:
         Args:
             model_name: Name of the LLM model to use for music type determination
         """
-        self.model_client = ModelClient(model_type='text')
+        self.model_client = get_model_client('text')
         self.model_name = model_name or settings.MODEL_DEFAULTS["text_model"]
         
         # Define music types and their emotional associations
@@ -3,33 +3,83 @@
 
 """
 Orchestrator to manage the entire pipeline flow.
+Components are built on first use, and their modules (with the provider SDKs) are
+imported then too, so an orchestrator that only generates text never loads the TTS,
+music or video components. One process-wide orchestrator
+(get_orchestrator) is shared by all requests; components keep no per-call state.
 """
 
 import os
+import time
+import threading
+import importlib
 import concurrent.futures
-from typing import Dict, Any, Optional, Tuple, Generator
+from typing import Dict, Any, Optional, Tuple, Generator, Callable, List
 
-from pipeline.intention_recognition import IntentionRecognizer
-from pipeline.prompt_creator import PromptCreator
-from pipeline.image_prompt_creator import ImagePromptCreator
-from pipeline.script_generator import ScriptGenerator
-from pipeline.music_selector import MusicSelector
-from pipeline.text_to_speech import TextToSpeech
-from pipeline.video_synthesizer import VideoSynthesizer
+from utils.lanes import submit_with_context
+
+
+class _LazyComponent:
+    """Orchestrator attribute that imports and builds its component on first access."""
+    
+    def __init__(self, module: str, class_name: str):
+        self.module = module
+        self.class_name = class_name
+    
+    def factory(self) -> Any:
+        return getattr(importlib.import_module(self.module), self.class_name)()
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        # Built components are stored in the instance dict, which takes precedence over
+        # this (non-data) descriptor, so later accesses are plain attribute lookups
+        with instance._component_lock:
+            component = instance.__dict__.get(self.name)
+            if component is None:
+                component = self.factory()
+                instance.__dict__[self.name] = component
+        return component
 
 
 class Orchestrator:
     """Orchestrates the entire pipeline flow."""
     
+    COMPONENTS = ("intention_recognizer", "prompt_creator", "image_prompt_creator", "script_generator",
+                  "music_selector", "text_to_speech", "video_synthesizer")
+    
+    intention_recognizer = _LazyComponent("pipeline.intention_recognition", "IntentionRecognizer")
+    prompt_creator = _LazyComponent("pipeline.prompt_creator", "PromptCreator")
+    image_prompt_creator = _LazyComponent("pipeline.image_prompt_creator", "ImagePromptCreator")
+    script_generator = _LazyComponent("pipeline.script_generator", "ScriptGenerator")
+    music_selector = _LazyComponent("pipeline.music_selector", "MusicSelector")
+    text_to_speech = _LazyComponent("pipeline.text_to_speech", "TextToSpeech")
+    video_synthesizer = _LazyComponent("pipeline.video_synthesizer", "VideoSynthesizer")
+    
     def __init__(self):
-        """Initialize all pipeline components."""
-        self.intention_recognizer = IntentionRecognizer()
-        self.prompt_creator = PromptCreator()
-        self.image_prompt_creator = ImagePromptCreator()
-        self.script_generator = ScriptGenerator()
-        self.music_selector = MusicSelector()
-        self.text_to_speech = TextToSpeech()
-        self.video_synthesizer = VideoSynthesizer()
+        """Initialize the orchestrator; components are built on first use."""
+        self._component_lock = threading.RLock()
+    
+    def warm_up(self, components: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Build components ahead of the first request.
+        
+        Args:
+            components: Names of the components to build (defaults to all)
+            
+        Returns:
+            Dictionary mapping component name to its construction time in seconds
+            (0.0 if it was already built)
+        """
+        timings = {}
+        for name in components or self.COMPONENTS:
+            start_time = time.perf_counter()
+            getattr(self, name)
+            timings[name] = round(time.perf_counter() - start_time, 4)
+        return timings
     
     def generate_text_only(self, user_prompt: str, emotional_state: str = "neutral") -> str:
         """
@@ -52,13 +102,15 @@ class Orchestrator:
         
         return script
     
-    def generate_text_stream(self, user_prompt: str, emotional_state: str = "neutral") -> Generator[str, None, None]:
+    def generate_text_stream(self, user_prompt: str, emotional_state: str = "neutral",
+                             cancel: Optional[threading.Event] = None) -> Generator[str, None, None]:
         """
         Generate meditation text with streaming output.
         
         Args:
             user_prompt: The user's input prompt
             emotional_state: The user's emotional state
+            cancel: Optional event that stops generation once set (e.g. the client disconnected)
             
         Yields:
             Text chunks as they are generated
@@ -68,19 +120,11 @@ class Orchestrator:
             user_prompt, emotional_state
         )
         
-        # Step 2: Generate text script with streaming
-        # For now, we'll simulate streaming by splitting the text
-        # In a real implementation, you would modify the underlying model client
-        # to support streaming responses
-        full_text = self.prompt_creator.create_prompt(recognized_intention)
-        
-        # Split text into sentences for streaming effect
-        sentences = full_text.split('. ')
-        for i, sentence in enumerate(sentences):
-            if i == len(sentences) - 1:
-                yield sentence  # Last sentence, no period needed
-            else:
-                yield sentence + '. '
+        if cancel is not None and cancel.is_set():
+            return
+        
+        # Step 2: Generate text script, forwarding deltas as the model produces them
+        yield from self.prompt_creator.create_prompt_stream(recognized_intention, cancel=cancel)
     
     def generate_image_only(self, text_content: str, output_path: str) -> str:
         """
@@ -130,36 +174,7 @@ class Orchestrator:
         # Create output directory if it doesn't exist
         os.makedirs(output_path, exist_ok=True)
         
-        # Handle image path - convert URL path to absolute file path if needed
-        if image_path is not None:
-            # If image_path starts with /images/, /videos/, etc., convert to absolute path
-            if image_path.startswith('/images/') or image_path.startswith('/videos/'):
-                # Remove the leading slash and construct the path relative to logindemo/uploads
-                relative_path = image_path[1:]  # Remove leading '/'
-                # Get the project root directory (parent of my_project)
-                # Current file is in my_project/pipeline/orchestrator.py
-                # We need to go up two levels: pipeline -> my_project -> project_root
-                current_file_dir = os.path.dirname(os.path.abspath(__file__))  # my_project/pipeline
-                my_project_dir = os.path.dirname(current_file_dir)  # my_project
-                project_root = os.path.dirname(my_project_dir)  # project root
-                logindemo_uploads = os.path.join(project_root, "logindemo", "uploads")
-                
-                # Construct the full path
-                full_image_path = os.path.join(logindemo_uploads, relative_path)
-                
-                print(f"Converting URL path {image_path} to file path: {full_image_path}")
-                
-                # Check if the file exists
-                if os.path.exists(full_image_path):
-                    image_path = full_image_path
-                    print(f"Found image at: {image_path}")
-                else:
-                    print(f"Image file not found at: {full_image_path}")
-                    # If not found, generate a new image
-                    image_path = None
-            elif not os.path.isabs(image_path):
-                # If it's a relative path, make it absolute
-                image_path = os.path.abspath(image_path)
+        image_path = self._resolve_image_path(image_path)
         
         # Generate image if not provided or not found
         if image_path is None or not os.path.exists(image_path):
@@ -169,8 +184,8 @@ class Orchestrator:
         print(f"Using image path: {image_path}")
         
         # Generate audio from text
-        # Limit text length for audio generation
-        script = text_content[:500] if len(text_content) > 500 else text_content
+        # Limit text length for audio generation unless long scripts are chunked
+        script = text_content if self.text_to_speech.chunked else text_content[:500]
         # script = text_content
         
         # Save script to file
@@ -185,10 +200,7 @@ class Orchestrator:
         )
         
         # Select background music
-        # Use absolute path to the music file
-        current_file_dir = os.path.dirname(os.path.abspath(__file__))  # my_project/pipeline
-        my_project_dir = os.path.dirname(current_file_dir)  # my_project
-        music_path = os.path.join(my_project_dir, 'music_library', '瑜伽冥想减压音乐 - Awakening.mp3')
+        music_path = self._default_music_path()
         
         # Create video
         video_path = self.video_synthesizer.create_video(
@@ -218,8 +230,9 @@ class Orchestrator:
         script_path = os.path.join(output_path, "script.txt")
         with open(script_path, "w") as f:
             f.write(f"generated script:\n{script}")
-        # 测试一下，限制字数
-        script = script[:500]
+        # 测试一下，限制字数 (chunked TTS handles full-length scripts)
+        if not self.text_to_speech.chunked:
+            script = script[:500]
         audio_path = self.text_to_speech.convert(
             script, 
             output_path=os.path.join(output_path, "narration.mp3")
@@ -264,16 +277,63 @@ class Orchestrator:
             output_path=os.path.join(output_path, "background.mp3")
         )
         '''
+        return self._default_music_path()
+    
+    def _default_music_path(self) -> str:
+        """Get the absolute path of the default background music file."""
         # Use absolute path to the music file
         current_file_dir = os.path.dirname(os.path.abspath(__file__))  # my_project/pipeline
         my_project_dir = os.path.dirname(current_file_dir)  # my_project
-        music_path = os.path.join(my_project_dir, 'music_library', '瑜伽冥想减压音乐 - Awakening.mp3')
-        return music_path
+        return os.path.join(my_project_dir, 'music_library', '瑜伽冥想减压音乐 - Awakening.mp3')
+    
+    def _resolve_image_path(self, image_path: Optional[str]) -> Optional[str]:
+        """
+        Convert an image URL path from the frontend to an absolute file path.
+        
+        Args:
+            image_path: Image path as sent by the client (may be None)
+            
+        Returns:
+            Absolute path to the image, or None if it has to be generated
+        """
+        # Handle image path - convert URL path to absolute file path if needed
+        if image_path is not None:
+            # If image_path starts with /images/, /videos/, etc., convert to absolute path
+            if image_path.startswith('/images/') or image_path.startswith('/videos/'):
+                # Remove the leading slash and construct the path relative to logindemo/uploads
+                relative_path = image_path[1:]  # Remove leading '/'
+                # Get the project root directory (parent of my_project)
+                # Current file is in my_project/pipeline/orchestrator.py
+                # We need to go up two levels: pipeline -> my_project -> project_root
+                current_file_dir = os.path.dirname(os.path.abspath(__file__))  # my_project/pipeline
+                my_project_dir = os.path.dirname(current_file_dir)  # my_project
+                project_root = os.path.dirname(my_project_dir)  # project root
+                logindemo_uploads = os.path.join(project_root, "logindemo", "uploads")
+                
+                # Construct the full path
+                full_image_path = os.path.join(logindemo_uploads, relative_path)
+                
+                print(f"Converting URL path {image_path} to file path: {full_image_path}")
+                
+                # Check if the file exists
+                if os.path.exists(full_image_path):
+                    image_path = full_image_path
+                    print(f"Found image at: {image_path}")
+                else:
+                    print(f"Image file not found at: {full_image_path}")
+                    # If not found, generate a new image
+                    image_path = None
+            elif not os.path.isabs(image_path):
+                # If it's a relative path, make it absolute
+                image_path = os.path.abspath(image_path)
+        
+        return image_path
     
     def run_pipeline(self, 
                     user_prompt: str, 
                     emotional_state: str = "neutral",
-                    output_path: str = "output") -> str:
+                    output_path: str = "output",
+                    progress: Optional[Callable[..., None]] = None) -> str:
         """
         Run the entire pipeline with parallel processing.
         
@@ -281,42 +341,66 @@ class Orchestrator:
             user_prompt: The user's input prompt
             emotional_state: The user's emotional state
             output_path: Path to save output files
+            progress: Optional callback progress(stage, status, artifact=None), called as
+                      the intention, narration, image, music and video stages start and finish
             
         Returns:
             Path to the final output video
         """
+        report = progress or (lambda stage, status, artifact=None: None)
+        
         # Create output directory if it doesn't exist
         os.makedirs(output_path, exist_ok=True)
         
         # Step 1: Intention recognition and rewrite
+        report("intention", "running")
         recognized_intention = self.intention_recognizer.process(
             user_prompt, emotional_state
         )
+        report("intention", "done")
         
         # Step 2: Execute the three branches in parallel
         with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
             # Start all pipeline branches concurrently
-            text_future = executor.submit(
-                self._text_pipeline, recognized_intention, output_path
-            )
-            image_future = executor.submit(
-                self._image_pipeline, recognized_intention, output_path
-            )
-            music_future = executor.submit(
-                self._music_pipeline, recognized_intention, output_path
-            )
+            # Branches keep the caller's lane priority for their provider calls
+            branches = {
+                "narration": submit_with_context(executor, self._text_pipeline, recognized_intention, output_path),
+                "image": submit_with_context(executor, self._image_pipeline, recognized_intention, output_path),
+                "music": submit_with_context(executor, self._music_pipeline, recognized_intention, output_path)
+            }
+            for stage, future in branches.items():
+                report(stage, "running")
+                future.add_done_callback(
+                    lambda f, stage=stage: report(stage, "done", f.result()) if not f.exception() else None
+                )
             
             # Collect results as they complete
-            audio_path = text_future.result()
-            image_path = image_future.result()
-            music_path = music_future.result()
+            audio_path = branches["narration"].result()
+            image_path = branches["image"].result()
+            music_path = branches["music"].result()
         
         # Step 3: Synthesize video from all components
+        report("video", "running")
         video_path = self.video_synthesizer.create_video(
             image_path=image_path,
             audio_path=audio_path,
             music_path=music_path,
             output_path=os.path.join(output_path, "final_video.mp4")
         )
+        report("video", "done", video_path)
         
-        return video_path 
\ No newline at end of file
+        return video_path
+
+
+# Process-wide orchestrator, created on first use
+_orchestrator = None
+_orchestrator_lock = threading.Lock()
+
+
+def get_orchestrator() -> Orchestrator:
+    """Get the shared orchestrator."""
+    global _orchestrator
+    with _orchestrator_lock:
+        if _orchestrator is None:
+            _orchestrator = Orchestrator()
+        return _orchestrator
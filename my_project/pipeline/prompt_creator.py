@@ -5,9 +5,10 @@
 Prompt creator module for generating text prompts.
 """
 
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Iterator, AsyncIterator, Optional
 
-from api.model_client import ModelClient
+from api.client_pool import get_model_client, get_async_model_client
 from config import settings
 
 
@@ -21,7 +22,7 @@ class PromptCreator:
         Args:
             model_name: Name of the LLM model to use (defaults to settings)
         """
-        self.model_client = ModelClient(model_type='text')
+        self.model_client = get_model_client('text')
         self.model_name = model_name or settings.MODEL_DEFAULTS["text_model"]
         
         self.general_requirements = """
@@ -100,15 +101,15 @@ The script should:
 - Provide practical guidance
 - End with a sense of closure and hope"""
     
-    def create_prompt(self, intention_data: Dict[str, Any]) -> str:
+    def _build_prompt(self, intention_data: Dict[str, Any]) -> str:
         """
-        Create a prompt for script generation based on recognized intention.
+        Build the script generation prompt from the recognized intention.
         
         Args:
             intention_data: Dictionary containing intention analysis
             
         Returns:
-            A formatted prompt string
+            The full prompt sent to the LLM
         """
         # Extract data from the intention analysis
         intention = intention_data.get("intention", "").lower()
@@ -137,6 +138,20 @@ The script should:
         prompt += '\n\n' + self.final_requirements
         print(prompt)
         # raise Exception("Stop here")
+        return prompt
+    
+    def create_prompt(self, intention_data: Dict[str, Any]) -> str:
+        """
+        Create a prompt for script generation based on recognized intention.
+        
+        Args:
+            intention_data: Dictionary containing intention analysis
+            
+        Returns:
+            A formatted prompt string
+        """
+        prompt = self._build_prompt(intention_data)
+        
         # Get enhanced prompt from LLM
         enhanced_prompt = self.model_client.generate_text(
             prompt=prompt,
@@ -146,6 +161,67 @@ The script should:
         )
         
         return enhanced_prompt 
+    
+    async def create_prompt_async(self, intention_data: Dict[str, Any]) -> str:
+        """
+        Asyncio counterpart of create_prompt.
+        
+        Args:
+            intention_data: Dictionary containing intention analysis
+            
+        Returns:
+            The generated script
+        """
+        return await get_async_model_client('text').generate_text(
+            prompt=self._build_prompt(intention_data),
+            model=self.model_name,
+            temperature=0.6,
+            component="PromptCreator"
+        )
+    
+    def create_prompt_stream(self, intention_data: Dict[str, Any],
+                             cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """
+        Same as create_prompt, but yields the script as the LLM generates it.
+        
+        Args:
+            intention_data: Dictionary containing intention analysis
+            cancel: Optional event that aborts the LLM stream once set
+            
+        Yields:
+            Script text chunks
+        """
+        prompt = self._build_prompt(intention_data)
+        
+        yield from self.model_client.generate_text_iter(
+            prompt=prompt,
+            model=self.model_name,
+            temperature=0.6,
+            component="PromptCreator",
+            cancel=cancel
+        )
+    
+    async def create_prompt_stream_async(self, intention_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Asyncio counterpart of create_prompt_stream.
+        
+        Args:
+            intention_data: Dictionary containing intention analysis
+            
+        Yields:
+            Script text chunks
+        """
+        chunks = get_async_model_client('text').generate_text_iter(
+            prompt=self._build_prompt(intention_data),
+            model=self.model_name,
+            temperature=0.6,
+            component="PromptCreator"
+        )
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
 
 
 def main():
@@ -5,7 +5,7 @@
 Script generator module for creating text scripts.
 """
 
-from api.model_client import ModelClient
+from api.client_pool import get_model_client
 from config import settings
 
 
@@ -19,7 +19,7 @@ class ScriptGenerator:
         Args:
             model_name: Name of the LLM model to use (defaults to settings)
         """
-        self.model_client = ModelClient(model_type='text')
+        self.model_client = get_model_client('text')
         self.model_name = model_name or settings.MODEL_DEFAULTS["text_model"]
     
     def generate_script(self, prompt: str) -> str:
@@ -6,24 +6,48 @@ Text to speech module for converting text scripts to audio.
 """
 
 import os
-from typing import Optional
+import re
+import shutil
+import asyncio
+import tempfile
+import subprocess
+import concurrent.futures
+from typing import Optional, List, Tuple
 
-from api.model_client import ModelClient
+from api.client_pool import get_model_client, get_async_model_client
+from api.audio_cache import get_audio_cache
+from utils.lanes import submit_with_context
 from config import settings
 
+# Pause markers understood by the minimaxi API, e.g. <#0.5#>
+PAUSE_MARKER = re.compile(r'<#(\d+(?:\.\d+)?)#>')
+PAUSE_SPLIT = re.compile(r'(<#\d+(?:\.\d+)?#>)')
+TRAILING_PAUSE = re.compile(r'<#(\d+(?:\.\d+)?)#>\s*$')
+# Split right after sentence endings and line breaks, keeping the text intact
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?。！？\n])')
+
 
 class TextToSpeech:
     """Converts text to speech audio."""
     
-    def __init__(self, model_name: str = None):
+    def __init__(self,
+                model_name: str = None,
+                streaming: Optional[bool] = None,
+                chunked: Optional[bool] = None):
         """
         Initialize the text-to-speech converter.
         
         Args:
             model_name: Name of the TTS model to use (defaults to settings)
+            streaming: Stream audio chunks straight to disk (defaults to settings)
+            chunked: Synthesize long scripts as parallel chunks (defaults to settings)
         """
-        self.model_client = ModelClient(model_type='tts')
+        self.model_client = get_model_client('tts')
         self.model = model_name or settings.MODEL_DEFAULTS["tts_model"]
+        self.streaming = settings.TTS_STREAMING if streaming is None else streaming
+        self.chunked = settings.TTS_CHUNKED if chunked is None else chunked
+        self.chunk_chars = settings.TTS_CHUNK_CHARS
+        self.audio_cache = get_audio_cache() if settings.TTS_CACHE_ENABLED else None
     
     def convert(self, text: str, output_path: str) -> str:
         """
@@ -40,6 +64,43 @@ class TextToSpeech:
             # Ensure directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
+            chunks = self._split_script(text) if self.chunked else []
+            if len(chunks) > 1:
+                return self._convert_chunked(chunks, output_path)
+            
+            return self._synthesize_chunk(text, output_path)
+            
+        except Exception as e:
+            print(f"Error in text-to-speech conversion: {e}")
+            
+            # For demonstration, create a placeholder audio file
+            self._create_placeholder_audio(output_path)
+            return output_path
+    
+    def _synthesize_chunk(self, text: str, output_path: str) -> str:
+        """
+        Synthesize one piece of text into an audio file.
+        
+        Args:
+            text: The text to synthesize
+            output_path: Path to save the audio file
+            
+        Returns:
+            Path to the audio file
+        """
+        # Recurring lines (openings, closings) are served from the audio cache
+        cache_key = self._cache_key(text)
+        if cache_key and self.audio_cache.get(cache_key, output_path):
+            return output_path
+        
+        if self.streaming:
+            # Audio is decoded chunk by chunk and appended to the file
+            self.model_client.text_to_speech_stream(
+                text=text,
+                output_path=output_path,
+                component="TextToSpeech"
+            )
+        else:
             # Call the text_to_speech method from ModelClient
             # The new implementation only requires text parameter
             audio_data = self.model_client.text_to_speech(
@@ -50,16 +111,204 @@ class TextToSpeech:
             # Save the audio file
             with open(output_path, 'wb') as f:
                 f.write(audio_data)
+        
+        if cache_key:
+            self.audio_cache.set(cache_key, output_path)
+        return output_path
+    
+    def _cache_key(self, text: str) -> Optional[str]:
+        """Audio cache key of a text with the current voice settings, or None if caching is off."""
+        if self.audio_cache is None:
+            return None
+        return self.audio_cache.make_key(text, **self.model_client.speech_settings())
+    
+    def _convert_chunked(self, chunks: List[Tuple[str, float]], output_path: str) -> str:
+        """
+        Synthesize chunks concurrently and join them in order.
+        Concurrency is bounded by the worker count and the TTS rate limiter.
+        
+        Args:
+            chunks: Chunk texts with the pause (seconds) that follows each
+            output_path: Path to save the joined audio file
             
-            return output_path
+        Returns:
+            Path to the joined audio file
+        """
+        chunk_dir = tempfile.mkdtemp(prefix=".tts_chunks_", dir=os.path.dirname(output_path))
+        try:
+            chunk_paths = [os.path.join(chunk_dir, f"chunk_{i:03d}.mp3") for i in range(len(chunks))]
+            with concurrent.futures.ThreadPoolExecutor(max_workers=settings.TTS_CHUNK_WORKERS) as executor:
+                futures = [
+                    submit_with_context(executor, self._synthesize_chunk, chunk_text, chunk_path)
+                    for (chunk_text, _), chunk_path in zip(chunks, chunk_paths)
+                ]
+                for future in futures:
+                    future.result()
+            
+            pauses = [pause for _, pause in chunks]
+            return self._concatenate_audio(chunk_paths, pauses, output_path)
+        finally:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+    
+    def _split_script(self, text: str) -> List[Tuple[str, float]]:
+        """
+        Split a script into chunks at sentence, paragraph and pause-marker boundaries.
+        Pause markers inside a chunk are left to the provider; a pause at a chunk
+        boundary is returned so it can be rendered as silence between chunks.
+        
+        Args:
+            text: The full script
+            
+        Returns:
+            List of chunk texts with the pause (seconds) that follows each
+        """
+        chunks = []
+        current = ''
+        for part in PAUSE_SPLIT.split(text):
+            pause = PAUSE_MARKER.fullmatch(part)
+            if pause:
+                if current.strip():
+                    current += part
+                elif chunks:
+                    chunks[-1][1] += float(pause.group(1))
+                continue
+            
+            for sentence in SENTENCE_SPLIT.split(part):
+                if not sentence.strip():
+                    # Keep paragraph breaks inside a chunk
+                    current += sentence if current.strip() else ''
+                    continue
+                if current.strip() and len(current) + len(sentence) > self.chunk_chars:
+                    chunks.append(self._close_chunk(current))
+                    current = ''
+                current += sentence
+        
+        if current.strip():
+            chunks.append(self._close_chunk(current))
+        return [(chunk_text, pause) for chunk_text, pause in chunks]
+    
+    def _close_chunk(self, text: str) -> list:
+        """Strip trailing pause markers off a chunk and return [text, pause seconds]."""
+        pause = 0.0
+        text = text.strip()
+        match = TRAILING_PAUSE.search(text)
+        while match:
+            pause += float(match.group(1))
+            text = text[:match.start()].rstrip()
+            match = TRAILING_PAUSE.search(text)
+        return [text, pause]
+    
+    def _concatenate_audio(self, chunk_paths: List[str], pauses: List[float], output_path: str) -> str:
+        """
+        Join chunk audio files in order, inserting silence for boundary pauses.
+        Uses the FFmpeg concat filter so the result is a single gapless stream;
+        without FFmpeg the MP3 frames are appended directly and boundary pauses are dropped.
+        
+        Args:
+            chunk_paths: Audio files in script order
+            pauses: Silence (seconds) to insert after each chunk
+            output_path: Path to save the joined audio file
+            
+        Returns:
+            Path to the joined audio file
+        """
+        inputs = []
+        labels = []
+        for chunk_path, pause in zip(chunk_paths, pauses):
+            inputs += ["-i", chunk_path]
+            labels.append(f"[{len(labels)}:a]")
+            if pause > 0:
+                inputs += ["-f", "lavfi", "-t", str(pause), "-i", "anullsrc=r=32000:cl=mono"]
+                labels.append(f"[{len(labels)}:a]")
+        
+        command = [
+            "ffmpeg", "-y",
+            *inputs,
+            "-filter_complex", f"{''.join(labels)}concat=n={len(labels)}:v=0:a=1[aout]",
+            "-map", "[aout]",
+            "-c:a", "libmp3lame", "-b:a", "128k",
+            output_path
+        ]
+        try:
+            subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        except (subprocess.SubprocessError, FileNotFoundError) as e:
+            print(f"FFmpeg concatenation failed ({e}), appending MP3 frames instead")
+            with open(output_path, 'wb') as out:
+                for chunk_path in chunk_paths:
+                    with open(chunk_path, 'rb') as f:
+                        shutil.copyfileobj(f, out)
+        
+        return output_path
+    
+    async def convert_async(self, text: str, output_path: str) -> str:
+        """
+        Asyncio counterpart of convert.
+        At most TTS_CHUNK_WORKERS chunks are synthesized at once, like the worker pool of convert.
+        
+        Args:
+            text: The text script to convert
+            output_path: Path to save the generated audio file
+            
+        Returns:
+            Path to the generated audio file
+        """
+        try:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            
+            # Same rule as convert: no or one chunk is synthesized as a whole
+            chunks = self._split_script(text) if self.chunked else []
+            if len(chunks) <= 1:
+                return await self._synthesize_chunk_async(text, output_path)
+            
+            chunk_dir = tempfile.mkdtemp(prefix=".tts_chunks_", dir=os.path.dirname(output_path))
+            try:
+                chunk_paths = [os.path.join(chunk_dir, f"chunk_{i:03d}.mp3") for i in range(len(chunks))]
+                workers = asyncio.Semaphore(settings.TTS_CHUNK_WORKERS)
+                
+                async def synthesize(chunk_text: str, chunk_path: str) -> str:
+                    async with workers:
+                        return await self._synthesize_chunk_async(chunk_text, chunk_path)
+                
+                await asyncio.gather(*(
+                    synthesize(chunk_text, chunk_path)
+                    for (chunk_text, _), chunk_path in zip(chunks, chunk_paths)
+                ))
+                return await asyncio.to_thread(
+                    self._concatenate_audio, chunk_paths, [pause for _, pause in chunks], output_path
+                )
+            finally:
+                shutil.rmtree(chunk_dir, ignore_errors=True)
             
         except Exception as e:
             print(f"Error in text-to-speech conversion: {e}")
-            
-            # For demonstration, create a placeholder audio file
             self._create_placeholder_audio(output_path)
             return output_path
     
+    async def _synthesize_chunk_async(self, text: str, output_path: str) -> str:
+        """Asyncio counterpart of _synthesize_chunk."""
+        cache_key = self._cache_key(text)
+        if cache_key and await asyncio.to_thread(self.audio_cache.get, cache_key, output_path):
+            return output_path
+        
+        if self.streaming:
+            await get_async_model_client('tts').text_to_speech_stream(
+                text=text,
+                output_path=output_path,
+                component="TextToSpeech"
+            )
+        else:
+            audio_data = await get_async_model_client('tts').text_to_speech(
+                text=text,
+                component="TextToSpeech"
+            )
+            
+            with open(output_path, 'wb') as f:
+                f.write(audio_data)
+        
+        if cache_key:
+            await asyncio.to_thread(self.audio_cache.set, cache_key, output_path)
+        return output_path
+    
     def _create_placeholder_audio(self, output_path: str):
         """Create a placeholder audio file for demonstration purposes."""
         # Directory is already created in the convert method, no need to recreate it here
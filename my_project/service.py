@@ -7,37 +7,42 @@ Replaces the command-line interface with a web service.
 """
 
 import os
+import time
+import uuid
+import threading
 from datetime import datetime
 from flask import Flask, request, jsonify, Response
-from pipeline.orchestrator import Orchestrator
+from pipeline.orchestrator import get_orchestrator
+from pipeline.jobs import get_job_manager, get_job_stats, JobQueueFullError
+from api.client_pool import warm_up_clients, get_pool_stats
+from api.single_flight import get_single_flight_stats
+from api.hedging import get_hedge_stats
+from api.rate_limiter import get_rate_limiter_stats
+from api.audio_cache import get_audio_cache
+from utils.sse import stream_events
+from utils.admission import get_admission, get_admission_stats, AdmissionRejected
+from utils.lanes import get_lane, get_lane_stats, lane_priority
+from utils.file_utils import DEFAULT_OUTPUT_PATH, ensure_upload_dirs
+from config import settings
 
+# The pipeline and provider SDKs (openai, dashscope, httpx, requests) are imported on
+# first use, so the service answers /health soon after start; see benchmarks/import_time.py
 app = Flask(__name__)
 
-# 修复路径配置 - 指向logindemo项目的uploads目录
-# 当前文件位置：/Users/dengsihang/Desktop/HKU/meditation-assistant/my_project/service.py
-# 目标位置：/Users/dengsihang/Desktop/HKU/meditation-assistant/logindemo/uploads/
-LOGINDEMO_UPLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                                    "..", "logindemo", "uploads")
-DEFAULT_OUTPUT_PATH = os.path.abspath(LOGINDEMO_UPLOADS_DIR)
+# Background work (warm-up, job workers) starts once per serving process
+_background_started = False
+_background_lock = threading.Lock()
 
-print(f"Service.py 当前路径: {os.path.dirname(os.path.abspath(__file__))}")
-print(f"目标uploads目录: {DEFAULT_OUTPUT_PATH}")
-print(f"uploads目录是否存在: {os.path.exists(DEFAULT_OUTPUT_PATH)}")
-
-# 确保uploads目录存在
-if not os.path.exists(DEFAULT_OUTPUT_PATH):
-    os.makedirs(DEFAULT_OUTPUT_PATH, exist_ok=True)
-    print(f"创建uploads目录: {DEFAULT_OUTPUT_PATH}")
-
-# 确保images和videos子目录存在
-images_dir = os.path.join(DEFAULT_OUTPUT_PATH, "images")
-videos_dir = os.path.join(DEFAULT_OUTPUT_PATH, "videos")
-if not os.path.exists(images_dir):
-    os.makedirs(images_dir, exist_ok=True)
-    print(f"创建images目录: {images_dir}")
-if not os.path.exists(videos_dir):
-    os.makedirs(videos_dir, exist_ok=True)
-    print(f"创建videos目录: {videos_dir}")
+@app.before_request
+def prepare_service():
+    """
+    Create the upload directories and start background work on the first request.
+    This covers every way of serving the app (WSGI servers such as gunicorn or waitress,
+    or __main__ with or without the reloader); later requests find it already done.
+    """
+    if not _background_started:
+        ensure_upload_dirs()
+        start_background()
 
 @app.route('/process', methods=['POST'])
 def process_pipeline():
@@ -48,7 +53,8 @@ def process_pipeline():
     {
         "user_prompt": "string",
         "emotional_state": "string",  // optional, defaults to "neutral"
-        "output_path": "string"       // optional, defaults to logindemo uploads
+        "output_path": "string",      // optional, defaults to logindemo uploads
+        "async": true/false           // optional, queue the run as a job (see /jobs)
     }
     
     Returns:
@@ -57,6 +63,7 @@ def process_pipeline():
         "video_path": "path/to/final_video.mp4",
         "message": "success/error message"
     }
+    or, for async requests, 202 with the job id and status URL
     """
     try:
         # Get parameters from JSON request
@@ -84,25 +91,111 @@ def process_pipeline():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         timestamped_output_path = os.path.join(output_path, "temp", timestamp)
         
-        # Initialize the orchestrator and run the pipeline
-        orchestrator = Orchestrator()
-        final_video_path = orchestrator.run_pipeline(
-            user_prompt=user_prompt,
-            emotional_state=emotional_state,
-            output_path=timestamped_output_path
-        )
+        if data.get('async'):
+            return submit_job(user_prompt, emotional_state, output_path)
+        
+        # Run the pipeline on the shared orchestrator, in the render lane
+        orchestrator = get_orchestrator()
+        with get_admission('process').slot():
+            final_video_path = get_lane('process').run(
+                orchestrator.run_pipeline,
+                user_prompt=user_prompt,
+                emotional_state=emotional_state,
+                output_path=timestamped_output_path
+            )
         return jsonify({
             "success": True,
             "video_path": final_video_path,
             "message": "Pipeline execution completed successfully"
         })
         
+    except AdmissionRejected as e:
+        return admission_rejected(e)
     except Exception as e:
         return jsonify({
             "success": False,
             "message": f"Pipeline execution failed: {str(e)}"
         }), 500
 
+def admission_rejected(e: AdmissionRejected):
+    """429 response for a request turned away by admission control."""
+    response = jsonify({
+        "success": False,
+        "message": str(e),
+        "retry_after": e.retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+def submit_job(user_prompt: str, emotional_state: str, output_path: str):
+    """Queue a pipeline run and answer 202 with its job id, or 503 when the queue is full."""
+    # Queued jobs can start within the same second, so the folder also gets a unique suffix
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    job_output_path = os.path.join(output_path, "temp", f"{timestamp}_{uuid.uuid4().hex[:8]}")
+    try:
+        job = get_job_manager().submit(user_prompt, emotional_state, job_output_path)
+    except JobQueueFullError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 503
+    return jsonify({
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "message": "Pipeline job queued"
+    }), 202
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue a pipeline run.
+    
+    Expected JSON payload: the same as /process.
+    
+    Returns:
+    {
+        "success": true/false,
+        "job_id": "string",
+        "status_url": "/jobs/<job_id>",
+        "message": "success/error message"
+    }
+    """
+    data = request.get_json(silent=True)
+    if not data or not data.get('user_prompt'):
+        return jsonify({
+            "success": False,
+            "message": "user_prompt is required"
+        }), 400
+    
+    return submit_job(data['user_prompt'], data.get('emotional_state', 'neutral'),
+                      data.get('output_path', DEFAULT_OUTPUT_PATH))
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Report the status of a pipeline job.
+    
+    Returns:
+    {
+        "success": true,
+        "job_id": "string",
+        "status": "queued/running/succeeded/failed",
+        "stages": {"intention": {"status": "...", "artifact": null}, "narration": ..., ...},
+        "video_path": "path/to/final_video.mp4",
+        ...
+    }
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "message": f"Unknown job: {job_id}"
+        }), 404
+    return jsonify({"success": True, **job.to_dict()})
+
 @app.route('/generate-text', methods=['POST'])
 def generate_text():
     """
@@ -139,12 +232,14 @@ def generate_text():
         
         emotional_state = data.get('emotional_state', 'neutral')
         
-        # Initialize the orchestrator and generate text only
-        orchestrator = Orchestrator()
-        generated_text = orchestrator.generate_text_only(
-            user_prompt=user_prompt,
-            emotional_state=emotional_state
-        )
+        # Use the shared orchestrator to generate text only
+        orchestrator = get_orchestrator()
+        with get_admission('text').slot():
+            generated_text = get_lane('text').run(
+                orchestrator.generate_text_only,
+                user_prompt=user_prompt,
+                emotional_state=emotional_state
+            )
         
         return jsonify({
             "success": True,
@@ -152,6 +247,8 @@ def generate_text():
             "message": "Text generation completed successfully"
         })
         
+    except AdmissionRejected as e:
+        return admission_rejected(e)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -205,12 +302,14 @@ def generate_image():
         # Create a session folder under the images directory
         timestamped_output_path = os.path.join(output_path, "images", session_id)
         
-        # Initialize the orchestrator and generate image only
-        orchestrator = Orchestrator()
-        image_path = orchestrator.generate_image_only(
-            text_content=text_content,
-            output_path=timestamped_output_path
-        )
+        # Use the shared orchestrator to generate image only
+        orchestrator = get_orchestrator()
+        with get_admission('image').slot():
+            image_path = get_lane('image').run(
+                orchestrator.generate_image_only,
+                text_content=text_content,
+                output_path=timestamped_output_path
+            )
         
         return jsonify({
             "success": True,
@@ -219,6 +318,8 @@ def generate_image():
             "message": "Image generation completed successfully"
         })
         
+    except AdmissionRejected as e:
+        return admission_rejected(e)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -274,13 +375,15 @@ def generate_video():
         # Create a session folder under the videos directory
         timestamped_output_path = os.path.join(output_path, "videos", session_id)
         
-        # Initialize the orchestrator and generate video
-        orchestrator = Orchestrator()
-        video_path = orchestrator.generate_video_only(
-            text_content=text_content,
-            image_path=image_path,
-            output_path=timestamped_output_path
-        )
+        # Use the shared orchestrator to generate video
+        orchestrator = get_orchestrator()
+        with get_admission('video').slot():
+            video_path = get_lane('video').run(
+                orchestrator.generate_video_only,
+                text_content=text_content,
+                image_path=image_path,
+                output_path=timestamped_output_path
+            )
         
         return jsonify({
             "success": True,
@@ -289,6 +392,8 @@ def generate_video():
             "message": "Video generation completed successfully"
         })
         
+    except AdmissionRejected as e:
+        return admission_rejected(e)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -307,7 +412,9 @@ def generate_text_stream():
     }
     
     Returns:
-    Server-Sent Events stream with text chunks
+    text/event-stream with one event (with id) per text chunk, keep-alive comments
+    while generation is quiet, and a final "done" ([DONE]) or "error" ([ERROR]: ...) event.
+    Generation is aborted when the client disconnects.
     """
     try:
         data = request.get_json()
@@ -327,21 +434,40 @@ def generate_text_stream():
         
         emotional_state = data.get('emotional_state', 'neutral')
         
-        def generate():
-            try:
-                # Initialize the orchestrator and generate text with streaming
-                orchestrator = Orchestrator()
+        def generate(cancel):
+            # Use the shared orchestrator to generate text with streaming; the stream keeps
+            # its own producer thread but runs at the text lane's priority
+            start_time = time.perf_counter()
+            first_chunk_sent = False
+            orchestrator = get_orchestrator()
+            with lane_priority(get_lane('text').priority):
                 for chunk in orchestrator.generate_text_stream(
                     user_prompt=user_prompt,
-                    emotional_state=emotional_state
+                    emotional_state=emotional_state,
+                    cancel=cancel
                 ):
-                    yield f"data: {chunk}\n\n"
-                yield "data: [DONE]\n\n"
-            except Exception as e:
-                yield f"data: [ERROR]: {str(e)}\n\n"
-        
-        return Response(generate(), mimetype='text/plain')
+                    if not first_chunk_sent:
+                        first_chunk_sent = True
+                        # Provider-side TTFT is recorded in the LLM log metadata
+                        print(f"Stream time to first chunk: {time.perf_counter() - start_time:.3f}s")
+                    yield chunk
+            if cancel.is_set():
+                print(f"Stream cancelled after {time.perf_counter() - start_time:.3f}s: client disconnected")
+        
+        # The slot is held until the stream is closed, not just until this handler returns
+        admission = get_admission('text')
+        admitted_at = admission.acquire()
+        response = Response(
+            stream_events(generate),
+            mimetype='text/event-stream',
+            # Stop proxies (e.g. nginx) from buffering the stream
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        response.call_on_close(lambda: admission.release(admitted_at))
+        return response
         
+    except AdmissionRejected as e:
+        return admission_rejected(e)
     except Exception as e:
         return jsonify({
             "success": False,
@@ -353,9 +479,53 @@ def health_check():
     """Health check endpoint."""
     return jsonify({
         "status": "healthy",
-        "service": "Peace Processor Pipeline"
+        "service": "Peace Processor Pipeline",
+        "client_pool": get_pool_stats(),
+        "single_flight": get_single_flight_stats(),
+        "hedging": get_hedge_stats(),
+        "rate_limits": get_rate_limiter_stats(),
+        "tts_cache": get_audio_cache().get_stats() if settings.TTS_CACHE_ENABLED else None,
+        "jobs": get_job_stats(),
+        "admission": get_admission_stats(),
+        "lanes": get_lane_stats()
     })
 
+def warm_up():
+    """Open provider connections and build the pipeline components before the first request."""
+    if settings.CLIENT_POOL_PREWARM:
+        print(f"Client pool warm-up: {warm_up_clients()}")
+    if settings.ORCHESTRATOR_PREWARM:
+        print(f"Orchestrator warm-up: {get_orchestrator().warm_up()}")
+
+def start_background():
+    """
+    Start the warm-up and, with a shared job store, the job workers, once per process.
+    Only serving processes call this, so a reloader's watcher process or a pre-fork
+    master never runs a second worker pool claiming jobs from a shared store.
+    """
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    
+    # Warm up in the background so /health answers at once; a request arriving first
+    # waits only for the components it needs
+    threading.Thread(target=warm_up, name="service-warm-up", daemon=True).start()
+    
+    # With a shared job store, workers pick up queued and abandoned jobs before the first submission
+    if settings.JOB_STORE != "memory":
+        get_job_manager().start()
+
 if __name__ == "__main__":
+    from werkzeug.serving import is_running_from_reloader
+    
+    ensure_upload_dirs()
+    
+    # debug=True runs this block in the reloader's watcher process too, which never
+    # serves; there the first request starts background work in the serving child instead
+    if is_running_from_reloader():
+        start_background()
+    
     # Run the Flask service
-    app.run(host='0.0.0.0', port=8008, debug=True) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=8008, debug=True)
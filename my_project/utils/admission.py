@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Admission control for the service endpoints.
+Each endpoint class runs at most max_concurrent requests; up to max_queue more wait
+in FIFO order for at most max_wait seconds. Anything beyond is rejected at once with
+a Retry-After estimate from the recent drain rate, instead of piling more pipelines
+onto the providers until every request times out.
+"""
+
+import math
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator
+
+from config import settings
+
+# Completions within this many seconds count towards the drain rate
+DRAIN_WINDOW = 300.0
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted; carries the suggested Retry-After in seconds."""
+
+    def __init__(self, endpoint_class: str, reason: str, retry_after: int):
+        super().__init__(f"{endpoint_class} is at capacity ({reason}), retry in {retry_after}s")
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency cap with a bounded FIFO wait queue for one endpoint class."""
+
+    def __init__(self, name: str, limits: Dict[str, Any]):
+        """
+        Initialize the controller.
+
+        Args:
+            name: Endpoint class name, used in errors and metrics
+            limits: max_concurrent, max_queue and max_wait (seconds) of the class
+        """
+        self.name = name
+        self.max_concurrent = max(1, int(limits.get("max_concurrent", 1)))
+        self.max_queue = max(0, int(limits.get("max_queue", 0)))
+        self.max_wait = float(limits.get("max_wait", 0))
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._waiters: deque = deque()
+        self._completions: deque = deque()
+        self._duration_avg = None
+        self._stats = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0
+        }
+
+    def _retry_after(self) -> int:
+        """Seconds until a new request would likely get in, from the drain rate (lock held)."""
+        now = time.monotonic()
+        while self._completions and self._completions[0] < now - DRAIN_WINDOW:
+            self._completions.popleft()
+        ahead = len(self._waiters) + 1
+        if len(self._completions) >= 2:
+            span = max(now - self._completions[0], 1.0)
+            seconds = ahead * span / len(self._completions)
+        elif self._duration_avg is not None:
+            seconds = ahead * self._duration_avg / self.max_concurrent
+        else:
+            seconds = settings.ADMISSION_DEFAULT_RETRY_AFTER
+        return int(min(max(math.ceil(seconds), 1), settings.ADMISSION_MAX_RETRY_AFTER))
+
+    def acquire(self) -> float:
+        """
+        Take a slot, waiting in the queue if all are busy.
+
+        Returns:
+            The time the slot was granted, to pass to release()
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait exceeded max_wait
+        """
+        queued_at = time.monotonic()
+        with self._lock:
+            if self._running < self.max_concurrent and not self._waiters:
+                self._running += 1
+                self._stats["admitted"] += 1
+                return queued_at
+            if len(self._waiters) >= self.max_queue:
+                self._stats["rejected_queue_full"] += 1
+                raise AdmissionRejected(self.name, "queue full", self._retry_after())
+            turn = threading.Event()
+            self._waiters.append(turn)
+            self._stats["queued"] += 1
+
+        turn.wait(self.max_wait)
+        with self._lock:
+            granted_at = time.monotonic()
+            wait = granted_at - queued_at
+            if not turn.is_set():
+                # Still queued: give up the place in line
+                self._waiters.remove(turn)
+                self._stats["rejected_timeout"] += 1
+                raise AdmissionRejected(self.name, f"waited {wait:.1f}s", self._retry_after())
+            # release() handed its slot over, so _running already counts this request
+            self._stats["admitted"] += 1
+            self._stats["queue_wait_total"] += wait
+            self._stats["queue_wait_max"] = max(self._stats["queue_wait_max"], wait)
+        # Service time is measured from here, so the queue wait does not inflate Retry-After
+        return granted_at
+
+    def release(self, granted_at: float):
+        """
+        Free the slot of a finished request, handing it to the next waiter if any.
+
+        Args:
+            granted_at: Value returned by acquire()
+        """
+        now = time.monotonic()
+        with self._lock:
+            duration = now - granted_at
+            self._duration_avg = duration if self._duration_avg is None else 0.8 * self._duration_avg + 0.2 * duration
+            self._completions.append(now)
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._running -= 1
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for the duration of the block (raises AdmissionRejected)."""
+        granted_at = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(granted_at)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get occupancy, rejection and queue-wait metrics."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["running"] = self._running
+            stats["queue_depth"] = len(self._waiters)
+            stats["retry_after"] = self._retry_after()
+        # Averaged over the requests that waited and were then admitted
+        waited = stats["queued"] - stats["rejected_timeout"] - stats["queue_depth"]
+        wait_total = stats.pop("queue_wait_total")
+        stats["queue_wait_avg"] = round(wait_total / waited, 4) if waited else 0.0
+        stats["queue_wait_max"] = round(stats["queue_wait_max"], 4)
+        stats["max_concurrent"] = self.max_concurrent
+        stats["max_queue"] = self.max_queue
+        return stats
+
+
+# Process-wide controllers, one per endpoint class
+_controllers: Dict[str, AdmissionController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_admission(endpoint_class: str) -> AdmissionController:
+    """Get the shared controller of an endpoint class ('process', 'text', 'image' or 'video')."""
+    with _controllers_lock:
+        if endpoint_class not in _controllers:
+            _controllers[endpoint_class] = AdmissionController(
+                endpoint_class, settings.ADMISSION_LIMITS.get(endpoint_class, {})
+            )
+        return _controllers[endpoint_class]
+
+
+def get_admission_stats() -> Dict[str, Dict[str, Any]]:
+    """Get metrics of all endpoint classes."""
+    with _controllers_lock:
+        controllers = dict(_controllers)
+    return {name: controller.get_stats() for name, controller in controllers.items()}
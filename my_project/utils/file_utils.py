@@ -10,6 +10,44 @@ import shutil
 from typing import List, Optional
 
 
+# 修复路径配置 - 指向logindemo项目的uploads目录
+# Shared by the Flask service (service.py) and the ASGI service (asgi_service.py)
+# 项目位置：/Users/dengsihang/Desktop/HKU/meditation-assistant/my_project/
+# 目标位置：/Users/dengsihang/Desktop/HKU/meditation-assistant/logindemo/uploads/
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOGINDEMO_UPLOADS_DIR = os.path.join(PROJECT_DIR, "..", "logindemo", "uploads")
+DEFAULT_OUTPUT_PATH = os.path.abspath(LOGINDEMO_UPLOADS_DIR)
+
+_upload_dirs_ready = False
+
+
+def ensure_upload_dirs():
+    """Create the uploads directory and its images/videos subdirectories (once per process)."""
+    global _upload_dirs_ready
+    if _upload_dirs_ready:
+        return
+    
+    print(f"项目路径: {PROJECT_DIR}")
+    print(f"目标uploads目录: {DEFAULT_OUTPUT_PATH}")
+    print(f"uploads目录是否存在: {os.path.exists(DEFAULT_OUTPUT_PATH)}")
+    
+    # 确保uploads目录存在
+    if not os.path.exists(DEFAULT_OUTPUT_PATH):
+        os.makedirs(DEFAULT_OUTPUT_PATH, exist_ok=True)
+        print(f"创建uploads目录: {DEFAULT_OUTPUT_PATH}")
+    
+    # 确保images和videos子目录存在
+    images_dir = os.path.join(DEFAULT_OUTPUT_PATH, "images")
+    videos_dir = os.path.join(DEFAULT_OUTPUT_PATH, "videos")
+    if not os.path.exists(images_dir):
+        os.makedirs(images_dir, exist_ok=True)
+        print(f"创建images目录: {images_dir}")
+    if not os.path.exists(videos_dir):
+        os.makedirs(videos_dir, exist_ok=True)
+        print(f"创建videos目录: {videos_dir}")
+    _upload_dirs_ready = True
+
+
 def ensure_directory(directory_path: str) -> str:
     """
     Ensure a directory exists, creating it if necessary.
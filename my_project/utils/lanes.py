@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Priority lanes for the service endpoints.
+Cheap interactive requests (text generation and streaming) and expensive renders
+(images, videos, full pipelines) run on separate worker pools, so a backlog in one
+lane never occupies the workers of another. Work runs with its lane's priority, which
+the provider rate limiters use to keep a share of their capacity for priority 0, so
+renders cannot use up the LLM and TTS limits that text generation needs.
+"""
+
+import time
+import threading
+import contextvars
+import concurrent.futures
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator
+
+from config import settings
+
+# Priority of the lane the current code runs for; code outside any lane runs at priority 0
+_priority: contextvars.ContextVar = contextvars.ContextVar("lane_priority", default=0)
+
+
+def current_priority() -> int:
+    """Get the priority of the current lane (0 is the highest)."""
+    return _priority.get()
+
+
+@contextmanager
+def lane_priority(priority: int) -> Iterator[None]:
+    """
+    Run the block at a lane priority.
+
+    Args:
+        priority: Lane priority (0 is the highest)
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def submit_with_context(executor: concurrent.futures.Executor, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+    """Submit fn to an executor so that it runs with the caller's lane priority."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class Lane:
+    """Worker pool with its own queue and priority."""
+
+    def __init__(self, name: str, workers: int, priority: int):
+        """
+        Initialize the lane. Worker threads start with the first submission.
+
+        Args:
+            name: Lane name, used in thread names and metrics
+            workers: Number of worker threads
+            priority: Priority of the lane's work (0 is the highest)
+        """
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.priority = int(priority)
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._queued = 0
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0
+        }
+
+    def submit(self, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """
+        Queue fn on the lane's workers.
+
+        Args:
+            fn: Function to run
+            *args, **kwargs: Arguments of fn
+
+        Returns:
+            Future of the result of fn
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=f"lane-{self.name}"
+                )
+            self._stats["submitted"] += 1
+            self._queued += 1
+        return submit_with_context(self._executor, self._run, time.monotonic(), fn, args, kwargs)
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn on the lane's workers and wait for its result (exceptions are re-raised)."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def _run(self, queued_at: float, fn: Callable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Worker side of submit: record the queue wait and run fn at the lane's priority."""
+        wait = time.monotonic() - queued_at
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._stats["queue_wait_total"] += wait
+            self._stats["queue_wait_max"] = max(self._stats["queue_wait_max"], wait)
+        failed = True
+        try:
+            with lane_priority(self.priority):
+                result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._stats["failed" if failed else "completed"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get occupancy and queue-wait metrics of the lane."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["running"] = self._running
+            stats["queue_depth"] = self._queued
+        started = stats["completed"] + stats["failed"] + stats["running"]
+        wait_total = stats.pop("queue_wait_total")
+        stats["queue_wait_avg"] = round(wait_total / started, 4) if started else 0.0
+        stats["queue_wait_max"] = round(stats["queue_wait_max"], 4)
+        stats["workers"] = self.workers
+        stats["priority"] = self.priority
+        return stats
+
+
+# Process-wide lanes, created on first use
+_lanes: Dict[str, Lane] = {}
+_lanes_lock = threading.Lock()
+
+
+def get_lane(endpoint_class: str) -> Lane:
+    """Get the shared lane that runs an endpoint class ('process', 'text', 'image' or 'video')."""
+    name = settings.LANE_ROUTES.get(endpoint_class, endpoint_class)
+    with _lanes_lock:
+        if name not in _lanes:
+            config = settings.LANES.get(name, {})
+            _lanes[name] = Lane(name, config.get("workers", 1), config.get("priority", 0))
+        return _lanes[name]
+
+
+def get_lane_stats() -> Dict[str, Dict[str, Any]]:
+    """Get metrics of all lanes."""
+    with _lanes_lock:
+        lanes = dict(_lanes)
+    return {name: lane.get_stats() for name, lane in lanes.items()}
@@ -3,39 +3,82 @@
 
 """
 LLM interaction logger module for recording all LLM inputs and outputs.
+Entries are handed to a single background writer through a bounded queue, so
+logging on the request path costs one queue put. The writer batches flushes and
+rotates the log file by size and age, gzipping rotated files.
 """
 
 import os
 import json
+import gzip
+import time
+import queue
+import atexit
+import shutil
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from config import settings
+
+# Queue item that tells the writer to finish
+_STOP = object()
+
 
 class LLMLogger:
     """Logs all LLM interactions with timestamps and metadata."""
-    
-    def __init__(self, log_dir: str = "logs"):
+
+    def __init__(self, log_dir: str = None):
         """
-        Initialize the LLM logger.
-        
+        Initialize the LLM logger and start its background writer.
+
         Args:
-            log_dir: Directory to store log files
+            log_dir: Directory to store log files (defaults to settings)
         """
-        self.log_dir = log_dir
-        os.makedirs(log_dir, exist_ok=True)
-        
+        self.log_dir = log_dir or settings.LLM_LOG_DIR
+        os.makedirs(self.log_dir, exist_ok=True)
+
         # Create a new log file for each run
+        self.log_file = self._new_log_path()
+
+        self.block_when_full = settings.LLM_LOG_FULL_POLICY == "block"
+        self.batch_size = settings.LLM_LOG_BATCH_SIZE
+        self.flush_interval = settings.LLM_LOG_FLUSH_INTERVAL
+        self.max_bytes = settings.LLM_LOG_MAX_BYTES
+        self.rotate_interval = settings.LLM_LOG_ROTATE_INTERVAL
+        self.compress = settings.LLM_LOG_COMPRESS
+
+        self._queue = queue.Queue(maxsize=settings.LLM_LOG_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._stats = {
+            "logged": 0,
+            "written": 0,
+            "dropped": 0,
+            "rotations": 0
+        }
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="llm-logger", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _new_log_path(self) -> str:
+        """Path of a new log file named after the current time."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_file = os.path.join(log_dir, f"llm_interactions_{timestamp}.jsonl")
-    
-    def log_interaction(self, 
+        path = os.path.join(self.log_dir, f"llm_interactions_{timestamp}.jsonl")
+        suffix = 1
+        while os.path.exists(path) or os.path.exists(path + ".gz"):
+            path = os.path.join(self.log_dir, f"llm_interactions_{timestamp}_{suffix}.jsonl")
+            suffix += 1
+        return path
+
+    def log_interaction(self,
                        component: str,
                        prompt: str,
                        response: str,
                        metadata: Optional[Dict[str, Any]] = None):
         """
         Log a single LLM interaction.
-        
+
         Args:
             component: Name of the component making the request
             prompt: The input prompt
@@ -49,11 +92,111 @@ class LLMLogger:
             "response": response,
             "metadata": metadata or {}
         }
-        
-        # Append the log entry to the file
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-    
+
+        # Hand the entry to the background writer
+        if self._closed:
+            with self._lock:
+                self._stats["dropped"] += 1
+            return
+        try:
+            self._queue.put(log_entry, block=self.block_when_full)
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            return
+        with self._lock:
+            self._stats["logged"] += 1
+
+    def _run(self):
+        """Background writer loop: collect batches from the queue and append them to the file."""
+        log = open(self.log_file, "a", encoding="utf-8")
+        opened_at = time.monotonic()
+        stopping = False
+
+        while not stopping:
+            batch = []
+            try:
+                entry = self._queue.get(timeout=self.flush_interval)
+                while True:
+                    if entry is _STOP:
+                        stopping = True
+                        break
+                    batch.append(entry)
+                    if len(batch) >= self.batch_size:
+                        break
+                    entry = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            if batch:
+                try:
+                    log.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch))
+                    log.flush()
+                    with self._lock:
+                        self._stats["written"] += len(batch)
+                except (OSError, TypeError, ValueError) as e:
+                    print(f"Error writing LLM log batch: {e}")
+
+            for _ in range(len(batch) + stopping):
+                self._queue.task_done()
+
+            # Rotate by size, or by age as long as the file is not empty
+            size = log.tell()
+            if not stopping and size and (size >= self.max_bytes
+                                          or time.monotonic() - opened_at >= self.rotate_interval):
+                log = self._rotate(log)
+                opened_at = time.monotonic()
+
+        log.close()
+
+    def _rotate(self, log):
+        """
+        Close the current log file, compress it and open a new one.
+
+        Args:
+            log: The open file object of the current log
+
+        Returns:
+            The open file object of the new log
+        """
+        log.close()
+        rotated = self.log_file
+
+        with self._lock:
+            self.log_file = self._new_log_path()
+            self._stats["rotations"] += 1
+
+        if self.compress:
+            try:
+                with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(rotated)
+            except OSError as e:
+                print(f"Error compressing rotated LLM log {rotated}: {e}")
+
+        return open(self.log_file, "a", encoding="utf-8")
+
+    def flush(self):
+        """Block until every entry logged so far has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write the remaining entries and stop the background writer."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get logged, written and dropped entry counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
     def get_log_path(self) -> str:
         """Get the path to the current log file."""
-        return self.log_file 
\ No newline at end of file
+        with self._lock:
+            return self.log_file
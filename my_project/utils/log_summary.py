@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summarize LLM interaction logs per component.
+Reads llm_interactions_*.jsonl (and rotated .jsonl.gz) files line by line and prints
+wall time and TTFT percentiles, queue wait, retries and token totals.
+Percentiles are computed over a fixed-size reservoir sample, so memory stays bounded
+however large the logs are.
+
+Usage:
+    python -m utils.log_summary logs/
+"""
+
+import os
+import sys
+import glob
+import gzip
+import json
+import random
+import argparse
+from collections import defaultdict
+from typing import Dict, Any, Iterator, List, Optional
+
+# Samples kept per component and metric for percentile estimates
+RESERVOIR_SIZE = 10000
+
+
+class Reservoir:
+    """Uniform reservoir sample of a stream of numbers."""
+
+    def __init__(self, size: int = RESERVOIR_SIZE):
+        self.size = size
+        self.count = 0
+        self.samples: List[float] = []
+
+    def add(self, value: float):
+        """Add one value to the stream."""
+        self.count += 1
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+            return
+        index = random.randrange(self.count)
+        if index < self.size:
+            self.samples[index] = value
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Nearest-rank percentile of the sampled values, or None when empty."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(0, min(len(ordered) - 1, int(round(p / 100.0 * len(ordered) + 0.5)) - 1))
+        return ordered[rank]
+
+
+class ComponentSummary:
+    """Running totals and latency samples of one component."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.queue_wait = 0.0
+        self.tokens = defaultdict(int)
+        self.wall_time = Reservoir()
+        self.ttft = Reservoir()
+
+    def add(self, metadata: Dict[str, Any]):
+        """Add the metadata of one logged call."""
+        self.calls += 1
+        if metadata.get("error"):
+            self.errors += 1
+        if metadata.get("cache") == "hit":
+            self.cache_hits += 1
+        self.retries += metadata.get("retries") or 0
+        self.queue_wait += metadata.get("queue_wait") or 0.0
+        for field in ("prompt_tokens", "completion_tokens", "cached_prompt_tokens"):
+            self.tokens[field] += metadata.get(field) or 0
+
+        # Older entries only carry total_time
+        wall_time = metadata.get("wall_time", metadata.get("total_time"))
+        if wall_time is not None:
+            self.wall_time.add(wall_time)
+        if metadata.get("time_to_first_token") is not None:
+            self.ttft.add(metadata["time_to_first_token"])
+
+
+def iter_log_files(log_dir: str) -> List[str]:
+    """List the interaction log files of a directory, oldest first."""
+    paths = glob.glob(os.path.join(log_dir, "llm_interactions_*.jsonl"))
+    paths += glob.glob(os.path.join(log_dir, "llm_interactions_*.jsonl.gz"))
+    return sorted(paths)
+
+
+def iter_entries(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    """Yield log entries one line at a time, skipping lines that are not valid JSON."""
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def summarize(log_dir: str) -> Dict[str, ComponentSummary]:
+    """
+    Build per-component summaries of a log directory.
+
+    Args:
+        log_dir: Directory containing llm_interactions_*.jsonl files
+
+    Returns:
+        Dictionary mapping component name to its summary
+    """
+    summaries: Dict[str, ComponentSummary] = defaultdict(ComponentSummary)
+    for entry in iter_entries(iter_log_files(log_dir)):
+        summaries[entry.get("component", "unknown")].add(entry.get("metadata") or {})
+    return summaries
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+def print_summary(summaries: Dict[str, ComponentSummary]):
+    """Print one table row per component, slowest p95 first."""
+    header = (f"{'component':<28}{'calls':>7}{'errors':>7}{'retries':>8}{'hits':>6}"
+              f"{'p50':>9}{'p95':>9}{'p99':>9}{'ttft p50':>10}{'ttft p95':>10}{'avg wait':>10}"
+              f"{'prompt tok':>12}{'compl tok':>11}{'cached tok':>12}")
+    print(header)
+    print("-" * len(header))
+
+    ordered = sorted(
+        summaries.items(),
+        key=lambda item: item[1].wall_time.percentile(95) or 0.0,
+        reverse=True
+    )
+    for component, summary in ordered:
+        print(
+            f"{component[:27]:<28}{summary.calls:>7}{summary.errors:>7}{summary.retries:>8}{summary.cache_hits:>6}"
+            f"{_format_seconds(summary.wall_time.percentile(50)):>9}"
+            f"{_format_seconds(summary.wall_time.percentile(95)):>9}"
+            f"{_format_seconds(summary.wall_time.percentile(99)):>9}"
+            f"{_format_seconds(summary.ttft.percentile(50)):>10}"
+            f"{_format_seconds(summary.ttft.percentile(95)):>10}"
+            f"{_format_seconds(summary.queue_wait / summary.calls if summary.calls else None):>10}"
+            f"{summary.tokens['prompt_tokens']:>12}"
+            f"{summary.tokens['completion_tokens']:>11}"
+            f"{summary.tokens['cached_prompt_tokens']:>12}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize LLM interaction logs per component')
+    parser.add_argument('log_dir', nargs='?', default='logs',
+                        help='Directory containing llm_interactions_*.jsonl files')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.log_dir):
+        print(f"Log directory not found: {args.log_dir}")
+        sys.exit(1)
+
+    summaries = summarize(args.log_dir)
+    if not summaries:
+        print(f"No interactions found in {args.log_dir}")
+        return
+    print_summary(summaries)
+
+
+if __name__ == "__main__":
+    main()
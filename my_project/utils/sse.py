@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Server-Sent Events helpers.
+stream_events runs a producer on a background thread and turns its text chunks into
+text/event-stream frames with event ids. Keep-alive comments are sent while the producer
+is quiet, so proxies keep the connection open and a disconnected client is noticed
+(the server closes the response when a write fails). Closing the stream sets the
+producer's cancel event so the upstream completion is aborted.
+"""
+
+import time
+import queue
+import threading
+from typing import Callable, Iterator, Optional
+
+from config import settings
+
+
+def format_event(data: str, event: Optional[str] = None, event_id: Optional[int] = None) -> str:
+    """
+    Format one SSE frame. Multi-line data is sent as several data lines, which
+    clients join back together with newlines.
+
+    Args:
+        data: Event payload
+        event: Event type (omitted for the default 'message' type)
+        event_id: Event id, reported back by reconnecting clients as Last-Event-ID
+
+    Returns:
+        The frame, terminated by a blank line
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    for line in data.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        lines.append(f"data: {line}")
+    return "\n".join(lines) + "\n\n"
+
+
+def stream_events(produce: Callable[[threading.Event], Iterator[str]],
+                  heartbeat_interval: float = None,
+                  buffer_size: int = None,
+                  flush_interval: float = None,
+                  retry_ms: int = None) -> Iterator[str]:
+    """
+    Stream the chunks of a producer as SSE frames.
+
+    Chunks are sent as default 'message' events; the stream ends with a 'done' event
+    (data [DONE]) or an 'error' event (data [ERROR]: message).
+
+    Args:
+        produce: Called with a cancel event on a background thread; yields text chunks
+                 and should stop soon after the event is set
+        heartbeat_interval: Seconds of silence before a keep-alive comment (defaults to settings)
+        buffer_size: Chunks buffered for a slow client before the producer is paused
+                     (defaults to settings)
+        flush_interval: Chunks arriving within this many seconds are sent as one event;
+                        0 sends every chunk at once (defaults to settings)
+        retry_ms: Reconnection delay advertised to clients (defaults to settings)
+
+    Yields:
+        SSE frames
+    """
+    heartbeat_interval = heartbeat_interval or settings.SSE_HEARTBEAT_INTERVAL
+    buffer_size = buffer_size or settings.SSE_BUFFER_SIZE
+    flush_interval = settings.SSE_FLUSH_INTERVAL if flush_interval is None else flush_interval
+    retry_ms = retry_ms or settings.SSE_RETRY_MS
+
+    cancel = threading.Event()
+    buffer: "queue.Queue" = queue.Queue(maxsize=buffer_size)
+
+    def put(item) -> bool:
+        """Wait for room in the buffer (backpressure); gives up once the stream is cancelled."""
+        while not cancel.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        chunks = None
+        try:
+            chunks = produce(cancel)
+            for chunk in chunks:
+                if not put(("chunk", chunk)):
+                    return
+            put(("done", None))
+        except Exception as e:
+            put(("error", str(e)))
+        finally:
+            # Closing the generator chain closes the upstream HTTP stream
+            if chunks is not None and hasattr(chunks, "close"):
+                chunks.close()
+
+    threading.Thread(target=run, name="sse-producer", daemon=True).start()
+
+    event_id = 0
+    pending = None
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        while True:
+            if pending is None:
+                try:
+                    pending = buffer.get(timeout=heartbeat_interval)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+
+            kind, value = pending
+            pending = None
+            event_id += 1
+            if kind == "done":
+                yield format_event("[DONE]", event="done", event_id=event_id)
+                return
+            if kind == "error":
+                yield format_event(f"[ERROR]: {value}", event="error", event_id=event_id)
+                return
+
+            parts = [value]
+            deadline = time.monotonic() + flush_interval
+            while flush_interval > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = buffer.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item[0] != "chunk":
+                    pending = item
+                    break
+                parts.append(item[1])
+            yield format_event("".join(parts), event_id=event_id)
+    finally:
+        # Reached at the end of the stream, or when the server closes the response
+        # because the client disconnected
+        cancel.set()